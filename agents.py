@@ -1,5 +1,4 @@
 from base_agent import StockAgent
-import requests
 from typing import Optional
 import os
 
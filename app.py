@@ -4,12 +4,14 @@ setup_logging()
 import logging
 import streamlit as st
 from main import StockDebateSystem
-from data_fetcher import get_stock_metrics, get_stock_news, get_stock_symbol
+from data_fetcher import get_stock_research_async, get_stock_symbol
+from result_store import get_result_store
 import asyncio
-import yfinance as yf
 import os
-import json
+import queue
+import threading
 import time
+from datetime import datetime
 
 st.set_page_config(page_title="Stock Analysis AI", layout="wide")
 
@@ -22,6 +24,30 @@ if 'metrics' not in st.session_state:
     st.session_state.metrics = None
 if 'news' not in st.session_state:
     st.session_state.news = None
+if 'research' not in st.session_state:
+    st.session_state.research = None
+if 'timings' not in st.session_state:
+    st.session_state.timings = {}
+if 'analyses' not in st.session_state:
+    # ticker -> finished analysis, reused across reruns instead of recomputed
+    st.session_state.analyses = {}
+
+@st.cache_resource
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """One long-lived event loop per server process.
+
+    Async work runs here instead of in a fresh asyncio.run per click, so the
+    script thread stays free to render streamed tokens and the pooled LLM
+    client keeps its connections across reruns.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="analysis-loop", daemon=True).start()
+    return loop
+
+@st.cache_resource
+def _debate_system(openai_key: str) -> StockDebateSystem:
+    """Agents read the API key at construction, so cache one system per key"""
+    return StockDebateSystem()
 
 def format_metric(value, ticker, is_currency=True):
     """Format metrics with proper currency symbol"""
@@ -37,44 +63,134 @@ def format_metric(value, ticker, is_currency=True):
     except (ValueError, TypeError):
         return str(value)
 
+def render_metrics(metrics, ticker, timings=None):
+    st.header("Key Metrics")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Current Price", format_metric(metrics.get('current_price'), ticker))
+        st.metric("P/E Ratio", format_metric(metrics.get('pe_ratio'), ticker, False))
+    with col2:
+        st.metric("Market Cap", format_metric(metrics.get('market_cap'), ticker))
+        st.metric("Volume", format_metric(metrics.get('volume', 0), ticker, False))
+    with col3:
+        low = metrics.get('52_week_low')
+        high = metrics.get('52_week_high')
+        range_str = f"{format_metric(low, ticker, False)} - {format_metric(high, ticker, False)}" if low != 'N/A' and high != 'N/A' else 'N/A'
+        st.metric("52 Week Range", range_str)
+        st.metric("Avg Volume", format_metric(metrics.get('avg_volume', 0), ticker, False))
+    if timings:
+        st.caption("Fetch times: " + ", ".join(f"{source} {secs:.2f}s" for source, secs in timings.items()))
+
+def render_news(news):
+    st.header("Recent News")
+    for item in news['news'][:5]:
+        date = item.get('date') or 'Date not available'
+        st.markdown(f"**{item['title']}**")
+        st.caption(f"[Source]({item['url']}) | {date}")
+        with st.expander("Read more"):
+            st.write(item.get('description', 'No description available'))
+
+def _avatar(role):
+    return "🟢" if "Bullish" in role else "🔴"
+
+def _show_analysis(ticker: str):
+    """Point the page at a finished analysis"""
+    analysis = st.session_state.analyses[ticker]
+    st.session_state.ticker = ticker
+    st.session_state.research = analysis['research']
+    st.session_state.metrics = analysis['research'].metrics
+    st.session_state.news = analysis['research'].news
+    st.session_state.result = analysis['result']
+    st.session_state.conversation = analysis['result']['messages'] if analysis['result'] else []
+    st.session_state.timings = analysis['timings']
+
 # API Key Inputs
 with st.sidebar:
     st.header("API Configuration")
     openai_key = st.text_input("OpenAI API Key", value=os.getenv("OPENAI_API_KEY", ""), type="password")
     tavily_key = st.text_input("Tavily API Key", value=os.getenv("TAVILY_API_KEY", ""), type="password")
-    
+
     st.header("About")
     st.write("AI agents debate stock investment decisions.")
     st.warning("Note: Not financial advice.")
 
-async def run_analysis(ticker: str):
-    """Run stock analysis and update UI"""
-    if not openai_key or not tavily_key:
-        st.error("Please enter both API keys")
-        return
-        
-    os.environ["OPENAI_API_KEY"] = openai_key
-    os.environ["TAVILY_API_KEY"] = tavily_key
-    
-    # Step 1: Fetch metrics
-    with st.status(f"Fetching metrics for {ticker}..."):
-        st.session_state.metrics = get_stock_metrics(ticker)
-        if st.session_state.metrics.get('error'):
-            st.error("Failed to fetch metrics")
-            return
-
-    # Step 2: Fetch news
-    with st.status(f"Fetching news for {ticker}..."):
-        st.session_state.news = get_stock_news(ticker)
-        if st.session_state.news.get('error'):
-            st.warning("News unavailable")
-
-    # Step 3: Run analysis
-    with st.status(f"Analyzing {ticker}..."):
-        system = StockDebateSystem()
-        result = await system.analyze_stock(ticker)
-        st.session_state.result = result
-        st.session_state.conversation = result['messages']
+def _clear_analysis():
+    """Stop showing the previous ticker's analysis under a new ticker's error"""
+    st.session_state.research = None
+    st.session_state.metrics = None
+    st.session_state.news = None
+    st.session_state.result = None
+    st.session_state.conversation = []
+    st.session_state.timings = {}
+
+def run_analysis(ticker: str, started: float, refresh: bool = False) -> bool:
+    """Run research and the debate on the background loop, streaming into the page.
+
+    Returns whether an analysis was stored; on failure the error stays on the
+    page, so callers should only rerun on success. refresh skips stored
+    results and cached responses so the debate is generated anew.
+    """
+    loop = _background_loop()
+    timings = {}
+
+    # Research starts right away; the symbol is already on screen while it runs
+    research_future = asyncio.run_coroutine_threadsafe(get_stock_research_async(ticker), loop)
+    with st.status(f"Fetching research for {ticker}...") as status:
+        research = research_future.result()
+        timings['research'] = time.perf_counter() - started
+        status.update(label=f"Research for {ticker} ready", state="complete")
+    if research.metrics.get('error'):
+        _clear_analysis()
+        st.error("Failed to fetch metrics")
+        return False
+    render_metrics(research.metrics, ticker, research.timings)
+    if research.news.get('error'):
+        st.warning("News unavailable")
+    elif research.news.get('news'):
+        render_news(research.news)
+
+    # Tokens are produced on the background loop and rendered from this thread
+    events = queue.Queue()
+
+    async def on_token(role, content):
+        events.put(('token', role, content))
+
+    async def on_turn(role, response):
+        events.put(('turn', role, response))
+
+    st.header("Agent Discussion")
+    system = _debate_system(openai_key)
+    debate_future = asyncio.run_coroutine_threadsafe(
+        system.analyze_stock(ticker, research_data=research, stream_handler=on_token, turn_handler=on_turn,
+                             reuse=not refresh),
+        loop
+    )
+    open_messages = {}  # role -> [placeholder, text so far] for the turn being streamed
+    while True:
+        try:
+            event = events.get(timeout=0.05)
+        except queue.Empty:
+            if debate_future.done():
+                break
+            continue
+        kind, role = event[0], event[1]
+        if kind == 'token':
+            if 'first_token' not in timings:
+                timings['first_token'] = time.perf_counter() - started
+            if role not in open_messages:
+                with st.chat_message(role, avatar=_avatar(role)):
+                    open_messages[role] = [st.empty(), ""]
+            open_messages[role][1] += event[2]
+            open_messages[role][0].markdown(open_messages[role][1])
+        else:
+            open_messages.pop(role, None)
+
+    result = debate_future.result()
+    timings['total'] = time.perf_counter() - started
+    logging.info(f"Analysis of {ticker} timings: {timings}")
+    st.session_state.analyses[ticker] = {'research': research, 'result': result, 'timings': timings}
+    _show_analysis(ticker)
+    return True
 
 # UI Layout
 st.title("Stock Analysis AI")
@@ -83,53 +199,68 @@ with col1:
     company = st.text_input("Enter company name:", "Apple")
 with col2:
     country = st.text_input("Country (optional):", "US")
+refresh = st.checkbox("Re-run analysis even if this session already has one", value=False)
 
 if st.button("Analyze"):
+    started = time.perf_counter()
     try:
         with st.spinner("Looking up stock symbol..."):
             ticker = get_stock_symbol(company, country)
-            print (f"LLM response - step 2: {ticker}")  # Debugging line
+            logging.info(f"Resolved {company!r} ({country}) to {ticker}")
             if not ticker:
                 st.error("Could not determine stock symbol")
                 st.stop()
-            
+
             st.session_state.ticker = ticker
             st.success(f"Found symbol: {ticker}")
-        asyncio.run(run_analysis(st.session_state.ticker))
+        if ticker in st.session_state.analyses and not refresh:
+            _show_analysis(ticker)
+        elif not openai_key or not tavily_key:
+            st.error("Please enter both API keys")
+        else:
+            os.environ["OPENAI_API_KEY"] = openai_key
+            os.environ["TAVILY_API_KEY"] = tavily_key
+            if run_analysis(ticker, started, refresh=refresh):
+                st.rerun()
     except Exception as e:
         st.error(f"Error during analysis: {str(e)}")
 
 if st.session_state.metrics and hasattr(st.session_state, 'ticker'):
-    st.header("Key Metrics")
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric("Current Price", format_metric(st.session_state.metrics.get('current_price'), st.session_state.ticker))
-        st.metric("P/E Ratio", format_metric(st.session_state.metrics.get('pe_ratio'), st.session_state.ticker, False))
-    with col2:
-        st.metric("Market Cap", format_metric(st.session_state.metrics.get('market_cap'), st.session_state.ticker))
-        st.metric("Volume", format_metric(st.session_state.metrics.get('volume', 0), st.session_state.ticker, False))
-    with col3:
-        low = st.session_state.metrics.get('52_week_low')
-        high = st.session_state.metrics.get('52_week_high')
-        range_str = f"{format_metric(low, st.session_state.ticker, False)} - {format_metric(high, st.session_state.ticker, False)}" if low != 'N/A' and high != 'N/A' else 'N/A'
-        st.metric("52 Week Range", range_str)
-        st.metric("Avg Volume", format_metric(st.session_state.metrics.get('avg_volume', 0), st.session_state.ticker, False))
+    render_metrics(st.session_state.metrics, st.session_state.ticker,
+                   st.session_state.research.timings if st.session_state.research else None)
 
 if st.session_state.news and st.session_state.news.get('news'):
-    st.header("Recent News")
-    for item in st.session_state.news['news'][:5]:
-        date = item.get('date') or 'Date not available'
-        st.markdown(f"**{item['title']}**")
-        st.caption(f"[Source]({item['url']}) | {date}")
-        with st.expander("Read more"):
-            st.write(item.get('description', 'No description available'))
+    render_news(st.session_state.news)
+elif st.session_state.news and st.session_state.news.get('error'):
+    st.warning("News unavailable")
 
 if st.session_state.result:
     st.header("Agent Discussion")
+    if st.session_state.timings.get('first_token'):
+        st.caption(f"First token after {st.session_state.timings['first_token']:.2f}s, "
+                   f"full analysis in {st.session_state.timings['total']:.1f}s")
+    stats = st.session_state.result.get('debate_stats')
+    if stats and stats['turns_saved']:
+        st.caption(f"Debate ended after {stats['turns']} of {stats['max_turns']} rounds ({stats['stop_reason']}), "
+                   f"saving about {stats['est_seconds_saved']:.0f}s")
+    stored = st.session_state.result.get('analysis')
+    if stored and stored['mode'] != 'full':
+        since = datetime.fromtimestamp(stored['previous_at']).strftime('%Y-%m-%d %H:%M')
+        if stored['mode'] == 'reuse':
+            st.caption(f"Research unchanged since the analysis of {since}; showing the stored debate")
+        else:
+            st.caption(f"Extended the analysis of {since} with a short round ({stored['reason']})")
     for msg in st.session_state.conversation:
-        avatar = "🟢" if "Bullish" in msg['role'] else "🔴"
-        with st.chat_message(msg['role'], avatar=avatar):
+        with st.chat_message(msg['role'], avatar=_avatar(msg['role'])):
             st.write(msg['content'])
 
     st.header("Final Recommendation")
     st.info(st.session_state.result['conclusion'])
+
+    store = get_result_store()
+    history = store.history(st.session_state.ticker, limit=20) if store is not None else []
+    if len(history) > 1:
+        with st.expander(f"Earlier analyses of {st.session_state.ticker}"):
+            for row in history:
+                when = datetime.fromtimestamp(row['created_at']).strftime('%Y-%m-%d %H:%M')
+                st.write(f"{when}: {row['recommendation'] or 'n/a'} ({row['mode']})")
@@ -1,20 +1,47 @@
+import atexit
 import logging
+import logging.handlers
+import queue
 from datetime import datetime
 import os
 
+_listener = None
+
 def setup_logging():
-    """Configure logging for the application"""
+    """Configure logging for the application.
+
+    Records are put on an in-memory queue and written by a background
+    listener thread, so callers on the hot path (event loop, fetch threads)
+    never wait on console or file I/O. Safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        return
     if not os.path.exists('logs'):
         os.makedirs('logs')
-        
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            # logging.FileHandler(f"logs/app_{datetime.now().strftime('%Y%m%d')}.log"),
-            logging.StreamHandler()
-        ]
-    )
+
+    handlers = [
+        # logging.FileHandler(f"logs/app_{datetime.now().strftime('%Y%m%d')}.log"),
+        logging.StreamHandler()
+    ]
+    for handler in handlers:
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    # The listener's handlers do the real formatting
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    logging.basicConfig(level=logging.INFO, handlers=[queue_handler], force=True)
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
 def log_agent_call(agent_name: str, ticker: str):
     """Log when an agent is called"""
@@ -0,0 +1,239 @@
+"""Batch mode: research and debate a whole watchlist concurrently.
+
+As a library:
+
+    results = await run_batch(["AAPL", "MSFT"], output_path="results.jsonl", concurrency=16)
+
+From the command line:
+
+    python batch.py AAPL MSFT RELIANCE.NS --out results.jsonl --concurrency 16
+    python batch.py --file watchlist.txt --out results.jsonl
+    python batch.py --file watchlist.txt --prescreen --volume-ratio 2.0
+    python batch.py --file universe.txt --prescreen --workers 8
+    python batch.py --file watchlist.txt --prescreen --fundamentals
+    python batch.py --file watchlist.txt --store results.db
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from data_fetcher import ResearchBundle, get_stock_research_async
+from main import StockDebateSystem
+from providers import configure_provider_limits
+from llm_client import shutdown_llm_client
+from screener import ScreenThresholds
+from workers import WorkerPool
+
+ProgressCallback = Callable[[int, int, Dict[str, Any]], None]
+
+def result_record(ticker: str, result: Optional[Dict[str, Any]], elapsed: float, error: Optional[str] = None) -> Dict[str, Any]:
+    """JSON-serializable summary of one ticker's analysis"""
+    if error is not None:
+        return {'ticker': ticker, 'status': 'error', 'error': error, 'elapsed': round(elapsed, 3)}
+    research = result.get('research')
+    return {
+        'ticker': ticker,
+        'status': 'ok',
+        'conclusion': result['conclusion'],
+        'messages': result['messages'],
+        'research': research.to_dict() if research is not None else None,
+        'debate': result.get('debate_stats'),
+        'analysis': result.get('analysis'),
+        'elapsed': round(elapsed, 3)
+    }
+
+def research_error(research: ResearchBundle) -> Optional[str]:
+    """Why research can't be debated (no metrics, e.g. a delisted or misspelled symbol), or None"""
+    error = research.metrics.get('error')
+    return f"Failed to fetch metrics: {error}" if error else None
+
+def _screened_out_record(ticker: str, metrics: Dict[str, Any], signals: Dict[str, Any]) -> Dict[str, Any]:
+    """Record for a ticker the pre-screen judged not worth a debate"""
+    return {
+        'ticker': ticker,
+        'status': 'screened_out',
+        'conclusion': f"After screening {ticker}, our recommendation is to HOLD: no notable price, volume or valuation signal.",
+        'metrics': metrics,
+        'screen': signals,
+        'elapsed': 0.0
+    }
+
+async def prescreen_tickers(tickers: List[str], thresholds: ScreenThresholds,
+                            pool: Optional[WorkerPool] = None,
+                            fetch_fundamentals: bool = False) -> tuple:
+    """Split tickers into (to debate, screened-out records) using bulk metrics.
+
+    By default the bulk price download is the only network call and P/E is
+    only known for tickers in the research cache (the P/E signal stays off
+    for the rest). fetch_fundamentals also fetches P/E for uncached tickers,
+    one rate-limited lookup each.
+    """
+    from data_fetcher import get_bulk_metrics, metrics_row
+    from screener import passing_tickers, screen_parallel
+
+    table = await asyncio.to_thread(get_bulk_metrics, tickers, fetch_fundamentals=fetch_fundamentals)
+    screened = await screen_parallel(table, thresholds, pool=pool)
+    passed = passing_tickers(screened)
+    # to_json turns numpy bools and NaN into plain JSON values
+    signals = json.loads(screened[~screened['passed']].to_json(orient='index'))
+    skipped = [_screened_out_record(ticker, metrics_row(table, ticker), screen_row)
+               for ticker, screen_row in signals.items()]
+    logging.info(f"Pre-screen passed {len(passed)} of {len(tickers)} tickers")
+    return passed, skipped
+
+def print_progress(done: int, total: int, record: Dict[str, Any]) -> None:
+    """Default progress reporter: one line per finished ticker on stderr"""
+    mode = f" ({record['analysis']['mode']})" if record.get('analysis') else ""
+    print(f"[{done}/{total}] {record['ticker']} {record['status']}{mode} {record['elapsed']:.1f}s",
+          file=sys.stderr, flush=True)
+
+async def run_batch(tickers: List[str],
+                    output_path: Optional[str] = None,
+                    concurrency: int = 8,
+                    provider_limits: Optional[Dict[str, int]] = None,
+                    progress: Optional[ProgressCallback] = None,
+                    system: Optional[StockDebateSystem] = None,
+                    schedule: str = "parallel_openings",
+                    prescreen: Optional[ScreenThresholds] = None,
+                    prescreen_fundamentals: bool = False,
+                    workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Analyze many tickers concurrently.
+
+    At most `concurrency` tickers are in flight at once, and provider_limits
+    (keys 'openai', 'tavily', 'yfinance') cap concurrent calls per provider.
+    Each result is appended to output_path as a JSONL line as soon as its
+    ticker finishes, so a long run can be tailed or resumed. schedule is the
+    debate schedule (see custom_agent.DEBATE_SCHEDULES). With prescreen set,
+    a vectorized screen over bulk metrics runs first and only tickers that
+    pass it are debated; the rest are recorded as 'screened_out' HOLDs.
+    Tickers whose metrics can't be fetched are recorded as errors without a
+    debate.
+    prescreen_fundamentals also fetches P/E for uncached tickers, one
+    rate-limited lookup each, which is slow for large universes.
+    With workers set, the CPU-bound stages (screening, context compilation,
+    conclusion scoring) run in a pool of that many processes while the
+    event loop keeps the research and LLM calls.
+    """
+    if provider_limits:
+        configure_provider_limits(**provider_limits)
+    pool = WorkerPool(workers) if workers else None
+    system = system or StockDebateSystem()
+    previous_pool = system.cpu_pool
+    if pool is not None:
+        system.cpu_pool = pool
+    gate = asyncio.Semaphore(concurrency)
+    total = len(tickers)
+    results: List[Dict[str, Any]] = []
+    output = open(output_path, 'a', encoding='utf-8') if output_path else None
+
+    async def analyze(ticker: str) -> Dict[str, Any]:
+        async with gate:
+            start = time.perf_counter()
+            try:
+                research = await get_stock_research_async(ticker)
+                error = research_error(research)
+                if error is not None:
+                    logging.error(f"Skipping debate for {ticker}: {error}")
+                    return result_record(ticker, None, time.perf_counter() - start, error=error)
+                result = await system.analyze_stock(ticker, research_data=research, schedule=schedule)
+                return result_record(ticker, result, time.perf_counter() - start)
+            except Exception as e:
+                logging.error(f"Batch analysis failed for {ticker}: {str(e)}")
+                return result_record(ticker, None, time.perf_counter() - start, error=str(e))
+
+    def emit(record: Dict[str, Any]) -> None:
+        results.append(record)
+        if output is not None:
+            output.write(json.dumps(record, default=str) + "\n")
+            output.flush()
+        if progress is not None:
+            progress(len(results), total, record)
+
+    try:
+        if prescreen is not None:
+            tickers, skipped = await prescreen_tickers(tickers, prescreen, pool=system.cpu_pool,
+                                                        fetch_fundamentals=prescreen_fundamentals)
+            for record in skipped:
+                emit(record)
+        for next_done in asyncio.as_completed([analyze(t) for t in tickers]):
+            emit(await next_done)
+    finally:
+        if output is not None:
+            output.close()
+        if pool is not None:
+            system.cpu_pool = previous_pool
+            pool.shutdown()
+    return results
+
+def _read_tickers(args: argparse.Namespace) -> List[str]:
+    tickers = list(args.tickers)
+    if args.file:
+        with open(args.file, encoding='utf-8') as f:
+            tickers += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    # Keep order, drop duplicates
+    return list(dict.fromkeys(t.upper() for t in tickers))
+
+async def _main(args: argparse.Namespace) -> None:
+    limits = {'openai': args.openai_limit, 'tavily': args.tavily_limit, 'yfinance': args.yfinance_limit}
+    thresholds = None
+    if args.prescreen:
+        thresholds = ScreenThresholds(range_low=args.range_low, range_high=args.range_high,
+                                      volume_ratio=args.volume_ratio, pe_low_pct=args.pe_low_pct,
+                                      pe_high_pct=args.pe_high_pct, min_signals=args.min_signals)
+    if args.store:
+        from result_store import ResultStore, set_result_store
+        set_result_store(ResultStore(args.store))
+    try:
+        await run_batch(
+            _read_tickers(args),
+            output_path=args.out,
+            concurrency=args.concurrency,
+            provider_limits={k: v for k, v in limits.items() if v is not None},
+            progress=None if args.quiet else print_progress,
+            schedule=args.schedule,
+            prescreen=thresholds,
+            prescreen_fundamentals=args.fundamentals,
+            workers=args.workers
+        )
+    finally:
+        await shutdown_llm_client()
+        if args.metrics_out:
+            from telemetry import get_telemetry
+            with open(args.metrics_out, 'w', encoding='utf-8') as f:
+                json.dump(get_telemetry().snapshot(), f, indent=2)
+
+if __name__ == "__main__":
+    from app_logging import setup_logging
+    setup_logging()
+    parser = argparse.ArgumentParser(description="Run stock debates for many tickers concurrently")
+    parser.add_argument("tickers", nargs="*", help="Yahoo Finance symbols")
+    parser.add_argument("--file", help="file with one ticker per line")
+    parser.add_argument("--out", default="results.jsonl", help="JSONL output path (appended)")
+    parser.add_argument("--concurrency", type=int, default=8, help="tickers analyzed at once")
+    parser.add_argument("--openai-limit", type=int, help="max concurrent OpenAI calls")
+    parser.add_argument("--tavily-limit", type=int, help="max concurrent Tavily searches")
+    parser.add_argument("--yfinance-limit", type=int, help="max concurrent yfinance fetches")
+    parser.add_argument("--schedule", default="parallel_openings",
+                        choices=["sequential", "parallel_openings", "simultaneous"], help="debate turn scheduling")
+    defaults = ScreenThresholds()
+    parser.add_argument("--prescreen", action="store_true", help="only debate tickers that pass the quantitative screen")
+    parser.add_argument("--fundamentals", action="store_true",
+                        help="pre-screen also fetches P/E for uncached tickers (one rate-limited lookup each)")
+    parser.add_argument("--range-low", type=float, default=defaults.range_low, help="52-week range position at or below which a ticker passes")
+    parser.add_argument("--range-high", type=float, default=defaults.range_high, help="52-week range position at or above which a ticker passes")
+    parser.add_argument("--volume-ratio", type=float, default=defaults.volume_ratio, help="volume / average volume that counts as a spike")
+    parser.add_argument("--pe-low-pct", type=float, default=defaults.pe_low_pct, help="P/E percentile at or below which a ticker passes")
+    parser.add_argument("--pe-high-pct", type=float, default=defaults.pe_high_pct, help="P/E percentile at or above which a ticker passes")
+    parser.add_argument("--min-signals", type=int, default=defaults.min_signals, help="signals required to pass")
+    parser.add_argument("--workers", type=int, help="processes for CPU-bound stages (default: run them inline)")
+    parser.add_argument("--store", help="result store database: reuse or extend earlier debates (see result_store)")
+    parser.add_argument("--quiet", action="store_true", help="no per-ticker progress lines")
+    parser.add_argument("--metrics-out", help="write latency/token metrics as JSON here when done")
+    args = parser.parse_args()
+    if not args.tickers and not args.file:
+        parser.error("give tickers or --file")
+    asyncio.run(_main(args))
@@ -0,0 +1,154 @@
+"""End-to-end StockDebateSystem.analyze_stock benchmark, fully offline.
+
+Scenarios:
+    single     one analysis at a time, research and response caches off
+    batch      batch.run_batch over many tickers at once, caches off
+    cache_hot  repeat analyses of already-seen tickers with both caches on
+    store_hot  repeat analyses with an unchanged-research result store, caches off
+
+Reports p50/p95/p99 latency, throughput and peak traced memory per scenario,
+plus LLM requests and time to first token from telemetry. Debates run a fixed
+number of rounds unless --adaptive is given, so runs stay comparable.
+
+    python -m benchmarks.bench_analyze
+    python -m benchmarks.bench_analyze --scenarios batch --batch-size 40 --concurrency 16 --json out.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, List
+
+from benchmarks.harness import latency_summary, offline_services, track_memory
+
+SCENARIOS = ('single', 'batch', 'cache_hot', 'store_hot')
+
+def _configure_caches(enabled: bool, store: bool = False) -> None:
+    import data_fetcher
+    from cache import MemoryLRUCache
+    from response_cache import ResponseCache, set_response_cache
+    from result_store import ResultStore, set_result_store
+
+    data_fetcher.set_research_cache(data_fetcher.ResearchCache(MemoryLRUCache()) if enabled else None)
+    set_response_cache(ResponseCache(MemoryLRUCache()) if enabled else None)
+    set_result_store(ResultStore(":memory:") if store else None)
+
+async def _noop_stream(role: str, content: str) -> None:
+    pass
+
+async def _timed_analyses(system, tickers: List[str]) -> List[float]:
+    latencies = []
+    for ticker in tickers:
+        start = time.perf_counter()
+        await system.analyze_stock(ticker, stream_handler=_noop_stream)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+async def scenario_single(system, args) -> List[float]:
+    _configure_caches(False)
+    return await _timed_analyses(system, [args.tickers[i % len(args.tickers)] for i in range(args.runs)])
+
+async def scenario_batch(system, args) -> List[float]:
+    import batch
+
+    _configure_caches(False)
+    tickers = [f"B{i:04d}" for i in range(args.batch_size)]
+    records = await batch.run_batch(tickers, concurrency=args.concurrency, system=system)
+    failed = [r for r in records if r['status'] != 'ok']
+    if failed:
+        raise RuntimeError(f"{len(failed)} batch analyses failed, first: {failed[0].get('error')}")
+    return [r['elapsed'] for r in records]
+
+async def prepare_cache_hot(system, args) -> None:
+    _configure_caches(True)
+    await _timed_analyses(system, args.tickers)
+
+async def scenario_repeat(system, args) -> List[float]:
+    return await _timed_analyses(system, [args.tickers[i % len(args.tickers)] for i in range(args.runs)])
+
+async def prepare_store_hot(system, args) -> None:
+    _configure_caches(False, store=True)
+    await _timed_analyses(system, args.tickers)
+
+# name -> (unmeasured setup or None, measured run)
+_RUNNERS: Dict[str, tuple] = {
+    'single': (None, scenario_single),
+    'batch': (None, scenario_batch),
+    'cache_hot': (prepare_cache_hot, scenario_repeat),
+    'store_hot': (prepare_store_hot, scenario_repeat),
+}
+
+def _telemetry_summary() -> Dict[str, Any]:
+    from telemetry import get_telemetry
+
+    snapshot = get_telemetry().snapshot()
+    ttft = snapshot['histograms'].get('llm_ttft_seconds', [])
+    requests = snapshot['histograms'].get('llm_request_seconds', [])
+    tokens = snapshot['counters'].get('llm_prompt_tokens_total', [])
+    return {
+        'llm_requests': sum(h['count'] for h in requests),
+        'prompt_tokens': int(sum(c['value'] for c in tokens)),
+        # Weighted by request count when several models report
+        'ttft_p50': (sum(h['p50'] * h['count'] for h in ttft) / sum(h['count'] for h in ttft)) if ttft else None
+    }
+
+async def main(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    from main import StockDebateSystem
+    from telemetry import get_telemetry
+
+    if not args.adaptive:
+        # analyze_stock reads its DebateBudget from the environment
+        os.environ["DEBATE_MAX_TURNS"] = str(args.turns)
+        os.environ["DEBATE_NOVELTY_THRESHOLD"] = "0"
+    results = []
+    async with offline_services(llm_latency=args.llm_latency, tokens_per_second=args.tokens_per_second,
+                                connect_delay=args.connect_delay, yfinance_latency=args.yfinance_latency,
+                                tavily_latency=args.tavily_latency) as (server, yfinance, tavily):
+        system = StockDebateSystem()
+        print(f"{'scenario':<11}{'runs':>6}{'p50 s':>9}{'p95 s':>9}{'p99 s':>9}{'mean s':>9}"
+              f"{'runs/s':>9}{'peak MiB':>10}{'LLM req':>9}{'TTFT p50':>10}")
+        for name in args.scenarios:
+            prepare, run = _RUNNERS[name]
+            if prepare is not None:
+                await prepare(system, args)
+            get_telemetry().reset()
+            server.reset_counters()
+            start = time.perf_counter()
+            with track_memory(not args.no_memory) as memory:
+                latencies = await run(system, args)
+            wall = time.perf_counter() - start
+            result = {'scenario': name, 'runs': len(latencies), 'wall': wall,
+                      'throughput': len(latencies) / wall if wall else 0.0,
+                      'peak_mib': memory['peak_bytes'] / 2 ** 20 if memory['peak_bytes'] is not None else None,
+                      'connections': server.connections, **latency_summary(latencies), **_telemetry_summary()}
+            results.append(result)
+            peak = f"{result['peak_mib']:.1f}" if result['peak_mib'] is not None else "-"
+            ttft = f"{result['ttft_p50']:.3f}" if result['ttft_p50'] is not None else "-"
+            print(f"{name:<11}{result['runs']:>6}{result['p50']:>9.2f}{result['p95']:>9.2f}{result['p99']:>9.2f}"
+                  f"{result['mean']:>9.2f}{result['throughput']:>9.2f}{peak:>10}{result['llm_requests']:>9}{ttft:>10}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2)
+    return results
+
+if __name__ == "__main__":
+    import logging
+    logging.disable(logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--tickers", nargs="+", default=["AAPL", "TSLA", "RELIANCE.NS"],
+                        help="tickers for single/cache_hot/store_hot (fixtures exist for the defaults)")
+    parser.add_argument("--runs", type=int, default=6, help="analyses per single/cache_hot/store_hot scenario")
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--turns", type=int, default=5, help="debate rounds (fixed unless --adaptive)")
+    parser.add_argument("--adaptive", action="store_true", help="keep the DEBATE_* early-stopping settings")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="mock time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=60.0, help="mock streaming rate")
+    parser.add_argument("--connect-delay", type=float, default=0.05)
+    parser.add_argument("--yfinance-latency", type=float, default=0.25)
+    parser.add_argument("--tavily-latency", type=float, default=0.8)
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (it slows CPU-bound code)")
+    parser.add_argument("--json", help="also write results here")
+    asyncio.run(main(parser.parse_args()))
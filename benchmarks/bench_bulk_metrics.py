@@ -0,0 +1,53 @@
+"""Per-ticker get_stock_metrics vs one bulk get_bulk_metrics call.
+
+Uses the stub yfinance from benchmarks.stubs (a fixed latency per round
+trip), so results are repeatable offline.
+
+    python -m benchmarks.bench_bulk_metrics --tickers 50 200 --latency 0.2
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.stubs import StubYFinance, patched_yfinance
+
+def main(args: argparse.Namespace) -> None:
+    import data_fetcher
+    from rate_limit import configure_rate_limit
+
+    # Measure fetch cost only: no cache hits, no rate-limit waits
+    data_fetcher.set_research_cache(None)
+    configure_rate_limit('yfinance', requests_per_second=1e6, burst=1e6)
+
+    print(f"{'tickers':>8}{'per-ticker (seq) s':>20}{'per-ticker (8 threads) s':>26}{'bulk s':>10}{'speedup':>10}")
+    for n in args.tickers:
+        symbols = [f"T{i:04d}" for i in range(n)]
+        # Build the synthetic data up front so only simulated latency and our own work are timed
+        StubYFinance(latency=0, per_ticker_latency=0).download(symbols, group_by="ticker")
+        with patched_yfinance(StubYFinance(latency=args.latency)):
+            start = time.perf_counter()
+            if n <= args.max_sequential:
+                for symbol in symbols:
+                    data_fetcher.get_stock_metrics(symbol)
+                sequential = time.perf_counter() - start
+            else:
+                sequential = float('nan')
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(pool.map(data_fetcher.get_stock_metrics, symbols))
+            threaded = time.perf_counter() - start
+
+            start = time.perf_counter()
+            table = data_fetcher.get_bulk_metrics(symbols)
+            bulk = time.perf_counter() - start
+        assert table['current_price'].notna().all()
+        print(f"{n:>8}{sequential:>20.2f}{threaded:>26.2f}{bulk:>10.2f}{threaded / bulk:>9.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--latency", type=float, default=0.2, help="simulated seconds per yfinance round trip")
+    parser.add_argument("--max-sequential", type=int, default=50,
+                        help="skip the sequential run above this many tickers")
+    main(parser.parse_args())
@@ -0,0 +1,57 @@
+"""Prompt tokens of the pretty-printed JSON context vs the compiled context.
+
+Runs over the recorded research bundles in benchmarks/fixtures (or any files
+given), so no network or API keys are needed.
+
+    python -m benchmarks.bench_context
+    python -m benchmarks.bench_context --news-budget 250 --show
+"""
+import argparse
+import glob
+import json
+import os
+import time
+
+from context_compiler import compile_context, count_tokens, legacy_context
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "research_*.json")
+
+def main(args: argparse.Namespace) -> None:
+    from data_fetcher import ResearchBundle
+
+    paths = args.fixtures or sorted(glob.glob(FIXTURES))
+    print(f"{'ticker':<14}{'before':>8}{'after':>8}{'saved':>8}{'news kept':>11}{'compile ms':>12}")
+    total_before = total_after = 0
+    for path in paths:
+        with open(path) as f:
+            data = json.load(f)
+        research = ResearchBundle.from_dict(data['ticker'], data)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            compiled = compile_context(research.ticker, research, args.news_budget, args.item_budget)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        assert compiled.tokens_before == count_tokens(legacy_context(research.ticker, research))
+        total_before += compiled.tokens_before
+        total_after += compiled.tokens_after
+        news_total = len(research.news.get('news', []))
+        print(f"{research.ticker:<14}{compiled.tokens_before:>8}{compiled.tokens_after:>8}"
+              f"{compiled.saved_ratio:>8.0%}{f'{compiled.news_kept}/{news_total}':>11}{elapsed * 1000:>12.2f}")
+        if args.show:
+            print(compiled.text + "\n")
+
+    # The context goes into every agent's opening prompt
+    print(f"\ncontext tokens per debate ({args.agents} agents): "
+          f"{total_before * args.agents / len(paths):.0f} -> {total_after * args.agents / len(paths):.0f} on average, "
+          f"{1 - total_after / total_before:.0%} fewer")
+
+if __name__ == "__main__":
+    import logging
+    logging.disable(logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("fixtures", nargs="*", help="research bundle JSON files (default: benchmarks/fixtures)")
+    parser.add_argument("--news-budget", type=int, default=400, help="token budget for all news")
+    parser.add_argument("--item-budget", type=int, default=90, help="token budget per news description")
+    parser.add_argument("--agents", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--show", action="store_true", help="print each compiled context")
+    main(parser.parse_args())
@@ -0,0 +1,72 @@
+"""Import time of the library entry points, measured with `python -X importtime`.
+
+Each module is imported in a fresh interpreter several times and the fastest
+run is reported along with the slowest dependencies it pulled in. Also a
+regression guard: exits non-zero if an entry point imports one of the heavy
+dependencies that should only load on first use, or exceeds --max-ms.
+
+    python -m benchmarks.bench_import_time
+    python -m benchmarks.bench_import_time --modules main batch --max-ms 300 --top 10
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINTS = ['main', 'data_fetcher', 'batch', 'custom_agent', 'screener', 'context_compiler']
+# Loaded only when data is fetched, a table is built or an LLM is called
+LAZY = ['yfinance', 'pandas', 'numpy', 'openai', 'httpx', 'tiktoken', 'requests', 'tavily']
+
+def import_profile(module: str) -> Tuple[int, Dict[str, Tuple[int, int]]]:
+    """(cumulative microseconds for module, {imported name: (self us, cumulative us)}) from one cold import"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    imports: Dict[str, Tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        imports[name.strip()] = (int(self_us), int(cumulative_us))
+    return imports.get(module, (0, 0))[1], imports
+
+def main(args: argparse.Namespace) -> int:
+    failures: List[str] = []
+    print(f"{'module':<18}{'best ms':>9}{'modules':>9}  slowest dependencies (cumulative ms)")
+    for module in args.modules:
+        runs = [import_profile(module) for _ in range(args.repeat)]
+        best, imports = min(runs, key=lambda run: run[0])
+        slowest = sorted(((name, cumulative) for name, (_, cumulative) in imports.items() if name != module),
+                         key=lambda item: -item[1])
+        # Only report packages whose parent is not already listed
+        shown, seen = [], set()
+        for name, cumulative in slowest:
+            if name.split('.')[0] in seen:
+                continue
+            seen.add(name.split('.')[0])
+            shown.append(f"{name} {cumulative / 1000:.1f}")
+            if len(shown) == args.top:
+                break
+        print(f"{module:<18}{best / 1000:>9.1f}{len(imports):>9}  {', '.join(shown)}")
+
+        loaded = {name.split('.')[0] for name in imports}
+        eager = sorted(loaded & set(args.lazy))
+        if eager:
+            failures.append(f"import {module} loads {', '.join(eager)} eagerly")
+        if args.max_ms is not None and best / 1000 > args.max_ms:
+            failures.append(f"import {module} took {best / 1000:.1f}ms (budget {args.max_ms}ms)")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", nargs="+", default=ENTRY_POINTS)
+    parser.add_argument("--repeat", type=int, default=5, help="cold imports per module; the fastest is reported")
+    parser.add_argument("--top", type=int, default=5, help="slowest dependencies to list")
+    parser.add_argument("--lazy", nargs="*", default=LAZY, help="packages entry points must not import eagerly")
+    parser.add_argument("--max-ms", type=float, help="fail if any entry point takes longer than this")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,78 @@
+"""Per-call AsyncOpenAI clients vs the shared pooled client.
+
+Replays a debate's worth of agent turns against the local mock server, once
+the old way (a new AsyncOpenAI per turn) and once through Agent with the
+shared LLMClientManager, and reports connections opened and latency per turn.
+
+    python -m benchmarks.bench_llm_client --turns 10 --connect-delay 0.05
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import List
+
+from benchmarks.mock_openai_server import MockOpenAIServer
+
+def _summary(label: str, latencies: List[float], connections: int) -> str:
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return (f"{label:<22} turns={len(latencies):<4} connections={connections:<4} "
+            f"mean={statistics.mean(latencies) * 1000:7.1f}ms "
+            f"p50={statistics.median(latencies) * 1000:7.1f}ms p95={p95 * 1000:7.1f}ms")
+
+async def _per_call_clients(server: MockOpenAIServer, turns: int) -> List[float]:
+    from openai import AsyncOpenAI
+
+    latencies = []
+    for i in range(turns):
+        start = time.perf_counter()
+        client = AsyncOpenAI(api_key="mock", base_url=server.base_url)
+        try:
+            await client.chat.completions.create(
+                model="gpt-4o",
+                messages=[{"role": "user", "content": f"turn {i}"}],
+                max_tokens=60
+            )
+            latencies.append(time.perf_counter() - start)
+        finally:
+            # Otherwise its connection is still open when the mock server shuts down
+            await client.close()
+    return latencies
+
+async def _pooled_client(server: MockOpenAIServer, turns: int) -> List[float]:
+    from custom_agent import Agent
+    from llm_client import configure_llm_client, shutdown_llm_client
+    from response_cache import set_response_cache
+
+    set_response_cache(None)  # measure real calls, not cache replays
+    configure_llm_client(base_url=server.base_url)
+    agent = Agent(name="Bench", persona="", system_prompt="You are a benchmark.")
+    agent.api_key = "mock"
+    latencies = []
+    try:
+        for i in range(turns):
+            start = time.perf_counter()
+            await agent.generate_response(f"turn {i}", max_tokens=60)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        await shutdown_llm_client()
+    return latencies
+
+async def main(args: argparse.Namespace) -> None:
+    os.environ.setdefault("OPENAI_API_KEY", "mock")
+    async with MockOpenAIServer(latency=args.latency, connect_delay=args.connect_delay) as server:
+        latencies = await _per_call_clients(server, args.turns)
+        print(_summary("client per call", latencies, server.connections))
+        server.reset_counters()
+        latencies = await _pooled_client(server, args.turns)
+        print(_summary("shared pooled client", latencies, server.connections))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=10, help="agent turns (5 rounds x 2 agents = 10)")
+    parser.add_argument("--latency", type=float, default=0.02, help="mock time to first token")
+    parser.add_argument("--connect-delay", type=float, default=0.05,
+                        help="mock cost of opening a connection (stands in for TCP+TLS)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,87 @@
+"""Prompt bytes and assembly time for run_debate history, 5 to 100 turns.
+
+Compares the original per-turn re-join of every message against Transcript
+with full history, a history window, and a window plus rolling summary.
+No network or API keys needed.
+
+    python -m benchmarks.bench_transcript
+"""
+import argparse
+import time
+from typing import Callable, Dict, List, Tuple
+
+from transcript import Transcript
+
+TOPIC = "Should we buy AAPL stock? Consider these key metrics and recent news."
+AGENTS = ["Bullish Analyst", "Bearish Analyst"]
+
+def _message(turn: int, agent: str) -> str:
+    return (f"Turn {turn}: as the {agent.lower()} I note that revenue grew while margins shifted. "
+            "Guidance implies steady demand, though valuation and competition remain open questions. " * 2)
+
+def _legacy(turns: int) -> Tuple[int, float]:
+    """The original run_debate assembly: rebuild history from all messages per agent per turn"""
+    messages: List[Dict[str, str]] = []
+    prompt_bytes = 0
+    elapsed = 0.0
+    for i in range(turns):
+        for agent in AGENTS:
+            start = time.perf_counter()
+            current_prompt = TOPIC
+            history = "\n".join([f"{msg['role']}: {msg['content']}" for msg in messages])
+            if history and i > 0:
+                current_prompt += f"\n\nPrevious Discussion:\n{history}"
+            elapsed += time.perf_counter() - start
+            prompt_bytes += len(current_prompt.encode())
+            messages.append({'role': agent, 'content': _message(i, agent)})
+    start = time.perf_counter()
+    conclusion_prompt = f"Based on the following debate about {TOPIC}...\n\nDebate:\n"
+    for msg in messages:
+        conclusion_prompt += f"{msg['role']}: {msg['content']}\n"
+    elapsed += time.perf_counter() - start
+    return prompt_bytes + len(conclusion_prompt.encode()), elapsed
+
+def _with_transcript(make: Callable[[], Transcript]) -> Callable[[int], Tuple[int, float]]:
+    def run(turns: int) -> Tuple[int, float]:
+        transcript = make()
+        prompt_bytes = 0
+        elapsed = 0.0
+        for i in range(turns):
+            for agent in AGENTS:
+                start = time.perf_counter()
+                current_prompt = TOPIC
+                history = transcript.history()
+                if history and i > 0:
+                    current_prompt += f"\n\nPrevious Discussion:\n{history}"
+                elapsed += time.perf_counter() - start
+                prompt_bytes += len(current_prompt.encode())
+                content = _message(i, agent)
+                start = time.perf_counter()
+                transcript.append(agent, content)
+                elapsed += time.perf_counter() - start
+        start = time.perf_counter()
+        conclusion_prompt = f"Based on the following debate about {TOPIC}...\n\nDebate:\n{transcript.history()}\n"
+        elapsed += time.perf_counter() - start
+        return prompt_bytes + len(conclusion_prompt.encode()), elapsed
+    return run
+
+def main(args: argparse.Namespace) -> None:
+    variants = {
+        'legacy re-join': _legacy,
+        'transcript (full)': _with_transcript(lambda: Transcript()),
+        f'window={args.window}': _with_transcript(lambda: Transcript(window=args.window)),
+        f'window={args.window}+summary': _with_transcript(lambda: Transcript(window=args.window, summarize=True)),
+    }
+    print(f"{'variant':<24}{'turns':>6}{'prompt KB':>12}{'assembly ms':>14}")
+    for turns in args.turns:
+        for name, run in variants.items():
+            best = min((run(turns) for _ in range(args.repeat)), key=lambda r: r[1])
+            print(f"{name:<24}{turns:>6}{best[0] / 1024:>12.1f}{best[1] * 1000:>14.3f}")
+        print()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, nargs="+", default=[5, 10, 25, 50, 100])
+    parser.add_argument("--window", type=int, default=6, help="messages kept verbatim")
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,144 @@
+"""CPU-bound batch stages inline vs in a workers.WorkerPool.
+
+Stages:
+    context     compile_context over the research fixtures, replicated per ticker
+    conclusion  build_conclusion over synthetic debate transcripts
+    screen      screen() vs screen_parallel() over a synthetic metrics table
+
+Pool start-up is excluded (each pool is warmed before timing) and every
+parallel result is checked against the inline one. Speedup is bounded by
+the cores available; with one core expect IPC overhead, not gains.
+
+    python -m benchmarks.bench_workers
+    python -m benchmarks.bench_workers --workers 1 2 4 8 --tickers 4000 --rows 2000000
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List
+
+from benchmarks.bench_context import FIXTURES
+
+STAGES = ('context', 'conclusion', 'screen')
+
+def _research_items(count: int) -> List[tuple]:
+    from data_fetcher import ResearchBundle
+
+    bundles = []
+    for path in sorted(glob.glob(FIXTURES)):
+        with open(path) as f:
+            data = json.load(f)
+        bundles.append(ResearchBundle.from_dict(data['ticker'], data))
+    return [(f"{bundles[i % len(bundles)].ticker}-{i}", bundles[i % len(bundles)]) for i in range(count)]
+
+def _transcript_items(count: int, turns: int) -> List[tuple]:
+    items = []
+    for i in range(count):
+        messages = []
+        for turn in range(turns):
+            for role, view in (("Bullish Agent", "upside"), ("Bearish Agent", "downside")):
+                messages.append({'role': role, 'content': f"Round {turn} argues {view} for T{i} on margins. "
+                                                          f"Supporting detail {turn * 7 + i % 5}. " * 3})
+        if i % 3 == 0:
+            messages.append({'role': "Bullish Agent", 'content': f"Final rebuttal for T{i}. Momentum persists."})
+        items.append((f"T{i}", messages))
+    return items
+
+def _metrics_table(rows: int):
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    low = rng.uniform(5, 50, rows)
+    high = low * rng.uniform(1.2, 3.0, rows)
+    return pd.DataFrame({
+        'current_price': rng.uniform(low, high),
+        '52_week_high': high,
+        '52_week_low': low,
+        'volume': rng.lognormal(13, 1, rows),
+        'avg_volume': rng.lognormal(13, 0.5, rows),
+        'pe_ratio': np.round(rng.normal(22, 12, rows), 2)
+    }, index=[f"T{i:07d}" for i in range(rows)])
+
+def _warm_up() -> None:
+    """Start a worker and import the stage modules so neither is timed"""
+    import context_compiler, data_fetcher, scoring, screener  # noqa: F401
+    import pandas  # noqa: F401
+    time.sleep(0.2)  # hold this worker so the next warm-up task starts another
+
+def _timed(fn: Callable[[], Any]) -> tuple:
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+async def _timed_async(coro) -> tuple:
+    start = time.perf_counter()
+    result = await coro
+    return result, time.perf_counter() - start
+
+async def main(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    from context_compiler import compile_context
+    from scoring import build_conclusion
+    from screener import screen, screen_parallel
+    from workers import WorkerPool
+
+    inputs = {
+        'context': _research_items(args.tickers) if 'context' in args.stages else None,
+        'conclusion': _transcript_items(args.tickers, args.turns) if 'conclusion' in args.stages else None,
+        'screen': _metrics_table(args.rows) if 'screen' in args.stages else None,
+    }
+    inline = {}
+    if 'context' in args.stages:
+        inline['context'] = _timed(lambda: [compile_context(*item) for item in inputs['context']])
+    if 'conclusion' in args.stages:
+        inline['conclusion'] = _timed(lambda: [build_conclusion(*item) for item in inputs['conclusion']])
+    if 'screen' in args.stages:
+        inline['screen'] = _timed(lambda: screen(inputs['screen']))
+
+    print(f"cores: {os.cpu_count()}")
+    print(f"{'stage':<12}{'items':>10}{'workers':>9}{'seconds':>10}{'speedup':>9}")
+    results = []
+    for stage in args.stages:
+        items = len(inputs[stage])
+        print(f"{stage:<12}{items:>10}{'inline':>9}{inline[stage][1]:>10.3f}{1.0:>9.2f}")
+        results.append({'stage': stage, 'items': items, 'workers': 0, 'seconds': inline[stage][1], 'speedup': 1.0})
+    for workers in args.workers:
+        with WorkerPool(workers) as pool:
+            await pool.map(_warm_up, [()] * workers, chunksize=1)
+            for stage in args.stages:
+                if stage == 'context':
+                    result, seconds = await _timed_async(pool.map(compile_context, inputs['context']))
+                    same = [c.text for c in result] == [c.text for c in inline['context'][0]]
+                elif stage == 'conclusion':
+                    result, seconds = await _timed_async(pool.map(build_conclusion, inputs['conclusion']))
+                    same = result == inline['conclusion'][0]
+                else:
+                    result, seconds = await _timed_async(
+                        screen_parallel(inputs['screen'], pool=pool, rows_per_task=args.rows_per_task))
+                    same = result.equals(inline['screen'][0])
+                if not same:
+                    raise RuntimeError(f"{stage} with {workers} workers differs from the inline result")
+                speedup = inline[stage][1] / seconds if seconds else float('inf')
+                print(f"{stage:<12}{len(inputs[stage]):>10}{workers:>9}{seconds:>10.3f}{speedup:>9.2f}")
+                results.append({'stage': stage, 'items': len(inputs[stage]), 'workers': workers,
+                                'seconds': seconds, 'speedup': speedup})
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'cores': os.cpu_count(), 'results': results}, f, indent=2)
+    return results
+
+if __name__ == "__main__":
+    import logging
+    logging.disable(logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--tickers", type=int, default=2000, help="research bundles / transcripts per stage")
+    parser.add_argument("--turns", type=int, default=5, help="debate rounds per synthetic transcript")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="rows in the synthetic metrics table")
+    parser.add_argument("--rows-per-task", type=int, default=250_000, help="screen rows per task at least; smaller tables are screened inline")
+    parser.add_argument("--json", help="also write results here")
+    asyncio.run(main(parser.parse_args()))
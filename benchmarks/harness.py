@@ -0,0 +1,75 @@
+"""Shared plumbing for end-to-end benchmarks: offline services, percentiles, memory.
+
+offline_services() starts the mock OpenAI server and swaps yfinance and Tavily
+for the stubs, so StockDebateSystem runs unchanged with no network and no API
+keys. Rate limits are lifted because the stubs already model provider latency.
+"""
+import os
+import tracemalloc
+from contextlib import ExitStack, asynccontextmanager, contextmanager
+from typing import Any, Dict, List
+
+from benchmarks.mock_openai_server import MockOpenAIServer
+from benchmarks.stubs import StubTavily, StubYFinance, patched_tavily, patched_yfinance
+
+def percentile(values: List[float], q: float) -> float:
+    """Linear-interpolated percentile, q in [0, 100]"""
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    return {
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'mean': sum(latencies) / len(latencies) if latencies else float('nan'),
+        'max': max(latencies) if latencies else float('nan')
+    }
+
+@contextmanager
+def track_memory(enabled: bool = True):
+    """Yields a dict whose 'peak_bytes' is filled in on exit (tracemalloc adds some CPU overhead)"""
+    result: Dict[str, Any] = {'peak_bytes': None}
+    if not enabled:
+        yield result
+        return
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        yield result
+    finally:
+        result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        if started_here:
+            tracemalloc.stop()
+
+def lift_rate_limits() -> None:
+    from rate_limit import configure_rate_limit
+    for provider in ('openai', 'tavily', 'yfinance'):
+        configure_rate_limit(provider, requests_per_second=1e6, burst=1e6)
+
+@asynccontextmanager
+async def offline_services(llm_latency: float = 0.3, tokens_per_second: float = 60.0, connect_delay: float = 0.05,
+                           yfinance_latency: float = 0.25, tavily_latency: float = 0.8):
+    """Run the app against local stand-ins; yields (mock server, yfinance stub, tavily stub)"""
+    from llm_client import configure_llm_client, shutdown_llm_client
+
+    os.environ.setdefault("OPENAI_API_KEY", "mock")  # agents read the key at construction
+    lift_rate_limits()
+    yfinance, tavily = StubYFinance(latency=yfinance_latency), StubTavily(latency=tavily_latency)
+    async with MockOpenAIServer(latency=llm_latency, tokens_per_second=tokens_per_second,
+                                connect_delay=connect_delay) as server:
+        configure_llm_client(base_url=server.base_url)
+        with ExitStack() as stack:
+            stack.enter_context(patched_yfinance(yfinance))
+            stack.enter_context(patched_tavily(tavily))
+            try:
+                yield server, yfinance, tavily
+            finally:
+                await shutdown_llm_client()
@@ -0,0 +1,188 @@
+"""Local OpenAI-compatible chat completions server for offline benchmarks.
+
+Implements POST /v1/chat/completions (plain and SSE streaming) over HTTP/1.1
+keep-alive using only the standard library. Replies are deterministic for a
+given request, arrive after a configurable time-to-first-token and then at a
+configurable token rate. Connection and request counters make connection
+reuse visible.
+
+    python -m benchmarks.mock_openai_server --port 8100 --latency 0.2
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+_SENTENCES = [
+    "Revenue growth has stayed ahead of the sector for several quarters.",
+    "Margins look stretched if input costs keep rising.",
+    "The balance sheet carries little debt and plenty of cash.",
+    "Valuation already prices in most of the expected upside.",
+    "New product launches should support demand next year.",
+    "Regulatory scrutiny is a growing overhang on the shares.",
+    "Volume has picked up, which suggests institutions are paying attention.",
+    "Competition is intensifying in the core market.",
+    "Management has a record of beating guidance.",
+    "Currency moves could weigh on reported earnings.",
+    "Buybacks provide a steady floor under the share price.",
+    "The stock trades near the top of its 52-week range.",
+]
+
+class MockOpenAIServer:
+    def __init__(self,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 latency: float = 0.05,
+                 tokens_per_second: float = 500.0,
+                 connect_delay: float = 0.0,
+                 reply_sentences: int = 3):
+        self.host = host
+        self.port = port
+        self.latency = latency                  # seconds before the first token
+        self.tokens_per_second = tokens_per_second
+        self.connect_delay = connect_delay      # emulates TCP+TLS setup on new connections
+        self.reply_sentences = reply_sentences
+        self.connections = 0
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    async def start(self) -> "MockOpenAIServer":
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def __aenter__(self) -> "MockOpenAIServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    def reset_counters(self) -> None:
+        self.connections = 0
+        self.requests = 0
+
+    def reply_for(self, payload: Dict[str, Any]) -> List[str]:
+        """Deterministic reply tokens for a request"""
+        digest = hashlib.sha256(json.dumps(payload.get('messages', []), sort_keys=True).encode()).digest()
+        sentences = [_SENTENCES[b % len(_SENTENCES)] for b in digest[:self.reply_sentences]]
+        words = " ".join(sentences).split(" ")
+        max_tokens = payload.get('max_tokens') or len(words)
+        return [w if i == 0 else " " + w for i, w in enumerate(words[:max_tokens])]
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        if self.connect_delay:
+            await asyncio.sleep(self.connect_delay)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, value = line.decode('latin-1').split(':', 1)
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0) or 0))
+                self.requests += 1
+
+                if method == 'POST' and path.split('?')[0].rstrip('/').endswith('/chat/completions'):
+                    payload = json.loads(body or b'{}')
+                    if payload.get('stream'):
+                        await self._stream_completion(writer, payload)
+                    else:
+                        await self._completion(writer, payload)
+                else:
+                    self._write_json(writer, 404, {'error': {'message': f"No route for {method} {path}"}})
+                    await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+
+    def _write_json(self, writer: asyncio.StreamWriter, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode()
+        reason = {200: 'OK', 404: 'Not Found'}.get(status, 'Error')
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\nConnection: keep-alive\r\n\r\n".encode() + data
+        )
+
+    def _usage(self, payload: Dict[str, Any], completion_tokens: int) -> Dict[str, int]:
+        prompt_tokens = sum(len(str(m.get('content', ''))) for m in payload.get('messages', [])) // 4
+        return {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens}
+
+    async def _completion(self, writer: asyncio.StreamWriter, payload: Dict[str, Any]) -> None:
+        tokens = self.reply_for(payload)
+        await asyncio.sleep(self.latency + len(tokens) / self.tokens_per_second)
+        self._write_json(writer, 200, {
+            'id': f"chatcmpl-mock-{self.requests}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': payload.get('model', 'mock'),
+            'choices': [{'index': 0, 'finish_reason': 'stop',
+                         'message': {'role': 'assistant', 'content': "".join(tokens)}}],
+            'usage': self._usage(payload, len(tokens))
+        })
+        await writer.drain()
+
+    async def _stream_completion(self, writer: asyncio.StreamWriter, payload: Dict[str, Any]) -> None:
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+            b"Transfer-Encoding: chunked\r\nConnection: keep-alive\r\n\r\n"
+        )
+        base = {'id': f"chatcmpl-mock-{self.requests}", 'object': 'chat.completion.chunk',
+                'created': int(time.time()), 'model': payload.get('model', 'mock')}
+
+        def event(data: str) -> None:
+            raw = f"data: {data}\n\n".encode()
+            writer.write(f"{len(raw):x}\r\n".encode() + raw + b"\r\n")
+
+        tokens = self.reply_for(payload)
+        await asyncio.sleep(self.latency)
+        for token in tokens:
+            event(json.dumps({**base, 'choices': [{'index': 0, 'delta': {'content': token}, 'finish_reason': None}]}))
+            await writer.drain()
+            await asyncio.sleep(1 / self.tokens_per_second)
+        event(json.dumps({**base, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]}))
+        if (payload.get('stream_options') or {}).get('include_usage'):
+            event(json.dumps({**base, 'choices': [], 'usage': self._usage(payload, len(tokens))}))
+        event("[DONE]")
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+async def _serve(args: argparse.Namespace) -> None:
+    server = MockOpenAIServer(host=args.host, port=args.port, latency=args.latency,
+                              tokens_per_second=args.tokens_per_second, connect_delay=args.connect_delay)
+    await server.start()
+    print(f"Mock OpenAI server listening on {server.base_url}")
+    await asyncio.Event().wait()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=500.0)
+    parser.add_argument("--connect-delay", type=float, default=0.0, help="extra setup cost per new connection")
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
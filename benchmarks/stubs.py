@@ -0,0 +1,193 @@
+"""Offline stand-ins for the yfinance and Tavily modules used by benchmarks.
+
+Every synthetic series is derived from the ticker symbol, so per-ticker
+`Ticker(...).info` and bulk `download(...)` agree with each other and across
+runs. Tavily results come from the recorded research bundles in
+benchmarks/fixtures when one exists for the ticker, and are otherwise built
+from the symbol. Latencies are simulated with sleeps to model network round
+trips.
+"""
+import glob
+import json
+import os
+import sys
+import time
+import types
+import zlib
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+@lru_cache(maxsize=None)
+def _series(symbol: str) -> pd.DataFrame:
+    """Deterministic one-year OHLCV history for a symbol"""
+    rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+    start = rng.uniform(20, 900)
+    close = start * np.exp(np.cumsum(rng.normal(0, 0.018, TRADING_DAYS)))
+    high = close * (1 + rng.uniform(0, 0.02, TRADING_DAYS))
+    low = close * (1 - rng.uniform(0, 0.02, TRADING_DAYS))
+    base_volume = rng.uniform(2e5, 5e7)
+    volume = np.round(base_volume * rng.lognormal(0, 0.35, TRADING_DAYS))
+    dates = pd.bdate_range(end=pd.Timestamp("2024-06-28"), periods=TRADING_DAYS)
+    return pd.DataFrame({'Open': close, 'High': high, 'Low': low, 'Close': close,
+                         'Adj Close': close, 'Volume': volume}, index=dates)
+
+@lru_cache(maxsize=None)
+def _info(symbol: str) -> Dict[str, Any]:
+    history = _series(symbol)
+    rng = np.random.default_rng(zlib.crc32(symbol.encode()) + 1)
+    price = float(history['Close'].iloc[-1])
+    return {
+        'currentPrice': price,
+        'trailingPE': float(rng.uniform(5, 80)),
+        'marketCap': int(price * rng.uniform(1e8, 1e10)),
+        'fiftyTwoWeekHigh': float(history['High'].max()),
+        'fiftyTwoWeekLow': float(history['Low'].min()),
+        'volume': int(history['Volume'].iloc[-1]),
+        'averageVolume': int(history['Volume'].tail(63).mean()),
+        'currency': 'INR' if symbol.endswith(('.NS', '.BO')) else 'USD',
+    }
+
+class _StubTicker:
+    def __init__(self, stub: "StubYFinance", symbol: str):
+        self._stub = stub
+        self.ticker = symbol
+        self._info = None
+
+    @property
+    def info(self) -> Dict[str, Any]:
+        if self._info is None:
+            self._stub.calls += 1
+            time.sleep(self._stub.latency)
+            self._info = dict(_info(self.ticker))
+        return self._info
+
+class StubYFinance:
+    """Module-shaped yfinance replacement: Ticker, Tickers and download"""
+
+    def __init__(self, latency: float = 0.25, per_ticker_latency: float = 0.002):
+        self.latency = latency                        # one HTTP round trip
+        self.per_ticker_latency = per_ticker_latency  # extra payload cost per symbol in bulk calls
+        self.calls = 0
+
+    def Ticker(self, symbol: str) -> _StubTicker:
+        return _StubTicker(self, symbol)
+
+    def Tickers(self, symbols: str):
+        names = symbols.split() if isinstance(symbols, str) else list(symbols)
+        return type("Tickers", (), {'tickers': {s: self.Ticker(s) for s in names}})()
+
+    def download(self, tickers: List[str], group_by: str = "column", **kwargs) -> pd.DataFrame:
+        tickers = tickers.split() if isinstance(tickers, str) else list(tickers)
+        self.calls += 1
+        time.sleep(self.latency + self.per_ticker_latency * len(tickers))
+        frames = {symbol: _series(symbol) for symbol in tickers}
+        history = pd.concat(frames, axis=1)  # columns: (ticker, field)
+        if group_by != "ticker":
+            history = history.swaplevel(axis=1).sort_index(axis=1)
+        return history
+
+@contextmanager
+def patched_yfinance(stub: StubYFinance):
+    """Point data_fetcher at the stub for the duration of the block"""
+    import data_fetcher
+    original = data_fetcher.yf
+    data_fetcher.yf = stub
+    try:
+        yield stub
+    finally:
+        data_fetcher.yf = original
+
+_FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "research_*.json")
+
+@lru_cache(maxsize=None)
+def _recorded_news() -> Dict[str, List[Dict[str, Any]]]:
+    news = {}
+    for path in glob.glob(_FIXTURES):
+        with open(path) as f:
+            data = json.load(f)
+        news[data['ticker']] = data['news'].get('news', [])
+    return news
+
+_NEWS_THEMES = [
+    ("{s} quarterly revenue {verb} {x:.1f}% as demand {trend}",
+     "{s} reported quarterly revenue {verb} {x:.1f}% from a year earlier, against analyst expectations of "
+     "{y:.1f}%. Management said demand was {trend} and kept its full-year outlook unchanged. "
+     "Subscribe for more market coverage."),
+    ("Analyst sets {s} price target at {p:.0f}",
+     "A brokerage set a price target of {p:.0f} on {s}, citing margin expansion and a cleaner balance sheet. "
+     "Another firm kept a neutral rating, warning that the stock trades at {pe:.1f} times earnings. "
+     "Follow us for the latest ratings changes."),
+    ("{s} faces regulatory review over pricing practices",
+     "Regulators opened a review of {s}'s pricing practices, which could lead to fines of up to {z:.0f}% of "
+     "annual revenue. The company said it complies with all applicable rules. Shares fell {w:.1f}% on the report."),
+    ("{s} announces {b:.1f} billion buyback and new product line",
+     "{s} announced a share buyback of {b:.1f} billion and unveiled a new product line aimed at enterprise "
+     "customers. Executives expect the launch to contribute to growth from next year. Click here to read more."),
+    ("Chief financial officer of {s} to step down",
+     "{s} said its chief financial officer will leave at the end of the quarter, and that a search for a "
+     "successor is under way. Investors will watch whether guidance changes under new leadership."),
+]
+
+def _synthetic_news(symbol: str, count: int) -> List[Dict[str, Any]]:
+    rng = np.random.default_rng(zlib.crc32(symbol.encode()) + 2)
+    growth = rng.uniform(-15, 25)
+    values = dict(s=symbol, x=abs(growth), y=growth + rng.uniform(-3, 3), verb="rose" if growth > 0 else "fell",
+                  trend="steady" if growth > 0 else "soft", p=_info(symbol)['currentPrice'] * rng.uniform(0.8, 1.3),
+                  pe=_info(symbol)['trailingPE'], z=rng.uniform(2, 10), w=rng.uniform(1, 6), b=rng.uniform(1, 50))
+    themes = rng.permutation(len(_NEWS_THEMES))[:count]
+    return [{
+        'title': _NEWS_THEMES[i][0].format(**values),
+        'url': f"https://news.example.com/{symbol.lower()}/{i}",
+        'content': _NEWS_THEMES[i][1].format(**values)
+    } for i in themes]
+
+class StubTavilyClient:
+    """TavilyClient replacement; search() returns Tavily-shaped results after a delay"""
+
+    def __init__(self, stub: "StubTavily", api_key: str = ""):
+        self._stub = stub
+
+    def search(self, query: str, search_depth: str = "basic", max_results: int = 5, **kwargs) -> Dict[str, Any]:
+        self._stub.calls += 1
+        time.sleep(self._stub.latency)
+        symbol = query.split()[0]
+        recorded = _recorded_news().get(symbol)
+        if recorded:
+            results = [{'title': r['title'], 'url': r['url'], 'content': r['description']} for r in recorded]
+        else:
+            results = _synthetic_news(symbol, max_results)
+        return {'query': query, 'results': results[:max_results]}
+
+class StubTavily:
+    def __init__(self, latency: float = 0.8):
+        self.latency = latency  # Tavily searches are typically slower than quote lookups
+        self.calls = 0
+
+    def module(self) -> types.ModuleType:
+        """A stand-in `tavily` module whose TavilyClient shares this stub's settings"""
+        module = types.ModuleType("tavily")
+        module.TavilyClient = lambda api_key="", **kwargs: StubTavilyClient(self, api_key)
+        return module
+
+@contextmanager
+def patched_tavily(stub: StubTavily):
+    """Serve `from tavily import TavilyClient` from the stub, with a dummy API key"""
+    import data_fetcher
+    original_module = sys.modules.get("tavily")
+    original_key = data_fetcher.TAVILY_API_KEY
+    sys.modules["tavily"] = stub.module()
+    data_fetcher.TAVILY_API_KEY = original_key or "stub"
+    try:
+        yield stub
+    finally:
+        data_fetcher.TAVILY_API_KEY = original_key
+        if original_module is None:
+            sys.modules.pop("tavily", None)
+        else:
+            sys.modules["tavily"] = original_module
@@ -0,0 +1,229 @@
+"""Compact research context for debate prompts.
+
+The research context is sent to every agent on every turn, so its size is paid
+for many times per debate. compile_context renders metrics as one short line,
+drops duplicate news, trims each description to its most informative sentences
+and keeps the news within a token budget. compile_delta_context does the same
+for a follow-up round that only argues what changed since a stored analysis.
+"""
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+_ENCODING = None  # tiktoken encoding, loaded on the first count_tokens call
+_ENCODING_LOADED = False
+
+NEWS_TOKEN_BUDGET = int(os.getenv("CONTEXT_NEWS_TOKENS", "400"))
+ITEM_TOKEN_BUDGET = int(os.getenv("CONTEXT_ITEM_TOKENS", "90"))
+DUPLICATE_THRESHOLD = 0.6  # share of the shorter article's words found in another before it counts as the same story
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"[a-z]+|\d+(?:\.\d+)?%?")
+_NUMBER = re.compile(r"\d")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with".split()
+)
+# Sentences with these words tend to carry the actual news for a stock debate
+_SIGNAL_WORDS = frozenset(
+    "revenue earnings profit margin guidance forecast growth sales eps dividend buyback upgrade downgrade "
+    "target rating beat miss quarter quarterly outlook demand debt loss acquisition deal lawsuit "
+    "regulator shares stock surged jumped fell dropped plunged rallied".split()
+)
+# Page furniture scraped along with the article text
+_BOILERPLATE = re.compile(
+    r"(subscribe|sign up|newsletter|cookie|all rights reserved|click here|read more|advertisement|"
+    r"follow us|terms of (use|service)|privacy policy)", re.IGNORECASE
+)
+
+def _encoding():
+    global _ENCODING, _ENCODING_LOADED
+    if not _ENCODING_LOADED:
+        _ENCODING_LOADED = True
+        try:
+            import tiktoken
+            _ENCODING = tiktoken.get_encoding("o200k_base")
+        except Exception:  # optional: fall back to a character estimate
+            _ENCODING = None
+    return _ENCODING
+
+def count_tokens(text: str) -> int:
+    """Token count with tiktoken when installed, otherwise ~4 characters per token"""
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return (len(text) + 3) // 4
+
+@dataclass
+class CompiledContext:
+    text: str
+    tokens_before: int
+    tokens_after: int
+    news_kept: int = 0
+    news_dropped: Dict[str, int] = field(default_factory=dict)  # reason -> count
+
+    @property
+    def saved_ratio(self) -> float:
+        return 1 - self.tokens_after / self.tokens_before if self.tokens_before else 0.0
+
+def legacy_context(ticker: str, research: Any) -> str:
+    """The original pretty-printed JSON context, kept for comparison"""
+    context = f"--- Start Context for {ticker} ---\n"
+    context += f"Metrics: {json.dumps(research.get('metrics', {}), indent=2)}\n\n"
+    context += f"News: {json.dumps((research.get('news') or {}).get('news', []), indent=2)}\n\n"
+    context += f"--- End Context for {ticker} ---"
+    return context
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _short(value: float) -> str:
+    """1234567 -> 1.23M"""
+    for divisor, suffix in ((1e12, "T"), (1e9, "B"), (1e6, "M"), (1e3, "K")):
+        if abs(value) >= divisor:
+            return f"{value / divisor:.2f}{suffix}"
+    return f"{value:.2f}"
+
+def format_metrics(metrics: Dict[str, Any], ticker: str) -> str:
+    """One line of metrics plus the two ratios agents otherwise work out themselves"""
+    if not metrics or metrics.get('error'):
+        return f"Metrics: unavailable ({metrics.get('error', 'no data') if metrics else 'no data'})"
+    currency = metrics.get('currency') or ('INR' if ticker.endswith(('.NS', '.BO')) else 'USD')
+    price, pe = _number(metrics.get('current_price')), _number(metrics.get('pe_ratio'))
+    cap = _number(metrics.get('market_cap'))
+    high, low = _number(metrics.get('52_week_high')), _number(metrics.get('52_week_low'))
+    volume, avg_volume = _number(metrics.get('volume')), _number(metrics.get('avg_volume'))
+
+    parts = [f"price {price:.2f} {currency}" if price is not None else "price n/a",
+             f"P/E {pe:.1f}" if pe is not None else "P/E n/a"]
+    if cap is not None:
+        parts.append(f"mkt cap {_short(cap)}")
+    if high is not None and low is not None:
+        position = f", at {(price - low) / (high - low):.0%} of range" if price is not None and high > low else ""
+        parts.append(f"52w {low:.2f}-{high:.2f}{position}")
+    if volume is not None:
+        ratio = f", {volume / avg_volume:.2f}x avg" if avg_volume else ""
+        parts.append(f"vol {_short(volume)}{ratio}")
+    return "Metrics: " + "; ".join(parts)
+
+def _words(text: str) -> set:
+    return {w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS}
+
+def _jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+def _overlap(a: set, b: set) -> float:
+    """Like Jaccard, but a shortened rewrite of an article still matches the original"""
+    return len(a & b) / min(len(a), len(b)) if a and b else 0.0
+
+def trim_description(text: str, max_tokens: int, focus: set = frozenset()) -> str:
+    """Keep the most informative sentences, in their original order, within max_tokens.
+
+    Sentences score for numbers, financial signal words and words from the
+    title/ticker (focus); boilerplate and repeated sentences are dropped.
+    """
+    sentences = [s.strip() for s in _SENTENCE_END.split(" ".join(text.split())) if s.strip()]
+    scored, seen = [], []
+    for index, sentence in enumerate(sentences):
+        words = _words(sentence)
+        if not words or _BOILERPLATE.search(sentence) or any(_jaccard(words, w) > 0.8 for w in seen):
+            continue
+        seen.append(words)
+        score = (2 * bool(_NUMBER.search(sentence)) + len(words & _SIGNAL_WORDS) + len(words & focus)
+                 + (1 if index == 0 else 0))  # leads usually summarise the story
+        scored.append((score / len(words) ** 0.5, index, sentence))
+
+    kept, used = [], 0
+    for _, index, sentence in sorted(scored, key=lambda s: (-s[0], s[1])):
+        cost = count_tokens(sentence) + 1
+        if used + cost > max_tokens:
+            continue
+        kept.append((index, sentence))
+        used += cost
+    if not kept and scored:
+        # Nothing fits whole: cut the best sentence at a word boundary
+        sentence = max(scored, key=lambda s: s[0])[2]
+        return sentence[:max_tokens * 4].rsplit(" ", 1)[0] + "..."
+    return " ".join(sentence for _, sentence in sorted(kept))
+
+def compile_news(items: List[Dict[str, Any]], ticker: str, budget: int = NEWS_TOKEN_BUDGET,
+                 item_budget: int = ITEM_TOKEN_BUDGET) -> tuple:
+    """Deduplicated, trimmed news lines within budget tokens; returns (lines, dropped counts)"""
+    dropped = {'duplicate': 0, 'budget': 0}
+    lines, seen_urls, seen_words, used = [], set(), [], 0
+    ticker_words = _words(ticker.split('.')[0])
+    for item in items:
+        title = " ".join(str(item.get('title') or '').split())
+        description = str(item.get('description') or '')
+        url = str(item.get('url') or '').split('?')[0].rstrip('/')
+        words = _words(title + " " + description)
+        if (url and url != '#' and url in seen_urls) or any(_overlap(words, w) > DUPLICATE_THRESHOLD for w in seen_words):
+            dropped['duplicate'] += 1
+            continue
+        seen_urls.add(url)
+        seen_words.append(words)
+
+        summary = trim_description(description, item_budget, _words(title) | ticker_words)
+        line = f"- {title}" + (f" ({item['date']})" if item.get('date') else "") + (f": {summary}" if summary else "")
+        cost = count_tokens(line) + 1
+        if used + cost > budget:
+            dropped['budget'] += 1
+            continue
+        lines.append(line)
+        used += cost
+    return lines, dropped
+
+def compile_context(ticker: str, research: Any, news_budget: int = NEWS_TOKEN_BUDGET,
+                    item_budget: int = ITEM_TOKEN_BUDGET) -> CompiledContext:
+    """Build the debate context for a ResearchBundle (or legacy research dict)"""
+    news = research.get('news') or {}
+    lines, dropped = compile_news(news.get('news', []), ticker, news_budget, item_budget)
+    text = f"Context for {ticker}\n{format_metrics(research.get('metrics') or {}, ticker)}\n"
+    if lines:
+        text += "News:\n" + "\n".join(lines)
+    else:
+        text += f"News: unavailable ({news['error']})" if news.get('error') else "News: none found"
+
+    compiled = CompiledContext(
+        text=text,
+        tokens_before=count_tokens(legacy_context(ticker, research)),
+        tokens_after=count_tokens(text),
+        news_kept=len(lines),
+        news_dropped={reason: n for reason, n in dropped.items() if n}
+    )
+    logging.info(f"Context for {ticker}: {compiled.tokens_before} -> {compiled.tokens_after} tokens "
+                 f"({compiled.saved_ratio:.0%} smaller), {compiled.news_kept} news kept, dropped {compiled.news_dropped}")
+    return compiled
+
+def compile_delta_context(ticker: str, research: Any, previous: Dict[str, Any], new_news: List[Dict[str, Any]],
+                          news_budget: int = NEWS_TOKEN_BUDGET, item_budget: int = ITEM_TOKEN_BUDGET) -> CompiledContext:
+    """Context for a short follow-up debate: the stored conclusion and closing
+    arguments, then and now metrics, and only the stories that are new"""
+    previous_research = previous.get('research') or {}
+    conclusion = (previous.get('conclusion') or '').split('\n')[0]
+    text = f"Update for {ticker} since our last analysis\nPrevious conclusion: {conclusion or 'unknown'}\n"
+    closing = {}
+    for message in previous.get('messages', []):
+        closing[message['role']] = message['content']
+    if closing:
+        text += "Closing arguments then:\n" + "\n".join(
+            f"- {role}: {trim_description(content, item_budget)}" for role, content in closing.items()) + "\n"
+    text += f"Then: {format_metrics(previous_research.get('metrics') or {}, ticker)}\n"
+    text += f"Now: {format_metrics(research.get('metrics') or {}, ticker)}\n"
+    lines, dropped = compile_news(new_news, ticker, news_budget, item_budget)
+    text += ("New news:\n" + "\n".join(lines)) if lines else "New news: none"
+
+    compiled = CompiledContext(
+        text=text,
+        tokens_before=count_tokens(legacy_context(ticker, research)),
+        tokens_after=count_tokens(text),
+        news_kept=len(lines),
+        news_dropped={reason: n for reason, n in dropped.items() if n}
+    )
+    logging.info(f"Delta context for {ticker}: {compiled.tokens_after} tokens, {compiled.news_kept} new stories")
+    return compiled
@@ -1,47 +1,93 @@
 import os
-from typing import Optional, Dict, Any
+import asyncio
+from typing import Optional, Dict, Any, AsyncIterator
+from llm_client import get_llm_manager
+from response_cache import get_response_cache
+from transcript import Transcript
+from debate_controller import DebateController
+from telemetry import span
+
+async def complete_text(request: Dict[str, Any], api_key: Optional[str] = None, fresh: bool = False) -> str:
+    """Non-streaming completion text, served from the response cache when possible.
+
+    fresh=True always calls the model (the new response is still cached).
+    """
+    cache = get_response_cache()
+    cached = cache.lookup(request) if cache and not fresh else None
+    if cached is not None:
+        return cached
+    response = await get_llm_manager().chat(api_key=api_key, **request)
+    content = response.choices[0].message.content
+    if cache:
+        cache.store(request, content)
+    return content
+
+async def stream_text(request: Dict[str, Any], api_key: Optional[str] = None,
+                      fresh: bool = False) -> AsyncIterator[str]:
+    """Yield completion text as it streams; a cached response is replayed in one piece unless fresh"""
+    cache = get_response_cache()
+    cached = cache.lookup(request) if cache and not fresh else None
+    if cached is not None:
+        yield cached
+        return
+    parts = []
+    async for chunk in get_llm_manager().chat_stream(api_key=api_key, **request):
+        content = chunk.choices[0].delta.content if chunk.choices else None
+        if content:
+            parts.append(content)
+            yield content
+    if cache:
+        cache.store(request, "".join(parts))
 
 class Agent:
     def __init__(self, 
                  name: str,
                  persona: str,
                  system_prompt: str,
-                 tools: Optional[list] = None):
+                 tools: Optional[list] = None,
+                 model: str = "gpt-4o",
+                 temperature: float = 0.7):
         self.name = name
         self.persona = persona
         self.system_prompt = system_prompt
         self.tools = tools or []
+        self.model = model
+        self.temperature = temperature
         self.api_key = os.getenv("OPENAI_API_KEY")
+
+    def _request(self, prompt: str, max_tokens: int) -> Dict[str, Any]:
+        return dict(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=max_tokens,
+            temperature=self.temperature
+        )
         
-    async def generate_response(self, prompt: str, max_tokens: int = 1000, stream: bool = False):
-        """Generate response using OpenAI API"""
-        from openai import AsyncOpenAI
-        
-        client = AsyncOpenAI(api_key=self.api_key)
-        
+    async def generate_response(self, prompt: str, max_tokens: int = 1000, stream: bool = False,
+                                fresh: bool = False):
+        """Generate response using OpenAI API.
+
+        With stream=True the raw, uncached chunk stream is returned; use
+        stream_response for cached text streaming.
+        """
+        request = self._request(prompt, max_tokens)
         if stream:
-            response = await client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=max_tokens,
-                temperature=0.7,
-                stream=True
-            )
-            return response
-        else:
-            response = await client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=max_tokens,
-                temperature=0.7
-            )
-            return response.choices[0].message.content
+            return get_llm_manager().chat_stream(api_key=self.api_key, **request)
+        return await complete_text(request, api_key=self.api_key, fresh=fresh)
+
+    def stream_response(self, prompt: str, max_tokens: int = 1000, fresh: bool = False) -> AsyncIterator[str]:
+        """Stream response text, replaying it from the response cache when possible"""
+        return stream_text(self._request(prompt, max_tokens), api_key=self.api_key, fresh=fresh)
+
+# How agent turns within a round are scheduled:
+#   sequential        - one agent at a time; later agents see earlier replies in the same round
+#   parallel_openings - the opening round (where every agent gets the same prompt) runs
+#                       concurrently, later rounds are sequential; same output as sequential
+#   simultaneous      - every round runs concurrently and agents answer the previous round
+DEBATE_SCHEDULES = ('sequential', 'parallel_openings', 'simultaneous')
 
 class AgentSystem:
     def __init__(self):
@@ -50,54 +96,93 @@ class AgentSystem:
     def register_agent(self, agent: Agent):
         self.agents.append(agent)
         
-    async def run_debate(self, agents: list, turns: int, topic: str, context: str = "", stream_handler=None) -> Dict[str, Any]:
-        """Simulate a debate between agents with optional streaming and context"""
-        messages = []
+    async def _agent_turn(self, agent: Agent, prompt: str, stream_handler=None, turn_handler=None,
+                          fresh: bool = False) -> str:
+        """Run one agent turn and return its full response"""
+        with span('debate_turn', agent=agent.name):
+            if stream_handler:
+                # Stream the response
+                parts = []
+                async for content in agent.stream_response(prompt, fresh=fresh):
+                    parts.append(content)
+                    await stream_handler(agent.name, content)
+                response = "".join(parts)
+            else:
+                # Non-streaming response, built from the same prompt as the streaming path
+                response = await agent.generate_response(prompt, fresh=fresh)
+        if turn_handler:
+            await turn_handler(agent.name, response)
+        return response
+
+    async def run_debate(self, agents: list, turns: int, topic: str, context: str = "", stream_handler=None,
+                         history_window: Optional[int] = None, summarize_history: bool = False,
+                         schedule: str = "sequential", conclusion_handler=None,
+                         turn_handler=None, controller: Optional[DebateController] = None,
+                         fresh: bool = False) -> Dict[str, Any]:
+        """Simulate a debate between agents with optional streaming and context.
+
+        history_window bounds the verbatim history sent each turn to the last N
+        messages; summarize_history keeps a rolling summary of older ones. The
+        conclusion always sees the whole debate.
+        schedule is one of DEBATE_SCHEDULES. When agents run concurrently their
+        streamed tokens interleave, so stream_handler must route by agent name.
+        conclusion_handler, if given, receives the conclusion as it streams, and
+        turn_handler(agent_name, response) is awaited as each turn completes.
+        With a controller, turns is an upper bound: the controller can end the
+        debate early once rounds stop adding new arguments or a budget runs out.
+        fresh=True bypasses the response cache so every turn is generated anew.
+        """
+        if schedule not in DEBATE_SCHEDULES:
+            raise ValueError(f"Unknown debate schedule {schedule!r}; expected one of {DEBATE_SCHEDULES}")
+        transcript = Transcript(window=history_window, summarize=summarize_history)
         current_topic = topic # Initial topic
         if context:
              current_topic += f"\n\nRelevant Context:\n{context}" # Add context for the first turn
 
-        for i in range(turns):
-            for agent in agents:
-                # Use the potentially updated topic (including context for first turn)
-                # Pass full context only on first turn, subsequent turns use original topic + history
-                current_prompt = current_topic if i == 0 else topic 
-                
-                # Add previous messages as history for context in subsequent turns
-                history = "\n".join([f"{msg['role']}: {msg['content']}" for msg in messages])
-                if history and i > 0:
-                    current_prompt += f"\n\nPrevious Discussion:\n{history}"
+        def build_prompt(i: int) -> str:
+            # Pass full context only on first turn, subsequent turns use original topic + history
+            current_prompt = current_topic if i == 0 else topic
+            history = transcript.history()
+            if history and i > 0:
+                current_prompt += f"\n\nPrevious Discussion:\n{history}"
+            return current_prompt
 
-                if stream_handler:
-                    # Stream the response
-                    stream = await agent.generate_response(current_prompt, stream=True)
-                    full_response = ""
-                    async for chunk in stream:
-                        content = chunk.choices[0].delta.content
-                        if content:
-                            full_response += content
-                            await stream_handler(agent.name, content)
-                    messages.append({
-                        'role': agent.name,
-                        'content': full_response
-                    })
-                else:
-                    # Non-streaming response
-                    response = await agent.generate_response(topic)
-                    messages.append({
-                        'role': agent.name,
-                        'content': response
-                    })
+        rounds = 0
+        for i in range(turns):
+            if controller and not controller.should_continue():
+                break
+            concurrent = schedule == 'simultaneous' or (schedule == 'parallel_openings' and i == 0)
+            if concurrent:
+                # Every agent answers the same prompt: the discussion up to the previous round
+                prompt = build_prompt(i)
+                responses = await asyncio.gather(*[
+                    self._agent_turn(agent, prompt, stream_handler, turn_handler, fresh) for agent in agents
+                ])
+                for agent, response in zip(agents, responses):
+                    transcript.append(agent.name, response)
+                    if controller:
+                        controller.record_turn(prompt, response)
+            else:
+                for agent in agents:
+                    prompt = build_prompt(i)
+                    response = await self._agent_turn(agent, prompt, stream_handler, turn_handler, fresh)
+                    transcript.append(agent.name, response)
+                    if controller:
+                        controller.record_turn(prompt, response)
+            rounds += 1
+            if controller:
+                controller.end_round()
+        messages = transcript.messages
+        if controller:
+            if controller.stop_reason is None:
+                controller.should_continue()  # records why the loop ended
+            debate_stats = controller.report()
         # Add a final step to generate a conclusion
-        conclusion_prompt = f"Based on the following debate about {topic}, decide whether to buy, sell, or hold the stock. Provide a brief justification.\n\nDebate:\n"
-        for msg in messages:
-            conclusion_prompt += f"{msg['role']}: {msg['content']}\n"
+        conclusion_prompt = (f"Based on the following debate about {topic}, decide whether to buy, sell, or hold the stock. "
+                             f"Provide a brief justification.\n\nDebate:\n{transcript.full_text()}\n")
             
         # Use a neutral system prompt for the conclusion
-        from openai import AsyncOpenAI
-        client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        
-        conclusion_response = await client.chat.completions.create(
+        conclusion_request = dict(
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "You are a neutral financial analyst summarizing a debate."},
@@ -106,10 +191,21 @@ class AgentSystem:
             max_tokens=150,
             temperature=0.5
         )
-        final_conclusion = conclusion_response.choices[0].message.content
+        with span('debate_conclusion'):
+            if conclusion_handler:
+                parts = []
+                async for content in stream_text(conclusion_request, fresh=fresh):
+                    parts.append(content)
+                    await conclusion_handler(content)
+                final_conclusion = "".join(parts)
+            else:
+                final_conclusion = await complete_text(conclusion_request, fresh=fresh)
 
-        return {
+        result = {
             'messages': messages,
-            'summary': f"Debate concluded after {turns} turns per agent.",
+            'summary': f"Debate concluded after {rounds} turns per agent ({schedule}).",
             'conclusion': final_conclusion
         }
+        if controller:
+            result['debate_stats'] = debate_stats
+        return result
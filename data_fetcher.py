@@ -1,22 +1,72 @@
 import os
-import yfinance as yf
-from typing import Dict, Any, Optional
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
 import logging
-from openai import OpenAI
 from dotenv import load_dotenv
+from cache import CacheBackend, MemoryLRUCache, SQLiteCache
+from symbol_index import get_symbol_index, is_symbol
+from providers import provider_slot
+from rate_limit import get_rate_limiter
+from telemetry import observe, record_usage, span
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 load_dotenv()
 
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+# Per-source timeouts (seconds) for get_stock_research_async
+RESEARCH_TIMEOUTS = {'metrics': 15.0, 'news': 20.0}
+
+# yfinance, pandas, numpy and openai take most of this module's import time and
+# are only needed once data is actually fetched, so they are imported on first use.
+yf = None  # benchmarks swap in a stub here
+_client = None
+_client_key = None
+
+def _yfinance():
+    global yf
+    if yf is None:
+        import yfinance
+        yf = yfinance
+    return yf
+
+def _openai_client():
+    """Sync OpenAI client for symbol lookups, built on first use with the current API key"""
+    global _client, _client_key
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return None
+    if _client is None or _client_key != api_key:
+        from openai import OpenAI
+        # Retries are handled by rate_limit so throttling is visible in its metrics
+        _client = OpenAI(api_key=api_key, max_retries=0)
+        _client_key = api_key
+    return _client
 
 def get_stock_symbol(company_name: str, country: str = "") -> Optional[str]:
     """
-    Use LLM to find the stock symbol for a company name
+    Find the stock symbol for a company name, using the local symbol index
+    first and the LLM only on an index miss.
     Returns format like "AAPL" or "TATA.NS" for Indian stocks
     """
-    if not client or not OPENAI_API_KEY:
+    start = time.perf_counter()
+    index = get_symbol_index()
+    symbol = index.resolve(company_name, country)
+    if symbol:
+        observe('symbol_lookup_seconds', time.perf_counter() - start, source='index')
+        return symbol
+    with span('symbol_lookup', source='llm'):
+        return _llm_symbol_lookup(company_name, country, index)
+
+def _llm_symbol_lookup(company_name: str, country: str, index) -> Optional[str]:
+    """Ask the LLM for a symbol the index does not know and remember the answer"""
+    client = _openai_client()
+    if client is None:
         logging.error("OpenAI client not configured")
         return None
 
@@ -42,36 +92,155 @@ def get_stock_symbol(company_name: str, country: str = "") -> Optional[str]:
     Verify symbol is correct before returning."""
 
     try:
-        response = client.chat.completions.create(
+        response = get_rate_limiter('openai').call(
+            client.chat.completions.create,
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": prompt}],
             temperature=0.3,  # Lower temperature for more deterministic responses
-            max_tokens=10
+            max_tokens=10,
+            tokens=len(prompt) // 4 + 10
         )
+        record_usage("gpt-4o-mini", getattr(response, 'usage', None))
         symbol = response.choices[0].message.content.strip()
-
-        print(f"LLM response - step 1: {symbol}")  # Debugging line
+        logging.debug(f"LLM symbol lookup for {company_name!r}: {symbol}")
         
-        # Clean and validate the symbol
-        symbol = symbol.strip().upper()
-        if not symbol or " " in symbol:
+        # Clean and validate the symbol; only symbol-shaped answers are cached
+        symbol = symbol.strip().strip('`"\'').upper()
+        if symbol == "BLANK":
+            logging.info(f"LLM could not resolve {company_name!r}")
+            return None
+        if not is_symbol(symbol):
             logging.error(f"Invalid symbol returned: {symbol}")
             return None
-            
+
+        index.remember(company_name, country, symbol)
         return symbol
     except Exception as e:
         logging.error(f"LLM symbol lookup error: {str(e)}")
         return None
 
+class ResearchCache:
+    """TTL cache for research sources with stale-while-revalidate.
+
+    A fresh entry is returned as is. An entry past its TTL but within the
+    stale window is returned immediately while a background thread refetches
+    it. Anything older is a miss and is fetched inline. Error results are
+    never cached.
+    """
+
+    def __init__(self,
+                 backend: Optional[CacheBackend] = None,
+                 ttls: Optional[Dict[str, float]] = None,
+                 stale_ttls: Optional[Dict[str, float]] = None):
+        self.backend = backend if backend is not None else MemoryLRUCache()
+        # Prices move quickly, news much less so
+        self.ttls = {'metrics': 60.0, 'news': 900.0, **(ttls or {})}
+        self.stale_ttls = {'metrics': 300.0, 'news': 3600.0, **(stale_ttls or {})}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self):
+        return self.backend.stats
+
+    def _count(self, counter: str) -> None:
+        # Callers and refresh threads update the same counters
+        with self._lock:
+            setattr(self.stats, counter, getattr(self.stats, counter) + 1)
+
+    def get_or_fetch(self, kind: str, ticker: str, fetch) -> Dict[str, Any]:
+        key = f"{kind}:{ticker.upper()}"
+        entry = self.backend.get(key)
+        if entry is not None:
+            value, stored_at = entry
+            age = time.time() - stored_at
+            if age < self.ttls[kind]:
+                self._count('hits')
+                return value
+            if age < self.ttls[kind] + self.stale_ttls[kind]:
+                self._count('stale_hits')
+                self._refresh_in_background(key, ticker, fetch)
+                return value
+        self._count('misses')
+        return self._fetch_and_store(key, ticker, fetch)
+
+    def peek(self, kind: str, ticker: str) -> Optional[Dict[str, Any]]:
+        """Cached value if still servable (fresh or stale), without fetching or counting"""
+        entry = self.backend.get(f"{kind}:{ticker.upper()}")
+        if entry is None or time.time() - entry[1] >= self.ttls[kind] + self.stale_ttls[kind]:
+            return None
+        return entry[0]
+
+    def _fetch_and_store(self, key: str, ticker: str, fetch) -> Dict[str, Any]:
+        value = fetch(ticker)
+        if not value.get('error'):
+            self.backend.set(key, value, time.time())
+        return value
+
+    def _refresh_in_background(self, key: str, ticker: str, fetch) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._fetch_and_store(key, ticker, fetch)
+                self._count('refreshes')
+            except Exception as e:
+                logging.error(f"Background refresh of {key} failed: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name=f"refresh-{key}", daemon=True).start()
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+def _default_research_cache() -> ResearchCache:
+    """Build the process-wide cache from environment settings"""
+    size = int(os.getenv("RESEARCH_CACHE_SIZE", "512"))
+    path = os.getenv("RESEARCH_CACHE_PATH")
+    backend = SQLiteCache(path, max_entries=size) if path else MemoryLRUCache(size)
+    ttls = {}
+    if os.getenv("METRICS_CACHE_TTL"):
+        ttls['metrics'] = float(os.getenv("METRICS_CACHE_TTL"))
+    if os.getenv("NEWS_CACHE_TTL"):
+        ttls['news'] = float(os.getenv("NEWS_CACHE_TTL"))
+    return ResearchCache(backend, ttls=ttls)
+
+_research_cache: Optional[ResearchCache] = _default_research_cache()
+
+def set_research_cache(cache: Optional[ResearchCache]) -> None:
+    """Swap the research cache; pass None to disable caching"""
+    global _research_cache
+    _research_cache = cache
+
+def get_research_cache() -> Optional[ResearchCache]:
+    return _research_cache
+
+def research_cache_stats() -> Dict[str, int]:
+    """Hit/miss/eviction counters for the active research cache"""
+    if _research_cache is None:
+        return {}
+    return {**_research_cache.stats.to_dict(), 'size': len(_research_cache.backend)}
+
 def get_stock_metrics(ticker: str) -> Dict[str, Any]:
+    """Fetch key stock metrics, served from the research cache when possible"""
+    if _research_cache is None:
+        return _fetch_stock_metrics(ticker)
+    return _research_cache.get_or_fetch('metrics', ticker, _fetch_stock_metrics)
+
+def _fetch_stock_metrics(ticker: str) -> Dict[str, Any]:
     """Fetch key stock metrics with enhanced error handling"""
     try:
         # First check if ticker is supported
-        stock = yf.Ticker(ticker)
-        if not stock.info:
+        stock = _yfinance().Ticker(ticker)
+        with span('provider_call', provider='yfinance'):
+            info = get_rate_limiter('yfinance').call(lambda: stock.info)
+        if not info:
             return {'error': f"Ticker {ticker} not found or not supported by Yahoo Finance"}
-            
-        info = stock.info
         
         # Handle Indian stocks differently
         is_indian = ticker.endswith('.NS') or ticker.endswith('.BO')
@@ -94,19 +263,29 @@ def get_stock_metrics(ticker: str) -> Dict[str, Any]:
         return {'error': f"Failed to fetch metrics: {str(e)}"}
 
 def get_stock_news(ticker: str) -> Dict[str, Any]:
+    """Search for recent news, served from the research cache when possible"""
+    if _research_cache is None:
+        return _fetch_stock_news(ticker)
+    return _research_cache.get_or_fetch('news', ticker, _fetch_stock_news)
+
+def _fetch_stock_news(ticker: str) -> Dict[str, Any]:
     """Search for recent news about the stock"""
-    if not TAVILY_API_KEY:
+    # Read per call so a key entered after import (e.g. in the UI) is used
+    api_key = TAVILY_API_KEY or os.getenv("TAVILY_API_KEY")
+    if not api_key:
         return {"error": "Tavily API key not configured"}
         
     try:
         from tavily import TavilyClient
-        tavily = TavilyClient(api_key=TAVILY_API_KEY)
+        tavily = TavilyClient(api_key=api_key)
         
-        results = tavily.search(
-            query=f"{ticker} stock news",
-            search_depth="basic",
-            max_results=5
-        )
+        with span('provider_call', provider='tavily'):
+            results = get_rate_limiter('tavily').call(
+                tavily.search,
+                query=f"{ticker} stock news",
+                search_depth="basic",
+                max_results=5
+            )
         
         return {
             'news': [{
@@ -119,9 +298,181 @@ def get_stock_news(ticker: str) -> Dict[str, Any]:
         logging.error(f"News search error for {ticker}: {str(e)}")
         return {'error': f"News unavailable: {str(e)}"}
 
-def get_stock_research(ticker: str) -> Dict[str, Any]:
+@dataclass
+class ResearchBundle:
+    """Research data for one ticker, fetched once and shared by the UI and the debate"""
+    ticker: str
+    metrics: Dict[str, Any] = field(default_factory=dict)
+    news: Dict[str, Any] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)  # seconds per source
+
+    @classmethod
+    def from_dict(cls, ticker: str, data: Dict[str, Any]) -> "ResearchBundle":
+        """Wrap a legacy {'metrics': ..., 'news': ...} dict"""
+        if isinstance(data, ResearchBundle):
+            return data
+        return cls(
+            ticker=ticker,
+            metrics=data.get('metrics') or {},
+            news=data.get('news') or {},
+            timings=dict(data.get('timings') or {})
+        )
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dict-style access so existing research_data.get(...) callers keep working"""
+        return getattr(self, key, default)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'ticker': self.ticker,
+            'metrics': self.metrics,
+            'news': self.news,
+            'timings': self.timings
+        }
+
+def _timed(timings: Dict[str, float], source: str, fetch, ticker: str) -> Dict[str, Any]:
+    """Run one research source and record how long it took"""
+    start = time.perf_counter()
+    try:
+        return fetch(ticker)
+    finally:
+        timings[source] = time.perf_counter() - start
+        observe('research_seconds', timings[source], source=source)
+
+def get_stock_research(ticker: str) -> ResearchBundle:
     """Get all research data for a stock"""
-    return {
-        'metrics': get_stock_metrics(ticker),
-        'news': get_stock_news(ticker)
-    }
+    timings: Dict[str, float] = {}
+    metrics = _timed(timings, 'metrics', get_stock_metrics, ticker)
+    news = _timed(timings, 'news', get_stock_news, ticker)
+    logging.info(f"Research for {ticker} fetched in {timings}")
+    return ResearchBundle(ticker=ticker, metrics=metrics, news=news, timings=timings)
+
+async def _fetch_source_async(timings: Dict[str, float], source: str, provider: str, fetch, ticker: str,
+                              timeout: float) -> Dict[str, Any]:
+    """Run a blocking research source in a worker thread, bounded by a timeout.
+
+    Failures and timeouts come back as an error dict so the other source's
+    result is still usable. A timed-out thread is abandoned, not killed.
+    The timeout starts once a provider slot is free.
+    """
+    start = time.perf_counter()
+    try:
+        async with provider_slot(provider):
+            return await asyncio.wait_for(asyncio.to_thread(fetch, ticker), timeout)
+    except asyncio.TimeoutError:
+        logging.error(f"{source} fetch for {ticker} timed out after {timeout}s")
+        return {'error': f"{source} fetch timed out after {timeout}s"}
+    except Exception as e:
+        logging.error(f"{source} fetch error for {ticker}: {str(e)}")
+        return {'error': f"Failed to fetch {source}: {str(e)}"}
+    finally:
+        timings[source] = time.perf_counter() - start
+        observe('research_seconds', timings[source], source=source)
+
+async def get_stock_research_async(ticker: str, timeouts: Optional[Dict[str, float]] = None) -> ResearchBundle:
+    """Fetch metrics and news concurrently without blocking the event loop"""
+    timeouts = {**RESEARCH_TIMEOUTS, **(timeouts or {})}
+    timings: Dict[str, float] = {}
+    metrics, news = await asyncio.gather(
+        _fetch_source_async(timings, 'metrics', 'yfinance', get_stock_metrics, ticker, timeouts['metrics']),
+        _fetch_source_async(timings, 'news', 'tavily', get_stock_news, ticker, timeouts['news'])
+    )
+    logging.info(f"Research for {ticker} fetched in {timings}")
+    return ResearchBundle(ticker=ticker, metrics=metrics, news=news, timings=timings)
+
+# Columns of the bulk metrics table; same keys as the get_stock_metrics dict
+METRIC_COLUMNS = ['current_price', 'pe_ratio', 'market_cap', '52_week_high', '52_week_low',
+                  'volume', 'avg_volume', 'currency']
+_FUNDAMENTAL_COLUMNS = ['pe_ratio', 'market_cap', 'currency']
+AVG_VOLUME_SESSIONS = 63  # ~3 months, matching Yahoo's averageVolume
+
+def _field_frame(history: "pd.DataFrame", field_name: str, tickers: List[str]) -> "pd.DataFrame":
+    """dates x tickers frame for one OHLCV field of a yf.download result"""
+    import pandas as pd
+    if isinstance(history.columns, pd.MultiIndex):
+        level = 1 if field_name in history.columns.get_level_values(1) else 0
+        frame = history.xs(field_name, axis=1, level=level)
+    else:
+        # Single-ticker downloads come back with flat columns
+        frame = history[[field_name]].set_axis(tickers[:1], axis=1)
+    return frame.reindex(columns=tickers).astype(float)
+
+def get_bulk_metrics(tickers: List[str], fetch_fundamentals: bool = False,
+                     max_workers: int = 8) -> "pd.DataFrame":
+    """Metrics for many tickers as one columnar table indexed by ticker.
+
+    Price, 52-week range, volume and average volume come from a single
+    yf.download round trip and are computed column-wise. P/E, market cap
+    and currency are not part of price history; they are taken from the
+    research cache when present, and fetched per ticker (rate limited and
+    cached) only when fetch_fundamentals is set. Missing values are NaN,
+    except currency, which defaults to INR for .NS/.BO and USD otherwise
+    as in get_stock_metrics.
+    """
+    import numpy as np
+    import pandas as pd
+
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    table = pd.DataFrame(np.nan, index=pd.Index(tickers, name='ticker'), columns=METRIC_COLUMNS)
+    table['currency'] = table['currency'].astype(object)
+    if not tickers:
+        return table
+
+    try:
+        with span('provider_call', provider='yfinance_bulk'):
+            history = get_rate_limiter('yfinance').call(
+                _yfinance().download, tickers, period="1y", interval="1d", group_by="ticker",
+                auto_adjust=False, threads=True, progress=False
+            )
+    except Exception as e:
+        logging.error(f"yfinance bulk download error: {str(e)}")
+        history = None
+    if history is not None and not history.empty:
+        close = _field_frame(history, 'Close', tickers).ffill()
+        volume = _field_frame(history, 'Volume', tickers)
+        table['current_price'] = close.iloc[-1]
+        table['52_week_high'] = _field_frame(history, 'High', tickers).max()
+        table['52_week_low'] = _field_frame(history, 'Low', tickers).min()
+        table['volume'] = volume.ffill().iloc[-1]
+        table['avg_volume'] = volume.tail(AVG_VOLUME_SESSIONS).mean()
+
+    fundamentals: Dict[str, Dict[str, Any]] = {}
+    for ticker in tickers:
+        cached = _research_cache.peek('metrics', ticker) if _research_cache is not None else None
+        if cached:
+            fundamentals[ticker] = cached
+    missing = [t for t in tickers if t not in fundamentals]
+    if fetch_fundamentals and missing:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for ticker, metrics in zip(missing, pool.map(get_stock_metrics, missing)):
+                if not metrics.get('error'):
+                    fundamentals[ticker] = metrics
+    for ticker, metrics in fundamentals.items():
+        for column in _FUNDAMENTAL_COLUMNS:
+            value = metrics.get(column)
+            if value not in (None, 'N/A'):
+                table.at[ticker, column] = value
+    is_indian = table.index.str.endswith(('.NS', '.BO'))
+    table.loc[is_indian & table['currency'].isna(), 'currency'] = 'INR'
+    table.loc[~is_indian & table['currency'].isna(), 'currency'] = 'USD'
+    for column in METRIC_COLUMNS:
+        if column != 'currency':
+            table[column] = pd.to_numeric(table[column], errors='coerce')
+    return table
+
+def metrics_row(table: "pd.DataFrame", ticker: str) -> Dict[str, Any]:
+    """One ticker's row as a get_stock_metrics-style dict ('N/A' for missing values)"""
+    import numpy as np
+    import pandas as pd
+
+    if ticker not in table.index:
+        return {'error': f"No bulk metrics for {ticker}"}
+    row = table.loc[ticker]
+    metrics = {}
+    for column in METRIC_COLUMNS:
+        value = row[column]
+        if pd.isna(value):
+            metrics[column] = 'N/A'
+        else:
+            metrics[column] = value.item() if isinstance(value, np.generic) else value
+    return metrics
@@ -0,0 +1,154 @@
+"""Adaptive turn count for debates.
+
+Agents tend to restate their positions after a few rounds. DebateController
+scores each response by how much of it is new relative to everything said
+before (content-word overlap, no model calls) and ends the debate once rounds
+stop adding anything, or before a round would overrun the token or wall-time
+budget.
+"""
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from context_compiler import count_tokens
+
+_WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+# Function words carry no argument; dropping them makes a reworded restatement
+# look like what it is, a repeat of the same content words
+_STOPWORDS = frozenset("""
+a about above after again against all also although am an and any are aren't as at be because been before being below
+between both but by can could did do does doesn't doing don't down during each even few for from further had has have
+having he her here his how however i i'm if in into is isn't it it's its just let let's may me might more most must my
+no nor not of off on once only or other our out over own same shall she should so some still such than that that's the
+their them then there there's these they they're this those though through to too under until up us very was we we're
+were what when where which while who whom whose why will with would yet you you're your
+""".split())
+_SUFFIXES = ("ing", "ed", "es", "s", "ly")
+
+def _optional(name: str, cast):
+    value = os.getenv(name)
+    return cast(value) if value else None
+
+@dataclass
+class DebateBudget:
+    max_turns: int = 5              # rounds (one turn per agent each)
+    min_turns: int = 2              # never stop on convergence before this many rounds
+    novelty_threshold: float = 0.4  # a round with less novelty than this counts as repetitive
+    patience: int = 1               # repetitive rounds in a row before stopping
+    max_tokens: Optional[int] = None     # prompt + completion tokens for the whole debate
+    max_seconds: Optional[float] = None  # wall time for the debate rounds
+    history_window: Optional[int] = 6    # messages resent verbatim each turn; None resends all
+    summarize_history: bool = True       # keep older messages as a rolling one-line-each summary
+
+    @classmethod
+    def from_env(cls) -> "DebateBudget":
+        return cls(
+            max_turns=int(os.getenv("DEBATE_MAX_TURNS", "5")),
+            min_turns=int(os.getenv("DEBATE_MIN_TURNS", "2")),
+            novelty_threshold=float(os.getenv("DEBATE_NOVELTY_THRESHOLD", "0.4")),
+            patience=int(os.getenv("DEBATE_PATIENCE", "1")),
+            max_tokens=_optional("DEBATE_MAX_TOKENS", int),
+            max_seconds=_optional("DEBATE_MAX_SECONDS", float),
+            # 0 turns the window off
+            history_window=int(os.getenv("DEBATE_HISTORY_WINDOW", "6")) or None,
+            summarize_history=os.getenv("DEBATE_SUMMARIZE_HISTORY", "1").lower() not in ("0", "false", "off")
+        )
+
+def _stem(word: str) -> str:
+    """Crude suffix strip so 'margins'/'margin' and 'growing'/'grow' count as one word"""
+    for suffix in _SUFFIXES:
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+def content_words(text: str) -> set:
+    return {_stem(w) for w in _WORD.findall(text.lower()) if w not in _STOPWORDS}
+
+def novelty(response: str, seen: set) -> float:
+    """Share of the response's content words not said earlier in the debate"""
+    words = content_words(response)
+    if not words:
+        return 0.0
+    return len(words - seen) / len(words)
+
+class DebateController:
+    """Tracks one debate and decides whether another round is worth running"""
+
+    def __init__(self, budget: Optional[DebateBudget] = None):
+        self.budget = budget or DebateBudget()
+        self.started = time.perf_counter()
+        self.rounds = 0
+        self.tokens = 0
+        self.round_novelty: List[float] = []
+        self.round_seconds: List[float] = []
+        self.round_tokens: List[int] = []
+        self.stop_reason: Optional[str] = None
+        self._seen: set = set()
+        self._turns: List[float] = []
+        self._round_started = self.started
+        self._round_tokens = 0
+
+    def record_turn(self, prompt: str, response: str) -> float:
+        """Account for one agent turn; returns its novelty"""
+        score = novelty(response, self._seen) if self._seen else 1.0
+        self._seen |= content_words(response)
+        self._turns.append(score)
+        cost = count_tokens(prompt) + count_tokens(response)
+        self._round_tokens += cost
+        self.tokens += cost
+        return score
+
+    def end_round(self) -> None:
+        now = time.perf_counter()
+        self.rounds += 1
+        self.round_novelty.append(sum(self._turns) / len(self._turns) if self._turns else 0.0)
+        self.round_seconds.append(now - self._round_started)
+        self.round_tokens.append(self._round_tokens)
+        self._turns, self._round_tokens, self._round_started = [], 0, now
+
+    def should_continue(self) -> bool:
+        """Called before each round; sets stop_reason when the debate should end"""
+        budget = self.budget
+        if self.rounds >= budget.max_turns:
+            self.stop_reason = 'max_turns'
+        elif self.rounds >= max(budget.min_turns, budget.patience) and all(
+                n < budget.novelty_threshold for n in self.round_novelty[-budget.patience:]):
+            self.stop_reason = 'converged'
+        # Rounds grow with the history, so the last round is a fair estimate of the next
+        elif budget.max_tokens is not None and self.round_tokens and \
+                self.tokens + self.round_tokens[-1] > budget.max_tokens:
+            self.stop_reason = 'token_budget'
+        elif budget.max_seconds is not None and self.round_seconds and \
+                self.elapsed + self.round_seconds[-1] > budget.max_seconds:
+            self.stop_reason = 'time_budget'
+        return self.stop_reason is None
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def report(self) -> Dict[str, Any]:
+        """Per-run summary; savings are estimated from the mean duration/size of the rounds that ran"""
+        saved = self.budget.max_turns - self.rounds
+        mean_seconds = sum(self.round_seconds) / len(self.round_seconds) if self.round_seconds else 0.0
+        mean_tokens = sum(self.round_tokens) / len(self.round_tokens) if self.round_tokens else 0.0
+        return {
+            'turns': self.rounds,
+            'max_turns': self.budget.max_turns,
+            'turns_saved': saved,
+            'stop_reason': self.stop_reason or 'max_turns',
+            'novelty': [round(n, 3) for n in self.round_novelty],
+            'tokens': self.tokens,
+            'elapsed': round(self.elapsed, 3),
+            'est_seconds_saved': round(saved * mean_seconds, 3),
+            'est_tokens_saved': int(saved * mean_tokens)
+        }
+
+    def log(self, label: str) -> None:
+        report = self.report()
+        logging.info(f"Debate {label}: {report['turns']}/{report['max_turns']} rounds ({report['stop_reason']}), "
+                     f"novelty {report['novelty']}, ~{report['est_seconds_saved']:.1f}s and "
+                     f"~{report['est_tokens_saved']} tokens saved")
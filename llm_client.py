@@ -0,0 +1,159 @@
+"""Process-wide pooled AsyncOpenAI client shared by every agent and the conclusion step"""
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+from rate_limit import estimate_tokens, get_rate_limiter
+from telemetry import observe, record_usage, span
+
+class LLMClientManager:
+    """Owns one keep-alive connection pool and a concurrency budget for OpenAI calls.
+
+    httpx connections are bound to the event loop that opened them, so the
+    client is rebuilt if it is requested from a different loop (Streamlit runs
+    a fresh asyncio.run per click) or with a different API key.
+    """
+
+    def __init__(self,
+                 max_concurrency: int = 16,
+                 max_connections: Optional[int] = None,
+                 keepalive_expiry: float = 60.0,
+                 timeout: float = 120.0,
+                 base_url: Optional[str] = None):
+        self.max_concurrency = max_concurrency
+        self.max_connections = max_connections or max_concurrency
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL")
+        self._client = None
+        self._client_key = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+        self.stats: Dict[str, int] = {'clients_created': 0, 'requests': 0, 'in_flight': 0, 'peak_in_flight': 0}
+
+    def _build_client(self, api_key: Optional[str]):
+        import httpx
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+        http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=self.keepalive_expiry
+            ),
+            timeout=self.timeout
+        )
+        self.stats['clients_created'] += 1
+        # Retries are handled by rate_limit so throttling is visible in its metrics
+        return AsyncOpenAI(api_key=api_key, base_url=self.base_url, http_client=http_client, max_retries=0)
+
+    def get_client(self, api_key: Optional[str] = None):
+        """Return the shared client for the running event loop"""
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
+        key = (id(asyncio.get_running_loop()), api_key)
+        if self._client is None or self._client_key != key:
+            old_client, old_key = self._client, self._client_key
+            self._client = self._build_client(api_key)
+            self._client_key = key
+            # A client from a finished loop cannot be closed any more; just drop it
+            if old_client is not None and old_key[0] == key[0]:
+                asyncio.ensure_future(old_client.close())
+        return self._client
+
+    def set_max_concurrency(self, max_concurrency: int) -> None:
+        """Change the concurrency budget; takes effect for calls that start afterwards"""
+        self.max_concurrency = max_concurrency
+        self.max_connections = max(self.max_connections, max_concurrency)
+        self._semaphore = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one unit of the concurrency budget for the duration of a call"""
+        async with self._get_semaphore():
+            self.stats['requests'] += 1
+            self.stats['in_flight'] += 1
+            self.stats['peak_in_flight'] = max(self.stats['peak_in_flight'], self.stats['in_flight'])
+            try:
+                yield
+            finally:
+                self.stats['in_flight'] -= 1
+
+    async def chat(self, api_key: Optional[str] = None, **kwargs) -> Any:
+        """Non-streaming chat completion through the shared pool"""
+        model = kwargs.get('model', '')
+        async with self.slot():
+            with span('llm_request', model=model):
+                response = await get_rate_limiter('openai').call_async(
+                    self.get_client(api_key).chat.completions.create,
+                    tokens=estimate_tokens(kwargs.get('messages', []), kwargs.get('max_tokens')),
+                    **kwargs
+                )
+        record_usage(model, getattr(response, 'usage', None))
+        return response
+
+    async def chat_stream(self, api_key: Optional[str] = None, **kwargs):
+        """Streaming chat completion; the concurrency slot is held until the stream ends.
+
+        Only opening the stream is retried; a stream that fails midway raises.
+        Token usage arrives in a final chunk with no choices (stream_options
+        include_usage); it is recorded here and not yielded, so every chunk a
+        caller sees has choices[0].
+        """
+        model = kwargs.get('model', '')
+        kwargs.setdefault('stream_options', {'include_usage': True})
+        async with self.slot():
+            start = time.perf_counter()
+            first_token = None
+            with span('llm_request', model=model):
+                response = await get_rate_limiter('openai').call_async(
+                    self.get_client(api_key).chat.completions.create,
+                    stream=True,
+                    tokens=estimate_tokens(kwargs.get('messages', []), kwargs.get('max_tokens')),
+                    **kwargs
+                )
+                async for chunk in response:
+                    if first_token is None and chunk.choices and chunk.choices[0].delta.content:
+                        first_token = time.perf_counter() - start
+                        observe('llm_ttft_seconds', first_token, model=model)
+                    if getattr(chunk, 'usage', None):
+                        record_usage(model, chunk.usage)
+                    if chunk.choices:
+                        yield chunk
+
+    async def aclose(self) -> None:
+        """Close pooled connections; safe to call more than once"""
+        client, self._client, self._client_key = self._client, None, None
+        if client is not None:
+            try:
+                await client.close()
+            except Exception as e:
+                logging.error(f"Error closing OpenAI client: {str(e)}")
+
+_manager: Optional[LLMClientManager] = None
+
+def get_llm_manager() -> LLMClientManager:
+    global _manager
+    if _manager is None:
+        _manager = LLMClientManager(max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "16")))
+    return _manager
+
+def configure_llm_client(**kwargs) -> LLMClientManager:
+    """Replace the shared manager, e.g. configure_llm_client(max_concurrency=4)"""
+    global _manager
+    _manager = LLMClientManager(**kwargs)
+    return _manager
+
+async def shutdown_llm_client() -> None:
+    """Shutdown hook: close the shared connection pool"""
+    if _manager is not None:
+        await _manager.aclose()
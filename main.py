@@ -1,15 +1,23 @@
 import asyncio
-import json
+import logging
+from dataclasses import replace
 from agents import BullishAgent, BearishAgent
 from custom_agent import AgentSystem
 import os
+from typing import Optional
 from dotenv import load_dotenv
 from app_logging import log_agent_call, log_conclusion
+from debate_controller import DebateBudget, DebateController
+from scoring import build_conclusion
+from telemetry import increment
+from workers import WorkerPool, run_cpu
 
 load_dotenv()
 
 class StockDebateSystem:
-    def __init__(self):
+    def __init__(self, cpu_pool: Optional[WorkerPool] = None):
+        # CPU-bound stages (context compilation, scoring) go to this pool when set
+        self.cpu_pool = cpu_pool
         self.system = AgentSystem()
         self.bullish_agent = BullishAgent()
         self.bearish_agent = BearishAgent()
@@ -17,62 +25,96 @@ class StockDebateSystem:
         self.system.register_agent(self.bullish_agent)
         self.system.register_agent(self.bearish_agent)
     
-    async def analyze_stock(self, ticker: str, research_data: dict = None, stream_handler=None):
-        """Run stock analysis debate between agents using provided research data"""
+    async def analyze_stock(self, ticker: str, research_data=None, stream_handler=None,
+                            schedule: str = "parallel_openings", conclusion_handler=None, turn_handler=None,
+                            budget: Optional[DebateBudget] = None, reuse: bool = True):
+        """Run stock analysis debate between agents using provided research data.
+
+        research_data may be a ResearchBundle (preferred, so callers that already
+        fetched research for display don't fetch it twice) or a legacy dict.
+        schedule is passed to AgentSystem.run_debate; "simultaneous" roughly
+        halves debate latency at the cost of agents not seeing same-round replies.
+        budget caps rounds, tokens and wall time (default: DebateBudget.from_env());
+        the debate stops early once agents start repeating themselves. Its
+        history_window/summarize_history bound the history resent each turn.
+        With a result store configured (see result_store), unchanged research
+        returns the stored result without a debate and slightly changed research
+        gets a short delta round; reuse=False forces a full debate and bypasses
+        the response cache, so every turn is generated anew. The result's
+        'analysis' entry says which of the three happened.
+        """
+        from data_fetcher import get_stock_research_async, ResearchBundle
+        from context_compiler import compile_context, compile_delta_context
+        from result_store import ResearchDelta, ResearchFingerprint, get_result_store, news_id
         if research_data is None:
-            from data_fetcher import get_stock_research
-            research_data = get_stock_research(ticker)
+            research_data = await get_stock_research_async(ticker)
+        else:
+            research_data = ResearchBundle.from_dict(ticker, research_data)
+
+        store = get_result_store()
+        fingerprint = ResearchFingerprint.of(research_data) if store is not None else None
+        plan = None
+        if store is not None:
+            plan = await asyncio.to_thread(store.plan, ticker, fingerprint) if reuse else ResearchDelta('full', 'reuse disabled')
+        if plan and plan.mode == 'reuse':
+            logging.info(f"Reusing stored analysis #{plan.previous.id} of {ticker}: {plan.reason}")
+            increment('analysis_total', mode='reuse')
+            result = dict(plan.previous.result)
+            result['research'] = research_data
+            result['analysis'] = {**plan.to_dict(), 'id': plan.previous.id}
+            return result
+        delta = plan if plan and plan.mode == 'delta' else None
         
         # Log agent calls
         log_agent_call("Bullish Agent", ticker)
         log_agent_call("Bearish Agent", ticker)
         
         # Conduct debate, passing research data as context
-        debate_topic = f"Should we buy {ticker} stock? Consider these key metrics and recent news."
-        # Format context nicely for the LLM
-        context_str = f"--- Start Context for {ticker} ---\n"
-        context_str += f"Metrics: {json.dumps(research_data.get('metrics', {}), indent=2)}\n\n"
-        context_str += f"News: {json.dumps(research_data.get('news', {}).get('news', []), indent=2)}\n\n"
-        context_str += f"--- End Context for {ticker} ---"
+        if delta:
+            # Argue only what changed, starting from the stored conclusion
+            previous = delta.previous.result
+            new_ids = set(delta.new_news)
+            new_items = [item for item in (research_data.get('news') or {}).get('news', []) if news_id(item) in new_ids]
+            debate_topic = f"New information on {ticker} since our last analysis. Does it change whether we should buy?"
+            context = await run_cpu(self.cpu_pool, compile_delta_context, ticker, research_data, previous, new_items)
+            budget = budget or DebateBudget.from_env()
+            turns = store.policy.delta_turns
+            budget = replace(budget, max_turns=turns, min_turns=min(budget.min_turns, turns))
+        else:
+            debate_topic = f"Should we buy {ticker} stock? Consider these key metrics and recent news."
+            # Compact context: it goes into every agent's opening prompt
+            context = await run_cpu(self.cpu_pool, compile_context, ticker, research_data)
 
+        controller = DebateController(budget or DebateBudget.from_env())
         debate_result = await self.system.run_debate(
             agents=[self.bullish_agent, self.bearish_agent],
-            turns=5,
+            turns=controller.budget.max_turns,
             topic=debate_topic,
-            context=context_str,
-            stream_handler=stream_handler
+            context=context.text,
+            stream_handler=stream_handler,
+            schedule=schedule,
+            conclusion_handler=conclusion_handler,
+            turn_handler=turn_handler,
+            controller=controller,
+            history_window=controller.budget.history_window,
+            summarize_history=controller.budget.summarize_history,
+            fresh=not reuse
         )
+        controller.log(ticker)
+        if delta:
+            debate_result['messages'] = previous.get('messages', []) + debate_result['messages']
         
-        # Analyze debate and generate recommendation
-        buy_weight = 0
-        sell_weight = 0
-        bullish_points = []
-        bearish_points = []
-        
-        for msg in debate_result['messages']:
-            content = msg['content']
-            if "bullish" in msg['role'].lower():
-                buy_weight += 1
-                bullish_points.append("- " + content.split('.')[0] + ".")
-            elif "bearish" in msg['role'].lower():
-                sell_weight += 1  
-                bearish_points.append("- " + content.split('.')[0] + ".")
-        
-        confidence = abs(buy_weight - sell_weight)/max(len(debate_result['messages']),1)
-        
-        conclusion = f"After analyzing {ticker}, our recommendation is to "
-        if buy_weight > sell_weight and confidence > 0.25:
-            conclusion += f"BUY with {int(confidence*100)}% confidence.\n\n"
-            conclusion += "Key bullish points:\n" + "\n".join(bullish_points[-3:])
-        elif sell_weight > buy_weight and confidence > 0.25:
-            conclusion += f"SELL with {int(confidence*100)}% confidence.\n\n"
-            conclusion += "Key bearish points:\n" + "\n".join(bearish_points[-3:])
-        else:
-            conclusion += "HOLD as arguments are balanced.\n\n"
-            conclusion += "Bullish considerations:\n" + "\n".join(bullish_points[:3])
-            conclusion += "\n\nBearish considerations:\n" + "\n".join(bearish_points[:3])
-        
-        debate_result['conclusion'] = conclusion
+        # Score the transcript; off the event loop when a worker pool is attached
+        debate_result['conclusion'] = await run_cpu(self.cpu_pool, build_conclusion, ticker, debate_result['messages'])
+        debate_result['research'] = research_data
+        debate_result['context_tokens'] = {'before': context.tokens_before, 'after': context.tokens_after}
+
+        mode = 'delta' if delta else 'full'
+        increment('analysis_total', mode=mode)
+        if store is not None:
+            stored = await asyncio.to_thread(store.save, ticker, debate_result, fingerprint, mode,
+                                             delta.previous if delta else None)
+            debate_result['analysis'] = {**plan.to_dict(), 'id': stored.id}
         return debate_result
 
 if __name__ == "__main__":
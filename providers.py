@@ -0,0 +1,46 @@
+"""Per-provider concurrency limits for OpenAI, Tavily and yfinance calls"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from llm_client import get_llm_manager
+
+DEFAULT_LIMITS: Dict[str, int] = {
+    'tavily': int(os.getenv("TAVILY_MAX_CONCURRENCY", "4")),
+    'yfinance': int(os.getenv("YFINANCE_MAX_CONCURRENCY", "8")),
+}
+
+_limits: Dict[str, int] = dict(DEFAULT_LIMITS)
+_semaphores: Dict[str, asyncio.Semaphore] = {}
+_semaphore_loops: Dict[str, asyncio.AbstractEventLoop] = {}
+
+def configure_provider_limits(openai: Optional[int] = None,
+                              tavily: Optional[int] = None,
+                              yfinance: Optional[int] = None) -> None:
+    """Set max concurrent calls per provider; None leaves a limit unchanged.
+
+    The OpenAI limit is the shared LLM client's concurrency budget.
+    """
+    if openai is not None:
+        get_llm_manager().set_max_concurrency(openai)
+    for provider, limit in (('tavily', tavily), ('yfinance', yfinance)):
+        if limit is not None:
+            _limits[provider] = limit
+            _semaphores.pop(provider, None)
+
+def provider_limits() -> Dict[str, int]:
+    return {'openai': get_llm_manager().max_concurrency, **_limits}
+
+def _get_semaphore(provider: str) -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    if provider not in _semaphores or _semaphore_loops.get(provider) is not loop:
+        _semaphores[provider] = asyncio.Semaphore(_limits[provider])
+        _semaphore_loops[provider] = loop
+    return _semaphores[provider]
+
+@asynccontextmanager
+async def provider_slot(provider: str):
+    """Hold one concurrent-call slot for a research provider"""
+    async with _get_semaphore(provider):
+        yield
@@ -0,0 +1,222 @@
+"""Token-bucket rate limiting and retry with backoff for OpenAI, Tavily and yfinance.
+
+Every outbound call reserves capacity from its provider's bucket(s) before it
+runs: requests/second for all providers, plus tokens/minute for OpenAI. A
+throttled call (429, 5xx, provider rate-limit errors) is retried with jittered
+exponential backoff, honouring Retry-After when the provider sends it, and the
+bucket is paused for that long so concurrent callers back off too.
+"""
+import asyncio
+import email.utils
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Optional
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+_RETRYABLE_MARKERS = ('too many requests', 'rate limit', 'ratelimit', 'temporarily unavailable', 'timed out')
+
+class TokenBucket:
+    """Thread-safe token bucket; reserve() says how long the caller has to wait"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate                      # tokens added per second
+        self.capacity = capacity or max(rate, 1.0)
+        self.clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """Take `amount` tokens, going into debt if needed; returns seconds to wait"""
+        with self._lock:
+            self._refill(self.clock())
+            self._tokens -= amount
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def pause(self, seconds: float) -> None:
+        """Hold back new reservations for `seconds` (after a provider throttle)"""
+        with self._lock:
+            self._refill(self.clock())
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+@dataclass
+class RateLimitMetrics:
+    calls: int = 0
+    retries: int = 0
+    throttled: int = 0
+    failures: int = 0
+    queue_wait_total: float = 0.0
+    queue_wait_max: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['queue_wait_avg'] = self.queue_wait_total / self.calls if self.calls else 0.0
+        return data
+
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status if isinstance(status, int) else None
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds from a Retry-After / retry-after-ms header on the error's response, if any"""
+    headers = getattr(getattr(error, 'response', None), 'headers', None)
+    if not headers:
+        return None
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers['retry-after-ms']) / 1000
+        value = headers.get('retry-after')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            when = email.utils.parsedate_to_datetime(value)
+            return max(0.0, when.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def is_retryable(error: Exception) -> bool:
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    name = type(error).__name__
+    if name in ('APIConnectionError', 'APITimeoutError', 'RateLimitError', 'YFRateLimitError', 'TimeoutError'):
+        return True
+    message = str(error).lower()
+    return '429' in message or any(marker in message for marker in _RETRYABLE_MARKERS)
+
+def _is_throttle(error: Exception) -> bool:
+    return _status_code(error) == 429 or 'RateLimit' in type(error).__name__ or '429' in str(error)
+
+class RateLimiter:
+    """Request-rate (and optionally token-rate) limiter plus retry policy for one provider.
+
+    clock, sleep and async_sleep are only replaced in tests.
+    """
+
+    def __init__(self,
+                 provider: str,
+                 requests_per_second: float,
+                 burst: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None,
+                 max_retries: int = 5,
+                 base_delay: float = 0.5,
+                 max_delay: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep,
+                 async_sleep: Callable[[float], Any] = asyncio.sleep):
+        self.provider = provider
+        self.requests = TokenBucket(requests_per_second, burst, clock)
+        self.tokens = TokenBucket(tokens_per_minute / 60, tokens_per_minute, clock) if tokens_per_minute else None
+        self.sleep = sleep
+        self.async_sleep = async_sleep
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.metrics = RateLimitMetrics()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float) -> float:
+        delay = self.requests.reserve(1)
+        if self.tokens is not None and tokens:
+            delay = max(delay, self.tokens.reserve(tokens))
+        with self._lock:
+            self.metrics.calls += 1
+            self.metrics.queue_wait_total += delay
+            self.metrics.queue_wait_max = max(self.metrics.queue_wait_max, delay)
+        return delay
+
+    def _backoff(self, attempt: int, error: Exception) -> Optional[float]:
+        """Delay before the next attempt, or None if the error should propagate"""
+        if attempt >= self.max_retries or not is_retryable(error):
+            with self._lock:
+                self.metrics.failures += 1
+            return None
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        server_delay = retry_after(error)
+        if server_delay is not None:
+            delay = server_delay + random.uniform(0, self.base_delay)
+        with self._lock:
+            self.metrics.retries += 1
+            if _is_throttle(error):
+                self.metrics.throttled += 1
+        logging.warning(f"{self.provider} call failed ({str(error)[:120]}); retry {attempt + 1} in {delay:.2f}s")
+        if _is_throttle(error):
+            # Pausing the bucket delays every caller, including this retry's reservation
+            self.requests.pause(delay)
+            return 0.0
+        return delay
+
+    async def call_async(self, fn: Callable, *args, tokens: float = 0, **kwargs) -> Any:
+        """Await fn(*args, **kwargs) under the rate limit, retrying throttled calls"""
+        attempt = 0
+        while True:
+            delay = self._reserve(tokens)
+            if delay:
+                await self.async_sleep(delay)
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                backoff = self._backoff(attempt, e)
+                if backoff is None:
+                    raise
+                if backoff:
+                    await self.async_sleep(backoff)
+                attempt += 1
+
+    def call(self, fn: Callable, *args, tokens: float = 0, **kwargs) -> Any:
+        """Blocking variant of call_async for the sync yfinance/Tavily/OpenAI clients"""
+        attempt = 0
+        while True:
+            delay = self._reserve(tokens)
+            if delay:
+                self.sleep(delay)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                backoff = self._backoff(attempt, e)
+                if backoff is None:
+                    raise
+                if backoff:
+                    self.sleep(backoff)
+                attempt += 1
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+def _default_limiters() -> Dict[str, RateLimiter]:
+    return {
+        'openai': RateLimiter('openai', _env_float("OPENAI_RPS", 8), burst=_env_float("OPENAI_RPS", 8),
+                              tokens_per_minute=_env_float("OPENAI_TPM", 30000)),
+        'tavily': RateLimiter('tavily', _env_float("TAVILY_RPS", 1.5), burst=3),
+        'yfinance': RateLimiter('yfinance', _env_float("YFINANCE_RPS", 2), burst=4),
+    }
+
+_limiters: Dict[str, RateLimiter] = _default_limiters()
+
+def get_rate_limiter(provider: str) -> RateLimiter:
+    return _limiters[provider]
+
+def configure_rate_limit(provider: str, **kwargs) -> RateLimiter:
+    """Replace a provider's limiter, e.g. configure_rate_limit('openai', requests_per_second=50, tokens_per_minute=800000)"""
+    _limiters[provider] = RateLimiter(provider, **kwargs)
+    return _limiters[provider]
+
+def rate_limit_metrics() -> Dict[str, Dict[str, Any]]:
+    """Queue wait, retry and throttle counters per provider"""
+    return {provider: limiter.metrics.to_dict() for provider, limiter in _limiters.items()}
+
+def estimate_tokens(messages: list, max_tokens: int = 0) -> int:
+    """Rough prompt + completion token count (4 characters per token) for the TPM bucket"""
+    return sum(len(str(m.get('content', ''))) for m in messages) // 4 + (max_tokens or 0)
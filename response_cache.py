@@ -0,0 +1,67 @@
+"""Deterministic LLM response cache.
+
+Completions are keyed on (model, system prompt, prompt hash, temperature,
+max_tokens), so re-running an analysis on unchanged research data replays the
+stored debate instead of paying for LLM calls. Debate turns are sampled at
+temperature 0.7, so a replay is not what a new run would say; the cache is
+off unless enabled, and fresh=True calls (analyze_stock(reuse=False)) skip
+the lookup. With the SQLite backend a recorded debate can be replayed offline
+by tests and benchmarks.
+"""
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+
+from cache import CacheBackend, CacheStats, MemoryLRUCache, SQLiteCache
+
+class ResponseCache:
+    def __init__(self, backend: Optional[CacheBackend] = None):
+        self.backend = backend if backend is not None else MemoryLRUCache(2048)
+
+    @property
+    def stats(self) -> CacheStats:
+        return self.backend.stats
+
+    @staticmethod
+    def key(request: Dict[str, Any]) -> str:
+        messages = request.get('messages', [])
+        system_prompt = "".join(m['content'] for m in messages if m['role'] == 'system')
+        prompt = "\n".join(m['content'] for m in messages if m['role'] != 'system')
+        parts = [
+            request.get('model'),
+            hashlib.sha256(system_prompt.encode()).hexdigest(),
+            hashlib.sha256(prompt.encode()).hexdigest(),
+            request.get('temperature'),
+            request.get('max_tokens'),
+        ]
+        return "llm:" + hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+
+    def lookup(self, request: Dict[str, Any]) -> Optional[str]:
+        entry = self.backend.get(self.key(request))
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return entry[0]
+
+    def store(self, request: Dict[str, Any], text: str) -> None:
+        if text:
+            self.backend.set(self.key(request), text)
+
+def _default_response_cache() -> Optional[ResponseCache]:
+    """RESPONSE_CACHE=1 enables caching in memory; RESPONSE_CACHE_PATH enables it in SQLite"""
+    path = os.getenv("RESPONSE_CACHE_PATH")
+    if not path and os.getenv("RESPONSE_CACHE", "0").lower() not in ("1", "true", "on"):
+        return None
+    return ResponseCache(SQLiteCache(path, max_entries=100000) if path else None)
+
+_response_cache: Optional[ResponseCache] = _default_response_cache()
+
+def get_response_cache() -> Optional[ResponseCache]:
+    return _response_cache
+
+def set_response_cache(cache: Optional[ResponseCache]) -> None:
+    """Swap the response cache; pass None to disable caching"""
+    global _response_cache
+    _response_cache = cache
@@ -0,0 +1,333 @@
+"""Persistent store of finished debates, keyed by the research they argued from.
+
+Each analysis is saved with a fingerprint of its inputs: a hash of the
+metrics, one id per news story and the numeric metrics themselves. On the next
+run for the same ticker, plan() compares the new research with the latest
+stored analysis and picks one of:
+
+    reuse  no new stories and only price/volume noise: return the stored
+           result, no LLM calls
+    delta  a few new stories or small metric moves: one short round on only
+           what changed, appended to the stored debate
+    full   anything else, errors in either research, or too many deltas in a row
+
+History is indexed by (ticker, created_at) for date-range queries:
+
+    store = ResultStore("results.db")
+    store.history("AAPL", since="2024-06-01")
+
+analyze_stock uses the store from RESULT_STORE_PATH when it is set. From the
+command line:
+
+    python result_store.py results.db AAPL --since 2024-06-01
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Union
+
+# Metrics whose relative change decides between reuse, delta and full; raw volume
+# moves all day, so it only counts through the volume / average volume ratio
+DRIFT_FIELDS = ('current_price', 'pe_ratio', 'market_cap', '52_week_high', '52_week_low', 'avg_volume')
+
+_RECOMMENDATION = re.compile(r"recommendation is to (BUY|SELL|HOLD)")
+
+def _digest(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def news_id(item: Dict[str, Any]) -> str:
+    """Stable id for a story: its URL without query string, or its title"""
+    url = str(item.get('url') or '').split('?')[0].rstrip('/')
+    return _digest(url if url and url != '#' else " ".join(str(item.get('title') or '').lower().split()))
+
+@dataclass
+class ResearchFingerprint:
+    metrics_hash: str
+    news_ids: List[str]
+    metrics: Dict[str, Optional[float]]
+    volume_ratio: Optional[float] = None
+    error: bool = False  # either source failed; such results are never reused or extended
+
+    @classmethod
+    def of(cls, research: Any) -> "ResearchFingerprint":
+        """Fingerprint a ResearchBundle (or legacy research dict)"""
+        metrics = research.get('metrics') or {}
+        news = research.get('news') or {}
+        volume, avg_volume = _number(metrics.get('volume')), _number(metrics.get('avg_volume'))
+        return cls(
+            metrics_hash=_digest(metrics),
+            news_ids=[news_id(item) for item in news.get('news', [])],
+            metrics={name: _number(metrics.get(name)) for name in DRIFT_FIELDS},
+            volume_ratio=volume / avg_volume if volume is not None and avg_volume else None,
+            error=bool(metrics.get('error') or news.get('error') or not metrics)
+        )
+
+    @property
+    def news_hash(self) -> str:
+        return _digest(sorted(self.news_ids))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ResearchFingerprint":
+        return cls(**data)
+
+@dataclass
+class ReusePolicy:
+    reuse_drift: float = 0.01        # relative metric move still treated as unchanged
+    reuse_volume_shift: float = 0.1  # change in volume / avg volume still treated as unchanged
+    delta_drift: float = 0.05        # largest relative metric move a delta round may cover
+    delta_volume_shift: float = 0.5  # largest change in volume / avg volume a delta round may cover
+    max_new_news: int = 2            # new stories a delta round may cover
+    delta_turns: int = 1             # rounds in a delta debate
+    max_delta_chain: int = 3         # deltas in a row before a full debate
+    max_age_hours: Optional[float] = None  # older results are never reused or extended
+
+    @classmethod
+    def from_env(cls) -> "ReusePolicy":
+        max_age = os.getenv("RESULT_MAX_AGE_HOURS")
+        return cls(
+            reuse_drift=float(os.getenv("RESULT_REUSE_DRIFT", "0.01")),
+            reuse_volume_shift=float(os.getenv("RESULT_REUSE_VOLUME_SHIFT", "0.1")),
+            delta_drift=float(os.getenv("RESULT_DELTA_DRIFT", "0.05")),
+            delta_volume_shift=float(os.getenv("RESULT_DELTA_VOLUME_SHIFT", "0.5")),
+            max_new_news=int(os.getenv("RESULT_MAX_NEW_NEWS", "2")),
+            delta_turns=int(os.getenv("RESULT_DELTA_TURNS", "1")),
+            max_delta_chain=int(os.getenv("RESULT_MAX_DELTA_CHAIN", "3")),
+            max_age_hours=float(max_age) if max_age else None
+        )
+
+@dataclass
+class StoredResult:
+    id: int
+    ticker: str
+    created_at: float
+    mode: str                 # how it was produced: 'full' or 'delta'
+    depth: int                # deltas since the last full debate
+    parent_id: Optional[int]
+    fingerprint: ResearchFingerprint
+    result: Dict[str, Any]    # analyze_stock result, research as a plain dict
+
+@dataclass
+class ResearchDelta:
+    """What changed since the stored analysis, and what to do about it"""
+    mode: str
+    reason: str
+    previous: Optional[StoredResult] = None
+    drift: float = 0.0
+    volume_shift: float = 0.0
+    new_news: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'mode': self.mode,
+            'reason': self.reason,
+            'previous_id': self.previous.id if self.previous else None,
+            'previous_at': self.previous.created_at if self.previous else None,
+            'drift': round(self.drift, 6),
+            'volume_shift': round(self.volume_shift, 6),
+            'new_news': len(self.new_news)
+        }
+
+def metric_drift(old: ResearchFingerprint, new: ResearchFingerprint) -> float:
+    """Largest relative change across DRIFT_FIELDS; a value appearing or vanishing counts as 100%"""
+    drift = 0.0
+    for name in DRIFT_FIELDS:
+        a, b = old.metrics.get(name), new.metrics.get(name)
+        if a is None and b is None:
+            continue
+        if a is None or b is None:
+            return 1.0
+        if a != b:
+            drift = max(drift, abs(b - a) / max(abs(a), 1e-9))
+    return drift
+
+def compare(previous: Optional[StoredResult], current: ResearchFingerprint,
+            policy: Optional[ReusePolicy] = None, now: Optional[float] = None) -> ResearchDelta:
+    """Decide between reusing, extending or replacing the previous analysis"""
+    policy = policy or ReusePolicy()
+    if previous is None:
+        return ResearchDelta('full', 'no stored analysis')
+    if current.error or previous.fingerprint.error:
+        return ResearchDelta('full', 'research incomplete', previous)
+    age_hours = ((now or time.time()) - previous.created_at) / 3600
+    if policy.max_age_hours is not None and age_hours > policy.max_age_hours:
+        return ResearchDelta('full', f"stored analysis is {age_hours:.0f}h old", previous)
+
+    old = previous.fingerprint
+    known = set(old.news_ids)
+    new_news = [i for i in dict.fromkeys(current.news_ids) if i not in known]
+    drift = 0.0 if current.metrics_hash == old.metrics_hash else metric_drift(old, current)
+    if old.volume_ratio is None or current.volume_ratio is None:
+        volume_shift = 0.0 if old.volume_ratio == current.volume_ratio else float('inf')
+    else:
+        volume_shift = abs(current.volume_ratio - old.volume_ratio)
+    delta = ResearchDelta('full', '', previous, drift, volume_shift, new_news)
+
+    if not new_news and drift <= policy.reuse_drift and volume_shift <= policy.reuse_volume_shift:
+        delta.mode, delta.reason = 'reuse', 'research unchanged'
+    elif len(new_news) > policy.max_new_news:
+        delta.reason = f"{len(new_news)} new stories"
+    elif drift > policy.delta_drift:
+        delta.reason = f"metrics moved {drift:.1%}"
+    elif volume_shift > policy.delta_volume_shift:
+        delta.reason = f"volume ratio moved {volume_shift:.2f}"
+    elif previous.depth >= policy.max_delta_chain:
+        delta.reason = f"{previous.depth} delta rounds since the last full debate"
+    else:
+        delta.mode = 'delta'
+        delta.reason = f"{len(new_news)} new stories, metrics moved {drift:.1%}"
+    return delta
+
+def recommendation(conclusion: str) -> Optional[str]:
+    """BUY/SELL/HOLD from a scoring.build_conclusion text"""
+    match = _RECOMMENDATION.search(conclusion or "")
+    return match.group(1) if match else None
+
+def _timestamp(value: Union[None, float, int, str, date, datetime]) -> Optional[float]:
+    """Epoch seconds from an epoch, datetime, date or ISO string (dates mean local midnight)"""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    return value.timestamp()
+
+class ResultStore:
+    """SQLite table of analyses; safe to share between threads"""
+
+    def __init__(self, path: str, policy: Optional[ReusePolicy] = None):
+        self.path = path
+        self.policy = policy or ReusePolicy.from_env()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, ticker TEXT NOT NULL, created_at REAL NOT NULL, "
+            "mode TEXT NOT NULL, depth INTEGER NOT NULL, parent_id INTEGER, "
+            "metrics_hash TEXT NOT NULL, news_hash TEXT NOT NULL, fingerprint TEXT NOT NULL, "
+            "recommendation TEXT, conclusion TEXT, result TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_ticker_time ON results (ticker, created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_time ON results (created_at)")
+        self._conn.commit()
+
+    def save(self, ticker: str, result: Dict[str, Any], fingerprint: ResearchFingerprint,
+             mode: str = 'full', parent: Optional[StoredResult] = None) -> StoredResult:
+        """Store an analyze_stock result; mode is 'full' or 'delta' (extending parent)"""
+        research = result.get('research')
+        payload = {k: v for k, v in result.items() if k not in ('research', 'analysis')}
+        payload['research'] = research.to_dict() if hasattr(research, 'to_dict') else research
+        depth = parent.depth + 1 if mode == 'delta' and parent is not None else 0
+        created_at = time.time()
+        conclusion = result.get('conclusion') or ''
+        encoded = json.dumps(payload, default=str)
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO results (ticker, created_at, mode, depth, parent_id, metrics_hash, news_hash, "
+                "fingerprint, recommendation, conclusion, result) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (ticker.upper(), created_at, mode, depth, parent.id if parent else None,
+                 fingerprint.metrics_hash, fingerprint.news_hash, json.dumps(fingerprint.to_dict()),
+                 recommendation(conclusion), conclusion, encoded)
+            )
+            self._conn.commit()
+        return StoredResult(cursor.lastrowid, ticker.upper(), created_at, mode, depth,
+                            parent.id if parent else None, fingerprint, json.loads(encoded))
+
+    def _load(self, row) -> StoredResult:
+        id_, ticker, created_at, mode, depth, parent_id, fingerprint, result = row
+        return StoredResult(id_, ticker, created_at, mode, depth, parent_id,
+                            ResearchFingerprint.from_dict(json.loads(fingerprint)), json.loads(result))
+
+    def get(self, result_id: int) -> Optional[StoredResult]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, ticker, created_at, mode, depth, parent_id, fingerprint, result FROM results WHERE id = ?",
+                (result_id,)
+            ).fetchone()
+        return self._load(row) if row else None
+
+    def latest(self, ticker: str) -> Optional[StoredResult]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, ticker, created_at, mode, depth, parent_id, fingerprint, result FROM results "
+                "WHERE ticker = ? ORDER BY created_at DESC, id DESC LIMIT 1", (ticker.upper(),)
+            ).fetchone()
+        return self._load(row) if row else None
+
+    def plan(self, ticker: str, fingerprint: ResearchFingerprint) -> ResearchDelta:
+        """Compare fresh research with the latest stored analysis of ticker"""
+        return compare(self.latest(ticker), fingerprint, self.policy)
+
+    def history(self, ticker: Optional[str] = None, since=None, until=None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Newest first, without the debate payloads; since/until take epochs, dates or ISO strings"""
+        clauses, params = [], []
+        if ticker:
+            clauses.append("ticker = ?")
+            params.append(ticker.upper())
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(_timestamp(since))
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(_timestamp(until))
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, ticker, created_at, mode, depth, parent_id, recommendation, conclusion FROM results "
+                f"{where}ORDER BY created_at DESC, id DESC LIMIT ?", (*params, limit)
+            ).fetchall()
+        columns = ('id', 'ticker', 'created_at', 'mode', 'depth', 'parent_id', 'recommendation', 'conclusion')
+        return [dict(zip(columns, row)) for row in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+def _default_result_store() -> Optional[ResultStore]:
+    """RESULT_STORE_PATH enables the store; unset keeps every analysis from scratch"""
+    path = os.getenv("RESULT_STORE_PATH")
+    return ResultStore(path) if path else None
+
+_result_store: Optional[ResultStore] = _default_result_store()
+
+def get_result_store() -> Optional[ResultStore]:
+    return _result_store
+
+def set_result_store(store: Optional[ResultStore]) -> None:
+    """Swap the result store; pass None to disable it"""
+    global _result_store
+    _result_store = store
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List stored analyses, newest first")
+    parser.add_argument("path", help="result store database")
+    parser.add_argument("ticker", nargs="?", help="only this ticker")
+    parser.add_argument("--since", help="ISO date or datetime, inclusive")
+    parser.add_argument("--until", help="ISO date or datetime, exclusive")
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+    store = ResultStore(args.path)
+    for row in store.history(args.ticker, since=args.since, until=args.until, limit=args.limit):
+        when = datetime.fromtimestamp(row['created_at']).strftime("%Y-%m-%d %H:%M")
+        print(f"{when}  {row['ticker']:<12}{row['recommendation'] or '-':<6}{row['mode']:<7}#{row['id']}")
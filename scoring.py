@@ -0,0 +1,37 @@
+"""Turn a finished debate transcript into a recommendation.
+
+Pure function of its arguments so batch runs can hand it to a worker process
+(see workers.run_cpu) instead of scoring on the event loop thread.
+"""
+from typing import Any, Dict, List
+
+def build_conclusion(ticker: str, messages: List[Dict[str, Any]]) -> str:
+    """BUY/SELL/HOLD recommendation weighed from each side's share of the debate"""
+    buy_weight = 0
+    sell_weight = 0
+    bullish_points = []
+    bearish_points = []
+
+    for msg in messages:
+        content = msg['content']
+        if "bullish" in msg['role'].lower():
+            buy_weight += 1
+            bullish_points.append("- " + content.split('.')[0] + ".")
+        elif "bearish" in msg['role'].lower():
+            sell_weight += 1
+            bearish_points.append("- " + content.split('.')[0] + ".")
+
+    confidence = abs(buy_weight - sell_weight)/max(len(messages),1)
+
+    conclusion = f"After analyzing {ticker}, our recommendation is to "
+    if buy_weight > sell_weight and confidence > 0.25:
+        conclusion += f"BUY with {int(confidence*100)}% confidence.\n\n"
+        conclusion += "Key bullish points:\n" + "\n".join(bullish_points[-3:])
+    elif sell_weight > buy_weight and confidence > 0.25:
+        conclusion += f"SELL with {int(confidence*100)}% confidence.\n\n"
+        conclusion += "Key bearish points:\n" + "\n".join(bearish_points[-3:])
+    else:
+        conclusion += "HOLD as arguments are balanced.\n\n"
+        conclusion += "Bullish considerations:\n" + "\n".join(bullish_points[:3])
+        conclusion += "\n\nBearish considerations:\n" + "\n".join(bearish_points[:3])
+    return conclusion
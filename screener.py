@@ -0,0 +1,135 @@
+"""Vectorized quantitative pre-screen over the bulk metrics table.
+
+Only tickers showing at least one notable signal are worth a full LLM debate:
+- price near either end of its 52-week range,
+- volume well above its average,
+- P/E at either extreme relative to the rest of the screened universe.
+Everything else is reported as HOLD without spending LLM calls.
+"""
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+@dataclass
+class ScreenThresholds:
+    range_low: float = 0.15       # price in the bottom 15% of its 52-week range
+    range_high: float = 0.85      # ... or in the top 15%
+    volume_ratio: float = 1.5     # volume at least 1.5x the average
+    pe_low_pct: float = 0.10      # P/E in the cheapest 10% of the universe
+    pe_high_pct: float = 0.90     # ... or the most expensive 10%
+    min_signals: int = 1          # signals needed to pass
+
+# Metric columns the screen reads, and the columns it produces, in array order
+INPUT_COLUMNS = ['current_price', '52_week_high', '52_week_low', 'volume', 'avg_volume', 'pe_ratio']
+OUTPUT_COLUMNS = ['range_position', 'volume_ratio', 'pe_percentile', 'near_low', 'near_high',
+                  'volume_spike', 'pe_extreme', 'signals', 'passed']
+_BOOL_COLUMNS = ('near_low', 'near_high', 'volume_spike', 'pe_extreme', 'passed')
+
+def _input_values(table: "pd.DataFrame") -> "np.ndarray":
+    """rows x INPUT_COLUMNS float array; non-numeric values become NaN"""
+    import pandas as pd
+    return pd.DataFrame({c: pd.to_numeric(table[c], errors='coerce') for c in INPUT_COLUMNS}).to_numpy(dtype=float)
+
+def _score(values: "np.ndarray", pe_sorted: "np.ndarray", thresholds: ScreenThresholds, out: "np.ndarray") -> None:
+    """Fill out (rows x OUTPUT_COLUMNS) from values (rows x INPUT_COLUMNS).
+
+    pe_sorted holds every positive P/E in the screened universe, so any row
+    range can be scored on its own with the same percentiles.
+    """
+    import numpy as np
+
+    price, high, low, volume, avg_volume, pe = values.T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        span = high - low
+        range_position = np.where(span > 0, (price - low) / span, np.nan)
+        volume_ratio = np.where(avg_volume > 0, volume / avg_volume, np.nan)
+
+    # Percentile among tickers with a meaningful (positive) P/E; ties share their average rank
+    pe_percentile = np.full(len(pe), np.nan)
+    valid = pe > 0
+    if valid.any() and len(pe_sorted):
+        below = np.searchsorted(pe_sorted, pe[valid], side='left')
+        through = np.searchsorted(pe_sorted, pe[valid], side='right')
+        ranks = below + (through - below + 1) / 2
+        pe_percentile[valid] = (ranks - 0.5) / len(pe_sorted)
+
+    near_low = range_position <= thresholds.range_low
+    near_high = range_position >= thresholds.range_high
+    volume_spike = volume_ratio >= thresholds.volume_ratio
+    pe_extreme = (pe_percentile <= thresholds.pe_low_pct) | (pe_percentile >= thresholds.pe_high_pct)
+    signals = near_low.astype(int) + near_high + volume_spike + pe_extreme
+    for i, column in enumerate((range_position, volume_ratio, pe_percentile, near_low, near_high,
+                                volume_spike, pe_extreme, signals, signals >= thresholds.min_signals)):
+        out[:, i] = column
+
+def _frame(out: "np.ndarray", index) -> "pd.DataFrame":
+    import pandas as pd
+
+    screened = pd.DataFrame(out, columns=OUTPUT_COLUMNS, index=index)
+    for column in _BOOL_COLUMNS:
+        screened[column] = screened[column].astype(bool)
+    screened['signals'] = screened['signals'].astype(int)
+    return screened
+
+def _pe_universe(values: "np.ndarray") -> "np.ndarray":
+    import numpy as np
+    pe = values[:, INPUT_COLUMNS.index('pe_ratio')]
+    return np.sort(pe[pe > 0])
+
+def screen(table: "pd.DataFrame", thresholds: Optional[ScreenThresholds] = None) -> "pd.DataFrame":
+    """Score every row of a get_bulk_metrics table; returns one row per ticker with a `passed` flag"""
+    # Imported here so that `from screener import ScreenThresholds` stays cheap
+    import numpy as np
+
+    values = _input_values(table)
+    out = np.empty((len(values), len(OUTPUT_COLUMNS)))
+    _score(values, _pe_universe(values), thresholds or ScreenThresholds(), out)
+    return _frame(out, table.index)
+
+def _screen_rows(values_spec, pe_spec, out_spec, start: int, stop: int, thresholds: ScreenThresholds) -> int:
+    """Worker side of screen_parallel: score rows [start, stop) in shared memory"""
+    from workers import attach
+
+    handles = []
+    try:
+        arrays = []
+        for spec in (values_spec, pe_spec, out_spec):
+            shm, array = attach(spec)
+            handles.append(shm)
+            arrays.append(array)
+        values, pe_sorted, out = arrays
+        _score(values[start:stop], pe_sorted, thresholds, out[start:stop])
+        del values, pe_sorted, out, arrays  # release the buffers before closing
+    finally:
+        for shm in handles:
+            shm.close()
+    return stop - start
+
+async def screen_parallel(table: "pd.DataFrame", thresholds: Optional[ScreenThresholds] = None,
+                          pool=None, rows_per_task: int = 50_000) -> "pd.DataFrame":
+    """screen() split by rows across a workers.WorkerPool.
+
+    The inputs and results live in shared memory, so workers neither receive
+    nor return table data; only row ranges cross the process boundary.
+    """
+    from workers import SharedArray
+
+    if pool is None or len(table) <= rows_per_task:
+        return screen(table, thresholds)
+    thresholds = thresholds or ScreenThresholds()
+    values = _input_values(table)
+    with SharedArray.copy_of(values) as shared_values, \
+            SharedArray.copy_of(_pe_universe(values)) as shared_pe, \
+            SharedArray((len(values), len(OUTPUT_COLUMNS))) as shared_out:
+        step = max(rows_per_task, -(-len(values) // pool.workers))
+        await pool.map(_screen_rows, [
+            (shared_values.spec, shared_pe.spec, shared_out.spec, start, min(start + step, len(values)), thresholds)
+            for start in range(0, len(values), step)
+        ], chunksize=1)
+        return _frame(shared_out.array.copy(), table.index)
+
+def passing_tickers(screened: "pd.DataFrame") -> List[str]:
+    return screened.index[screened['passed'].to_numpy()].tolist()
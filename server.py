@@ -0,0 +1,354 @@
+"""Headless async HTTP service for StockDebateSystem.
+
+    GET  /research/{ticker}   research bundle as JSON
+    GET  /debate/{ticker}     debate streamed as server-sent events
+    POST /batch               {"tickers": [...], "concurrency": 8} -> results streamed as NDJSON
+    GET  /stats               admission, in-flight, cache and latency/token metrics (JSON)
+    GET  /metrics             the same latency/token metrics in Prometheus text format
+
+Concurrent requests for the same ticker share one in-flight research fetch or
+debate. New debates are admitted only while the LLM concurrency budget has
+room (plus a bounded wait queue); beyond that the service answers 503 with
+Retry-After instead of queueing without limit. A batch is admitted the same
+way: it reserves up to `concurrency` debate slots and works through its
+tickers on those, joining debates already in flight for the same ticker.
+
+    python server.py --port 8080
+"""
+import argparse
+import asyncio
+import json
+import logging
+import re
+import time
+from collections import deque
+from contextlib import asynccontextmanager, nullcontext
+from typing import Any, Callable, Dict, List, Optional
+
+from aiohttp import web
+
+from batch import research_error, result_record
+from custom_agent import DEBATE_SCHEDULES
+from data_fetcher import ResearchBundle, get_stock_research_async, research_cache_stats
+from llm_client import get_llm_manager, shutdown_llm_client
+from main import StockDebateSystem
+from rate_limit import rate_limit_metrics
+from telemetry import get_telemetry
+
+_TICKER = re.compile(r"^[A-Z0-9.\-^=&]{1,20}$")
+
+class Overloaded(Exception):
+    """No debate slot became free in time"""
+
+class Broadcast:
+    """Append-only event log that any number of subscribers can replay and follow"""
+
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self.closed = False
+        self.result: Optional[Dict[str, Any]] = None  # analyze_stock result once done
+        self._changed = asyncio.Condition()
+
+    async def publish(self, event: Dict[str, Any], close: bool = False) -> None:
+        async with self._changed:
+            self.events.append(event)
+            self.closed = self.closed or close
+            self._changed.notify_all()
+
+    async def subscribe(self):
+        seen = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: len(self.events) > seen or self.closed)
+                batch, closed = self.events[seen:], self.closed
+            seen += len(batch)
+            for event in batch:
+                yield event
+            if closed and seen == len(self.events):
+                return
+
+class DebateGate:
+    """Admission control: at most max_active debates run, max_waiting wait for a slot"""
+
+    def __init__(self, max_active: int, max_waiting: int, wait_timeout: float):
+        self.max_active = max_active
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._slots = asyncio.Semaphore(max_active)
+
+    @property
+    def free(self) -> int:
+        return max(0, self.max_active + self.max_waiting - self.active - self.waiting)
+
+    def admit(self) -> bool:
+        """Reserve a place in the queue for a new debate, or refuse when full.
+
+        An admitted debate must then enter slot(), which releases the reservation.
+        """
+        if self.active + self.waiting >= self.max_active + self.max_waiting:
+            self.rejected += 1
+            return False
+        self.waiting += 1
+        return True
+
+    @asynccontextmanager
+    async def slot(self):
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.wait_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise Overloaded(f"no debate slot free after {self.wait_timeout}s")
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._slots.release()
+
+class DebateService:
+    def __init__(self, system: Optional[StockDebateSystem] = None, max_active: Optional[int] = None,
+                 max_waiting: int = 32, wait_timeout: float = 30.0, retry_after: int = 5):
+        self.system = system or StockDebateSystem()
+        # Each debate can have two agent calls in flight at once
+        self.gate = DebateGate(max_active or max(1, get_llm_manager().max_concurrency // 2),
+                               max_waiting, wait_timeout)
+        self.retry_after = retry_after
+        self._research: Dict[str, asyncio.Task] = {}
+        self._debates: Dict[tuple, Broadcast] = {}
+        self.coalesced = 0
+
+    async def research(self, ticker: str) -> ResearchBundle:
+        """Fetch research, sharing one fetch between concurrent callers"""
+        task = self._research.get(ticker)
+        if task is None:
+            task = asyncio.ensure_future(get_stock_research_async(ticker))
+            self._research[ticker] = task
+            task.add_done_callback(lambda _: self._research.pop(ticker, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def debate(self, ticker: str, schedule: str) -> Optional[Broadcast]:
+        """Join the in-flight debate for a ticker or start one; None when overloaded"""
+        key = (ticker, schedule)
+        broadcast = self._debates.get(key)
+        if broadcast is not None:
+            self.coalesced += 1
+            return broadcast
+        if not self.gate.admit():
+            return None
+        broadcast = Broadcast()
+        self._debates[key] = broadcast
+        task = asyncio.ensure_future(self._run_debate(ticker, schedule, broadcast))
+        task.add_done_callback(lambda _: self._debates.pop(key, None))
+        return broadcast
+
+    def admit_batch(self, concurrency: int) -> int:
+        """Reserve debate places for a batch; returns how many (0 when the gate is full)"""
+        lanes = min(concurrency, self.gate.max_active, self.gate.free)
+        if lanes == 0:
+            self.gate.admit()  # refused; counted as a rejection
+            return 0
+        for _ in range(lanes):
+            self.gate.admit()
+        return lanes
+
+    async def run_batch(self, tickers: List[str], schedule: str, lanes: int,
+                        emit: Callable[[Dict[str, Any]], None]) -> None:
+        """Debate tickers on `lanes` places reserved by admit_batch, emitting one record per ticker.
+
+        Each lane holds one debate slot for as long as tickers remain, so the
+        batch never has more debates running than it was admitted for.
+        """
+        pending = deque(tickers)
+
+        async def lane() -> None:
+            try:
+                async with self.gate.slot():
+                    while pending:
+                        emit(await self._batch_record(pending.popleft(), schedule))
+            except Overloaded as e:
+                logging.error(f"Batch lane gave up waiting for a debate slot: {str(e)}")
+
+        await asyncio.gather(*[lane() for _ in range(lanes)])
+        while pending:  # every lane timed out waiting for a slot
+            emit(result_record(pending.popleft(), None, 0.0, error="Debate capacity exhausted, retry later"))
+
+    async def _batch_record(self, ticker: str, schedule: str) -> Dict[str, Any]:
+        """Join the in-flight debate for ticker, or run one in the caller's slot"""
+        start = time.perf_counter()
+        key = (ticker, schedule)
+        broadcast = self._debates.get(key)
+        if broadcast is not None:
+            self.coalesced += 1
+        else:
+            broadcast = Broadcast()
+            self._debates[key] = broadcast
+            try:
+                await self._run_debate(ticker, schedule, broadcast, hold_slot=False)
+            finally:
+                self._debates.pop(key, None)
+        final = None
+        async for event in broadcast.subscribe():
+            final = event
+        error = final.get('error') if final and final['event'] == 'error' else None
+        if broadcast.result is None and error is None:
+            error = "Debate ended without a result"
+        return result_record(ticker, broadcast.result, time.perf_counter() - start, error=error)
+
+    async def _run_debate(self, ticker: str, schedule: str, broadcast: Broadcast, hold_slot: bool = True) -> None:
+        """Run a debate into broadcast; hold_slot=False when the caller already holds a gate slot"""
+        async def on_token(role, content):
+            await broadcast.publish({'event': 'token', 'role': role, 'content': content})
+
+        async def on_turn(role, response):
+            await broadcast.publish({'event': 'turn', 'role': role, 'content': response})
+
+        try:
+            async with self.gate.slot() if hold_slot else nullcontext():
+                research = await self.research(ticker)
+                await broadcast.publish({'event': 'research', **research.to_dict()})
+                error = research_error(research)
+                if error is not None:
+                    raise ValueError(error)
+                result = await self.system.analyze_stock(
+                    ticker, research_data=research, stream_handler=on_token,
+                    turn_handler=on_turn, schedule=schedule
+                )
+            broadcast.result = result
+            await broadcast.publish({'event': 'done', 'ticker': ticker, 'conclusion': result['conclusion'],
+                                     'messages': result['messages']}, close=True)
+        except Exception as e:
+            logging.error(f"Debate for {ticker} failed: {str(e)}")
+            await broadcast.publish({'event': 'error', 'ticker': ticker, 'error': str(e)}, close=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'debates': {'active': self.gate.active, 'waiting': self.gate.waiting,
+                        'rejected': self.gate.rejected, 'max_active': self.gate.max_active},
+            'in_flight': {'research': len(self._research), 'debates': len(self._debates)},
+            'coalesced': self.coalesced,
+            'llm': get_llm_manager().stats,
+            'research_cache': research_cache_stats(),
+            'rate_limits': rate_limit_metrics(),
+            'telemetry': get_telemetry().snapshot(),
+        }
+
+def _ticker(request: web.Request) -> str:
+    ticker = request.match_info['ticker'].upper()
+    if not _TICKER.match(ticker):
+        raise web.HTTPBadRequest(text=json.dumps({'error': f"Invalid ticker {ticker!r}"}),
+                                 content_type='application/json')
+    return ticker
+
+def _json(data: Any) -> str:
+    return json.dumps(data, default=str)
+
+def _bad_request(message: str) -> web.Response:
+    return web.json_response({'error': message}, status=400)
+
+def _schedule_error(schedule: Any) -> Optional[web.Response]:
+    if schedule not in DEBATE_SCHEDULES:
+        return _bad_request(f"schedule must be one of {', '.join(DEBATE_SCHEDULES)}")
+    return None
+
+async def handle_research(request: web.Request) -> web.Response:
+    service: DebateService = request.app['service']
+    research = await service.research(_ticker(request))
+    return web.json_response(research.to_dict(), dumps=_json)
+
+async def handle_debate(request: web.Request) -> web.StreamResponse:
+    service: DebateService = request.app['service']
+    ticker = _ticker(request)
+    schedule = request.query.get('schedule', 'parallel_openings')
+    invalid = _schedule_error(schedule)
+    if invalid is not None:
+        return invalid
+    broadcast = service.debate(ticker, schedule)
+    if broadcast is None:
+        return web.json_response({'error': 'Debate capacity exhausted, retry later'}, status=503,
+                                 headers={'Retry-After': str(service.retry_after)})
+
+    response = web.StreamResponse(headers={'Content-Type': 'text/event-stream', 'Cache-Control': 'no-cache'})
+    await response.prepare(request)
+    async for event in broadcast.subscribe():
+        payload = {k: v for k, v in event.items() if k != 'event'}
+        await response.write(f"event: {event['event']}\ndata: {_json(payload)}\n\n".encode())
+    await response.write_eof()
+    return response
+
+async def handle_batch(request: web.Request) -> web.StreamResponse:
+    service: DebateService = request.app['service']
+    try:
+        body = await request.json()
+    except ValueError:
+        return _bad_request("Body must be JSON")
+    if not isinstance(body, dict) or not isinstance(body.get('tickers'), list):
+        return _bad_request("Body must be {\"tickers\": [...]} with valid symbols")
+    tickers = list(dict.fromkeys(str(t).upper() for t in body['tickers']))
+    if not tickers or not all(_TICKER.match(t) for t in tickers):
+        return _bad_request("Body must be {\"tickers\": [...]} with valid symbols")
+    concurrency = body.get('concurrency', 8)
+    if not isinstance(concurrency, int) or isinstance(concurrency, bool) or concurrency < 1:
+        return _bad_request("concurrency must be a positive integer")
+    schedule = body.get('schedule', 'parallel_openings')
+    invalid = _schedule_error(schedule)
+    if invalid is not None:
+        return invalid
+
+    lanes = service.admit_batch(min(concurrency, len(tickers)))
+    if not lanes:
+        return web.json_response({'error': 'Debate capacity exhausted, retry later'}, status=503,
+                                 headers={'Retry-After': str(service.retry_after)})
+    records: asyncio.Queue = asyncio.Queue()
+    # Started before anything else can fail, so the reserved places are always used and released
+    task = asyncio.ensure_future(service.run_batch(tickers, schedule, lanes, records.put_nowait))
+    response = web.StreamResponse(headers={'Content-Type': 'application/x-ndjson'})
+    await response.prepare(request)
+    while not (task.done() and records.empty()):
+        try:
+            record = await asyncio.wait_for(records.get(), 0.5)
+        except asyncio.TimeoutError:
+            continue
+        await response.write((_json(record) + "\n").encode())
+    await task
+    await response.write_eof()
+    return response
+
+async def handle_stats(request: web.Request) -> web.Response:
+    return web.json_response(request.app['service'].stats(), dumps=_json)
+
+async def handle_metrics(request: web.Request) -> web.Response:
+    return web.Response(text=get_telemetry().prometheus_text(), content_type='text/plain',
+                        headers={'X-Content-Type-Options': 'nosniff'})
+
+async def _shutdown(app: web.Application) -> None:
+    await shutdown_llm_client()
+
+def create_app(service: Optional[DebateService] = None) -> web.Application:
+    app = web.Application()
+    app['service'] = service or DebateService()
+    app.router.add_get('/research/{ticker}', handle_research)
+    app.router.add_get('/debate/{ticker}', handle_debate)
+    app.router.add_post('/batch', handle_batch)
+    app.router.add_get('/stats', handle_stats)
+    app.router.add_get('/metrics', handle_metrics)
+    app.on_cleanup.append(_shutdown)
+    return app
+
+if __name__ == "__main__":
+    from app_logging import setup_logging
+    setup_logging()
+    parser = argparse.ArgumentParser(description="Serve stock debates over HTTP/SSE")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-active", type=int, help="concurrent debates (default: LLM concurrency / 2)")
+    parser.add_argument("--max-waiting", type=int, default=32, help="debates allowed to queue for a slot")
+    args = parser.parse_args()
+    web.run_app(create_app(DebateService(max_active=args.max_active, max_waiting=args.max_waiting)),
+                host=args.host, port=args.port)
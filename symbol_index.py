@@ -0,0 +1,261 @@
+"""Local company-name -> Yahoo Finance symbol index.
+
+Built from the bundled exchange listings in data/listings.csv so the common
+lookups never need an LLM call. Symbols the LLM resolves on an index miss are
+written to a persistent JSON cache and served locally from then on.
+"""
+import csv
+import json
+import logging
+import os
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+LISTINGS_PATH = os.getenv("SYMBOL_LISTINGS_PATH", os.path.join(DATA_DIR, 'listings.csv'))
+SYMBOL_CACHE_PATH = os.getenv("SYMBOL_CACHE_PATH", os.path.join(DATA_DIR, 'symbol_cache.json'))
+
+# Words that carry no identity ("Apple Inc." and "Apple" are the same company)
+_NOISE_WORDS = {
+    'the', 'inc', 'incorporated', 'corp', 'corporation', 'co', 'company', 'ltd',
+    'limited', 'plc', 'llc', 'sa', 'se', 'ag', 'nv', 'group', 'holdings', 'holding'
+}
+
+# Free-form country input -> (country code, forced exchange suffix)
+_COUNTRY_ALIASES = {
+    'us': ('US', None), 'usa': ('US', None), 'united states': ('US', None),
+    'united states of america': ('US', None), 'america': ('US', None),
+    'in': ('IN', None), 'india': ('IN', None), 'bharat': ('IN', None),
+    'nse': ('IN', '.NS'), 'india nse': ('IN', '.NS'),
+    'bse': ('IN', '.BO'), 'india bse': ('IN', '.BO'),
+    'uk': ('GB', None), 'gb': ('GB', None), 'united kingdom': ('GB', None),
+    'britain': ('GB', None), 'england': ('GB', None),
+    'jp': ('JP', None), 'japan': ('JP', None),
+    'de': ('DE', None), 'germany': ('DE', None),
+    'ca': ('CA', None), 'canada': ('CA', None),
+}
+
+# Fuzzy matches are for typos ("microsfot"), not for other companies whose names
+# share most words ("Bank of India" vs "State Bank of India"): candidates come
+# from shared trigrams, but are scored by edit distance over the whole name and
+# must clearly beat the best candidate with a different symbol
+FUZZY_THRESHOLD = 0.8  # 1 - edit distance / length of the longer name
+FUZZY_MARGIN = 0.1     # lead over the runner-up needed to accept a fuzzy match
+FUZZY_MIN_LENGTH = 4   # shorter names are too ambiguous to correct
+
+# Yahoo Finance symbol shape: AAPL, BRK-B, M&M.NS, 7203.T
+SYMBOL_PATTERN = re.compile(r"^[A-Z0-9][A-Z0-9&\-]{0,19}(\.[A-Z]{1,3})?$")
+
+def normalize_name(name: str) -> str:
+    """Lowercase, drop punctuation and corporate suffixes"""
+    name = name.lower().replace('&', ' and ')
+    words = re.sub(r"[^a-z0-9 ]+", " ", name.replace("'", "")).split()
+    kept = [w for w in words if w not in _NOISE_WORDS]
+    return " ".join(kept or words)
+
+def is_symbol(text: str) -> bool:
+    """Whether text looks like a Yahoo Finance symbol (the LLM's "BLANK" does not count)"""
+    return bool(SYMBOL_PATTERN.match(text)) and text != "BLANK"
+
+def similarity(a: str, b: str) -> float:
+    """1 - optimal string alignment distance / length of the longer string"""
+    if not a or not b:
+        return 0.0
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)  # transposition
+    return 1 - current[len(b)] / max(len(a), len(b))
+
+def _trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _parse_country(country: str) -> Tuple[str, Optional[str]]:
+    country = (country or "").strip().lower()
+    if not country:
+        return "", None
+    return _COUNTRY_ALIASES.get(country, (country.upper(), None))
+
+@dataclass(frozen=True)
+class Listing:
+    symbol: str
+    name: str
+    exchange: str
+    country: str
+
+class SymbolIndex:
+    """Exact, alias, ticker, prefix and typo-tolerant lookup over exchange listings"""
+
+    def __init__(self, listings: List[Listing], aliases: Optional[Dict[str, List[Listing]]] = None,
+                 cache_path: Optional[str] = None):
+        self.cache_path = cache_path
+        self._by_key: Dict[str, List[Listing]] = defaultdict(list)
+        self._by_symbol: Dict[str, List[Listing]] = defaultdict(list)
+        self._trigram_index: Dict[str, set] = defaultdict(set)
+        self._learned: Dict[str, str] = {}
+        self._memo: Dict[Tuple[str, str], Optional[str]] = {}
+        self._lock = threading.Lock()
+
+        for listing in listings:
+            self._add_key(normalize_name(listing.name), listing)
+            self._by_symbol[listing.symbol.upper()].append(listing)
+            base = listing.symbol.upper().split('.')[0]
+            if base != listing.symbol.upper():
+                self._by_symbol[base].append(listing)
+        for alias, targets in (aliases or {}).items():
+            for listing in targets:
+                self._add_key(normalize_name(alias), listing)
+        self._sorted_keys = sorted(self._by_key)
+        for key in self._by_key:
+            for gram in _trigrams(key):
+                self._trigram_index[gram].add(key)
+        if cache_path:
+            self._load_learned()
+
+    @classmethod
+    def from_csv(cls, path: str = LISTINGS_PATH, cache_path: Optional[str] = SYMBOL_CACHE_PATH) -> "SymbolIndex":
+        listings = []
+        aliases: Dict[str, List[Listing]] = defaultdict(list)
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                listing = Listing(row['symbol'].strip(), row['name'].strip(),
+                                  row['exchange'].strip(), row['country'].strip().upper())
+                listings.append(listing)
+                for alias in (row.get('aliases') or "").split(';'):
+                    if alias.strip():
+                        aliases[alias.strip()].append(listing)
+        return cls(listings, aliases, cache_path)
+
+    def _add_key(self, key: str, listing: Listing) -> None:
+        if key and listing not in self._by_key[key]:
+            self._by_key[key].append(listing)
+
+    def resolve(self, company_name: str, country: str = "") -> Optional[str]:
+        """Return a Yahoo Finance symbol, or None when the index has no confident match"""
+        key = normalize_name(company_name or "")
+        if not key:
+            return None
+        country_code, suffix = _parse_country(country)
+        memo_key = (key, (country or "").strip().lower())
+        if memo_key in self._memo:
+            return self._memo[memo_key]
+
+        symbol = self._learned.get(self._learned_key(key, country))
+        if symbol is None:
+            listing = self._lookup(company_name.strip(), key, country_code)
+            symbol = self._apply_suffix(listing.symbol, suffix) if listing else None
+        # Misses are not memoized so a later remember() call can fill them
+        if symbol is not None:
+            self._memo[memo_key] = symbol
+        return symbol
+
+    def _lookup(self, raw: str, key: str, country_code: str) -> Optional[Listing]:
+        # 1. exact company name or alias
+        listing = self._pick(self._by_key.get(key, []), country_code)
+        if listing:
+            return listing
+        # 2. the user typed a ticker ("AAPL", "RELIANCE")
+        if " " not in raw:
+            listing = self._pick(self._by_symbol.get(raw.upper(), []), country_code)
+            if listing:
+                return listing
+        # 3. unambiguous prefix ("berkshire hath")
+        if len(key) >= 3:
+            candidates = []
+            for i in range(bisect_left(self._sorted_keys, key), len(self._sorted_keys)):
+                if not self._sorted_keys[i].startswith(key):
+                    break
+                candidates.extend(self._by_key[self._sorted_keys[i]])
+            listing = self._pick(candidates, country_code, unique=True)
+            if listing:
+                return listing
+        # 4. typo correction ("microsfot"); anything less certain is left to the LLM
+        return self._fuzzy(key, country_code)
+
+    def _fuzzy(self, key: str, country_code: str) -> Optional[Listing]:
+        if len(key) < FUZZY_MIN_LENGTH:
+            return None
+        shared = Counter()
+        for gram in _trigrams(key):
+            for candidate in self._trigram_index.get(gram, ()):
+                shared[candidate] += 1
+        scored = []
+        for candidate, _ in shared.most_common(20):
+            listing = self._pick(self._by_key[candidate], country_code)
+            if listing:
+                scored.append((similarity(key, candidate), listing))
+        if not scored:
+            return None
+        scored.sort(key=lambda item: -item[0])
+        best_score, best = scored[0]
+        runner_up = next((score for score, listing in scored[1:] if listing.symbol != best.symbol), 0.0)
+        if best_score < FUZZY_THRESHOLD or best_score - runner_up < FUZZY_MARGIN:
+            return None
+        return best
+
+    @staticmethod
+    def _pick(listings: List[Listing], country_code: str, unique: bool = False) -> Optional[Listing]:
+        if country_code:
+            listings = [l for l in listings if l.country == country_code]
+        if unique and len({l.symbol for l in listings}) != 1:
+            return None
+        return listings[0] if listings else None
+
+    @staticmethod
+    def _apply_suffix(symbol: str, suffix: Optional[str]) -> str:
+        if suffix and symbol.endswith(('.NS', '.BO')):
+            return symbol[:-3] + suffix
+        return symbol
+
+    @staticmethod
+    def _learned_key(key: str, country: str) -> str:
+        return f"{key}|{(country or '').strip().lower()}"
+
+    def remember(self, company_name: str, country: str, symbol: str) -> None:
+        """Record an externally resolved symbol and persist it"""
+        key = normalize_name(company_name)
+        with self._lock:
+            self._learned[self._learned_key(key, country)] = symbol
+            self._memo[(key, (country or "").strip().lower())] = symbol
+            if self.cache_path:
+                self._save_learned()
+
+    def _load_learned(self) -> None:
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                self._learned = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logging.error(f"Could not load symbol cache {self.cache_path}: {str(e)}")
+
+    def _save_learned(self) -> None:
+        tmp_path = f"{self.cache_path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._learned, f, indent=0, sort_keys=True)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logging.error(f"Could not save symbol cache {self.cache_path}: {str(e)}")
+
+_index: Optional[SymbolIndex] = None
+_index_lock = threading.Lock()
+
+def get_symbol_index() -> SymbolIndex:
+    """Process-wide index, built on first use"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SymbolIndex.from_csv()
+    return _index
@@ -0,0 +1,179 @@
+"""In-process metrics: latency histograms, counters and LLM token/cost accounting.
+
+Recording is a lock, a bisect and a few additions, so it is cheap enough for
+every turn and every research fetch. Read the numbers back with snapshot()
+(JSON-serializable) or prometheus_text() (Prometheus text exposition format).
+
+    with span('research', source='news'):
+        ...
+    record_usage('gpt-4o', response.usage)
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+
+# Seconds; covers a cached lookup (~ms) up to a slow full debate
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# USD per 1M tokens (input, output); unknown models are counted but not priced
+MODEL_PRICES = {
+    'gpt-4o': (2.50, 10.00),
+    'gpt-4o-mini': (0.15, 0.60),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Estimate from the buckets, interpolating linearly inside the bucket"""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else 0.0,
+            'p50': round(self.quantile(0.5), 6),
+            'p95': round(self.quantile(0.95), 6),
+            'p99': round(self.quantile(0.99), 6),
+            'max': round(self.max, 6)
+        }
+
+class Telemetry:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def increment(self, name: str, value: float = 1, **labels) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    @contextmanager
+    def span(self, name: str, **labels):
+        """Time a block into the `<name>_seconds` histogram; failures are also counted"""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.increment(f"{name}_errors_total", **labels)
+            raise
+        finally:
+            self.observe(f"{name}_seconds", time.perf_counter() - start, **labels)
+
+    def record_usage(self, model: str, usage: Any) -> None:
+        """Count tokens and estimated cost from an OpenAI `usage` object or dict"""
+        if usage is None:
+            return
+        get = usage.get if isinstance(usage, dict) else lambda k, d=0: getattr(usage, k, d)
+        prompt, completion = get('prompt_tokens', 0) or 0, get('completion_tokens', 0) or 0
+        self.increment('llm_prompt_tokens_total', prompt, model=model)
+        self.increment('llm_completion_tokens_total', completion, model=model)
+        # Dated snapshots (gpt-4o-2024-08-06) are priced like their base model
+        price = MODEL_PRICES.get(model) or next(
+            (p for base, p in sorted(MODEL_PRICES.items(), key=lambda i: -len(i[0])) if model.startswith(base)), None)
+        if price:
+            self.increment('llm_cost_usd_total', (prompt * price[0] + completion * price[1]) / 1e6, model=model)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """{'histograms': {name: [{labels, count, p50, ...}]}, 'counters': {name: [{labels, value}]}}"""
+        with self._lock:
+            histograms = {key: h.to_dict() for key, h in self._histograms.items()}
+            counters = dict(self._counters)
+        result: Dict[str, Any] = {'histograms': {}, 'counters': {}}
+        for (name, labels), data in sorted(histograms.items()):
+            result['histograms'].setdefault(name, []).append({'labels': dict(labels), **data})
+        for (name, labels), value in sorted(counters.items()):
+            result['counters'].setdefault(name, []).append({'labels': dict(labels), 'value': round(value, 6)})
+        return result
+
+    def prometheus_text(self, prefix: str = "stockdebate_") -> str:
+        def fmt(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+            pairs = list(labels) + ([extra] if extra else [])
+            if not pairs:
+                return ""
+            escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+            return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+        with self._lock:
+            histograms = [(key, list(h.counts), h.count, h.sum) for key, h in sorted(self._histograms.items())]
+            counters = sorted(self._counters.items())
+        lines, typed = [], set()
+        for (name, labels), counts, count, total in histograms:
+            metric = prefix + name
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} histogram")
+                typed.add(metric)
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float('inf'),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float('inf') else repr(bound)
+                lines.append(f"{metric}_bucket{fmt(labels, ('le', le))} {cumulative}")
+            lines.append(f"{metric}_sum{fmt(labels)} {total}")
+            lines.append(f"{metric}_count{fmt(labels)} {count}")
+        for (name, labels), value in counters:
+            metric = prefix + name
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            lines.append(f"{metric}{fmt(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+_telemetry = Telemetry()
+
+def get_telemetry() -> Telemetry:
+    return _telemetry
+
+def span(name: str, **labels):
+    return _telemetry.span(name, **labels)
+
+def observe(name: str, value: float, **labels) -> None:
+    _telemetry.observe(name, value, **labels)
+
+def increment(name: str, value: float = 1, **labels) -> None:
+    _telemetry.increment(name, value, **labels)
+
+def record_usage(model: str, usage: Any) -> None:
+    _telemetry.record_usage(model, usage)
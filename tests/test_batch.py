@@ -0,0 +1,41 @@
+import asyncio
+
+import batch
+from data_fetcher import ResearchBundle
+
+METRICS = {'current_price': 100.0, 'pe_ratio': 25.0, 'currency': 'USD'}
+
+class StubSystem:
+    cpu_pool = None
+
+    def __init__(self):
+        self.debated = []
+
+    async def analyze_stock(self, ticker, research_data=None, **kwargs):
+        self.debated.append(ticker)
+        return {'conclusion': f"Debated {ticker}", 'messages': [], 'research': research_data}
+
+def test_research_errors_skip_the_debate(monkeypatch):
+    async def fake_research(ticker):
+        if ticker == 'NOPE':
+            return ResearchBundle(ticker, {'error': "No data found, symbol may be delisted"}, {'news': []})
+        return ResearchBundle(ticker, dict(METRICS), {'news': []})
+    monkeypatch.setattr(batch, 'get_stock_research_async', fake_research)
+    system = StubSystem()
+
+    records = asyncio.run(batch.run_batch(['AAPL', 'NOPE'], system=system))
+
+    by_ticker = {r['ticker']: r for r in records}
+    assert system.debated == ['AAPL']
+    assert by_ticker['AAPL']['status'] == 'ok'
+    assert by_ticker['NOPE']['status'] == 'error'
+    assert 'delisted' in by_ticker['NOPE']['error']
+
+def test_analysis_exceptions_become_error_records(monkeypatch):
+    async def fake_research(ticker):
+        raise RuntimeError("provider down")
+    monkeypatch.setattr(batch, 'get_stock_research_async', fake_research)
+
+    records = asyncio.run(batch.run_batch(['AAPL'], system=StubSystem()))
+
+    assert [(r['status'], r['error']) for r in records] == [('error', "provider down")]
@@ -0,0 +1,126 @@
+import threading
+import time
+
+import pytest
+
+import cache
+from cache import CacheBackend, MemoryLRUCache, SQLiteCache
+from data_fetcher import ResearchCache
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+class Fetcher:
+    """Counts fetches; returns a new value each time unless told to fail"""
+    def __init__(self, error=None):
+        self.calls = 0
+        self.error = error
+
+    def __call__(self, ticker):
+        self.calls += 1
+        if self.error:
+            return {'error': self.error}
+        return {'ticker': ticker, 'version': self.calls}
+
+def _wait_for_refresh(research_cache, refreshes=1, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while research_cache.stats.refreshes < refreshes and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert research_cache.stats.refreshes == refreshes
+
+def _aged(research_cache, kind, ticker, value, age):
+    research_cache.backend.set(f"{kind}:{ticker}", value, time.time() - age)
+
+def test_backend_must_implement_every_method():
+    class Partial(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def backend(request, tmp_path):
+    if request.param == 'memory':
+        yield MemoryLRUCache(max_entries=2)
+    else:
+        db = SQLiteCache(str(tmp_path / "cache.db"), max_entries=2)
+        yield db
+        db.close()
+
+def test_backend_roundtrip(backend):
+    backend.set('a', {'x': 1}, stored_at=5.0)
+    assert backend.get('a') == ({'x': 1}, 5.0)
+    assert backend.get('missing') is None
+    backend.delete('a')
+    assert backend.get('a') is None and len(backend) == 0
+
+def test_backend_evicts_least_recently_used(backend, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache, 'time', clock)
+    for key in ('a', 'b'):
+        backend.set(key, key)
+        clock.now += 1
+    backend.get('a')  # 'b' is now the least recently used
+    clock.now += 1
+    backend.set('c', 'c')
+    assert backend.get('b') is None
+    assert backend.get('a') is not None and backend.get('c') is not None
+    assert backend.stats.evictions == 1
+    backend.clear()
+    assert len(backend) == 0
+
+def test_sqlite_cache_survives_reopen(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first = SQLiteCache(path)
+    first.set('metrics:AAPL', {'current_price': 190.5}, stored_at=42.0)
+    first.close()
+    second = SQLiteCache(path)
+    try:
+        assert second.get('metrics:AAPL') == ({'current_price': 190.5}, 42.0)
+    finally:
+        second.close()
+
+def test_fresh_entry_is_a_hit():
+    research_cache, fetch = ResearchCache(ttls={'metrics': 60}), Fetcher()
+    assert research_cache.get_or_fetch('metrics', 'aapl', fetch)['version'] == 1
+    assert research_cache.get_or_fetch('metrics', 'AAPL', fetch)['version'] == 1
+    assert fetch.calls == 1
+    assert (research_cache.stats.misses, research_cache.stats.hits) == (1, 1)
+
+def test_expired_entry_is_refetched_inline():
+    research_cache, fetch = ResearchCache(ttls={'metrics': 60}, stale_ttls={'metrics': 300}), Fetcher()
+    _aged(research_cache, 'metrics', 'AAPL', {'version': 0}, age=400)
+    assert research_cache.get_or_fetch('metrics', 'AAPL', fetch)['version'] == 1
+    assert research_cache.stats.misses == 1 and research_cache.stats.stale_hits == 0
+
+def test_stale_entry_is_served_while_revalidating():
+    research_cache, fetch = ResearchCache(ttls={'metrics': 60}, stale_ttls={'metrics': 300}), Fetcher()
+    _aged(research_cache, 'metrics', 'AAPL', {'version': 0}, age=120)
+    assert research_cache.get_or_fetch('metrics', 'AAPL', fetch)['version'] == 0
+    _wait_for_refresh(research_cache)
+    assert research_cache.get_or_fetch('metrics', 'AAPL', fetch)['version'] == 1
+    assert fetch.calls == 1
+    assert (research_cache.stats.stale_hits, research_cache.stats.hits) == (1, 1)
+
+def test_errors_are_not_cached():
+    research_cache, fetch = ResearchCache(), Fetcher(error="rate limited")
+    for _ in range(2):
+        assert research_cache.get_or_fetch('news', 'AAPL', fetch) == {'error': "rate limited"}
+    assert fetch.calls == 2
+    assert research_cache.peek('news', 'AAPL') is None
+
+def test_counters_are_exact_under_threads():
+    research_cache, fetch = ResearchCache(ttls={'metrics': 60}), Fetcher()
+    research_cache.get_or_fetch('metrics', 'AAPL', fetch)
+    threads = [threading.Thread(target=lambda: [research_cache.get_or_fetch('metrics', 'AAPL', fetch)
+                                                for _ in range(500)]) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert research_cache.stats.hits == 8 * 500
@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+import custom_agent
+from custom_agent import DEBATE_SCHEDULES, Agent, AgentSystem
+from transcript import Transcript
+
+@pytest.fixture
+def requests(monkeypatch):
+    """Replace the LLM with numbered replies; collects every request sent"""
+    sent = []
+
+    async def fake_complete_text(request, api_key=None, **kwargs):
+        sent.append(request)
+        return f"Reply {len(sent)}. Detail {len(sent)} is only kept verbatim."
+    monkeypatch.setattr(custom_agent, 'complete_text', fake_complete_text)
+    return sent
+
+def _agents():
+    return [Agent("Bullish Agent", "bull", "Argue for buying."), Agent("Bearish Agent", "bear", "Argue for selling.")]
+
+@pytest.mark.parametrize("schedule", DEBATE_SCHEDULES)
+def test_conclusion_sees_every_turn_with_small_window(requests, schedule):
+    result = asyncio.run(AgentSystem().run_debate(
+        _agents(), turns=4, topic="AAPL", history_window=2, summarize_history=True, schedule=schedule))
+
+    *turn_requests, conclusion_request = requests
+    conclusion_prompt = conclusion_request['messages'][-1]['content']
+    assert len(result['messages']) == 8
+    for message in result['messages']:
+        assert f"{message['role']}: {message['content']}" in conclusion_prompt
+    # the per-turn prompts stay windowed; older turns survive only as first sentences
+    assert "Detail 1 is" not in turn_requests[-1]['messages'][-1]['content']
+
+def test_full_text_ignores_window():
+    windowed, unbounded = Transcript(window=2, summarize=True), Transcript()
+    for i in range(5):
+        for transcript in (windowed, unbounded):
+            transcript.append("Agent", f"Point {i}. More detail.")
+    assert windowed.full_text() == unbounded.full_text() == unbounded.history()
+    assert "Point 0. More detail." not in windowed.history()
@@ -0,0 +1,60 @@
+import pytest
+
+from debate_controller import DebateBudget, DebateController
+
+OPENING = [
+    ("Apple's services revenue grew 14% year over year and now carries gross margins above 70%, which shifts "
+     "the mix toward recurring, high-margin income. With a P/E of 29 against double-digit earnings growth and a "
+     "$90 billion buyback program, the valuation is justified and downside is cushioned."),
+    ("The P/E of 29 is well above the five-year average while iPhone unit sales are flat, and China revenue fell "
+     "8% last quarter. Regulatory pressure on App Store fees threatens the very services margins the bull case "
+     "depends on."),
+]
+# The same two arguments reworded
+RESTATED = [
+    ("As I said, services revenue is growing at 14% annually with margins over 70%, so Apple's income mix is "
+     "moving toward high-margin recurring revenue. Given double-digit earnings growth and the $90 billion buyback, "
+     "a 29 P/E is justified and the downside is cushioned."),
+    ("Again, a 29 P/E sits well above the stock's five-year average even though iPhone sales are flat and China "
+     "revenue dropped 8% last quarter. App Store fee regulation threatens exactly the services margins the bull "
+     "argument relies on."),
+]
+# New arguments
+REBUTTAL = [
+    ("On the China point: wearables and the installed base of over two billion active devices give Apple pricing "
+     "power that offsets unit weakness, and the Vision Pro and on-device AI features open a new upgrade cycle for 2025."),
+    ("Installed base does not pay dividends; the Epic ruling and EU Digital Markets Act already force alternative "
+     "app stores, and management's guidance calls for low single-digit revenue growth next quarter with rising "
+     "component costs."),
+]
+
+def _debate(*rounds, budget=None):
+    controller = DebateController(budget or DebateBudget(min_turns=1, max_turns=10))
+    for responses in rounds:
+        for response in responses:
+            controller.record_turn("", response)
+        controller.end_round()
+    return controller
+
+@pytest.mark.parametrize("second_round, repetitive", [
+    (RESTATED, True),
+    (REBUTTAL, False),
+    # half restatement, half new argument
+    ([RESTATED[0] + " " + REBUTTAL[0], RESTATED[1] + " " + REBUTTAL[1]], False),
+])
+def test_novelty_threshold(second_round, repetitive):
+    controller = _debate(OPENING, second_round)
+    assert (controller.round_novelty[-1] < controller.budget.novelty_threshold) == repetitive
+
+def test_restated_round_stops_debate():
+    controller = _debate(OPENING, RESTATED)
+    assert not controller.should_continue()
+    assert controller.stop_reason == 'converged'
+
+def test_new_arguments_continue_debate():
+    controller = _debate(OPENING, REBUTTAL)
+    assert controller.should_continue()
+
+def test_min_turns_before_converging():
+    controller = _debate(OPENING, RESTATED, budget=DebateBudget(min_turns=3))
+    assert controller.should_continue()
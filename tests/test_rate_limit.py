@@ -0,0 +1,144 @@
+import asyncio
+import email.utils
+import time
+import types
+
+import pytest
+
+from rate_limit import RateLimiter, TokenBucket, retry_after
+
+class Clock:
+    """Fake monotonic clock; sleeping advances it and is recorded"""
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    async def async_sleep(self, seconds):
+        self.sleep(seconds)
+
+class HTTPError(Exception):
+    def __init__(self, status, headers=None):
+        super().__init__(f"HTTP {status}")
+        self.status_code = status
+        self.response = types.SimpleNamespace(status_code=status, headers=headers or {})
+
+def _limiter(clock, **kwargs):
+    kwargs = {'requests_per_second': 2, 'burst': 1, 'base_delay': 0.5, **kwargs}
+    return RateLimiter('test', clock=clock, sleep=clock.sleep, async_sleep=clock.async_sleep, **kwargs)
+
+def _failing(*errors):
+    """Raises the given errors in turn, then returns 'ok'"""
+    remaining = list(errors)
+
+    def fn():
+        if remaining:
+            raise remaining.pop(0)
+        return 'ok'
+    return fn
+
+def test_bucket_burst_then_debt():
+    clock = Clock()
+    bucket = TokenBucket(rate=1, capacity=3, clock=clock)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.reserve() == pytest.approx(1.0)
+    assert bucket.reserve() == pytest.approx(2.0)
+
+def test_bucket_refills_up_to_capacity():
+    clock = Clock()
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock)
+    bucket.reserve(2)
+    clock.now += 0.5
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.5)
+    clock.now += 100  # idle time does not bank more than capacity
+    assert [bucket.reserve() for _ in range(2)] == [0.0, 0.0]
+    assert bucket.reserve() == pytest.approx(0.5)
+
+def test_token_bucket_limits_tokens_per_minute():
+    clock = Clock()
+    limiter = _limiter(clock, requests_per_second=100, burst=100, tokens_per_minute=600)
+    limiter.call(lambda: None, tokens=600)
+    limiter.call(lambda: None, tokens=60)
+    assert clock.sleeps == [pytest.approx(6.0)]
+
+def test_call_spaces_requests_after_burst():
+    clock = Clock()
+    limiter = _limiter(clock)
+    for _ in range(5):
+        assert limiter.call(lambda: 'ok') == 'ok'
+    assert clock.sleeps == [pytest.approx(0.5)] * 4
+    assert limiter.metrics.calls == 5
+    assert limiter.metrics.queue_wait_max == pytest.approx(0.5)
+
+def test_retry_after_overrides_jittered_backoff():
+    clock = Clock()
+    limiter = _limiter(clock, burst=10)
+    result = limiter.call(_failing(HTTPError(503, {'retry-after': '7'})))
+    assert result == 'ok'
+    # jittered backoff for the first retry is at most base_delay; the server asked for 7s
+    assert len(clock.sleeps) == 1
+    assert 7.0 <= clock.sleeps[0] <= 7.5
+    assert (limiter.metrics.retries, limiter.metrics.throttled) == (1, 0)
+
+def test_backoff_without_retry_after_is_jittered_and_capped():
+    clock = Clock()
+    limiter = _limiter(clock, burst=10, base_delay=0.5, max_delay=1.0)
+    limiter.call(_failing(*[HTTPError(502)] * 4))
+    assert len(clock.sleeps) == 4
+    assert all(0 <= s <= bound for s, bound in zip(clock.sleeps, [0.5, 1.0, 1.0, 1.0]))
+
+def test_throttle_pauses_bucket_for_every_caller():
+    clock = Clock()
+    limiter = _limiter(clock, requests_per_second=1, burst=5)
+    limiter.call(_failing(HTTPError(429, {'retry-after': '10'})))
+    # the retry waited out the pause in its reservation, not in a separate sleep
+    assert len(clock.sleeps) == 1 and clock.sleeps[0] >= 10
+    assert limiter.metrics.throttled == 1
+    # another caller right after the pause has spent the burst too
+    assert limiter.requests.reserve() > 0
+
+def test_non_retryable_error_propagates():
+    clock = Clock()
+    limiter = _limiter(clock)
+    with pytest.raises(HTTPError):
+        limiter.call(_failing(HTTPError(400)))
+    assert clock.sleeps == []
+    assert (limiter.metrics.retries, limiter.metrics.failures) == (0, 1)
+
+def test_gives_up_after_max_retries():
+    clock = Clock()
+    limiter = _limiter(clock, burst=10, max_retries=2)
+    with pytest.raises(HTTPError):
+        limiter.call(_failing(*[HTTPError(503)] * 3))
+    assert (limiter.metrics.retries, limiter.metrics.failures) == (2, 1)
+
+def test_call_async_uses_async_sleep():
+    clock = Clock()
+    limiter = _limiter(clock, burst=10)
+    fail = _failing(HTTPError(503, {'retry-after-ms': '1500'}))
+
+    async def fn():
+        return fail()
+    assert asyncio.run(limiter.call_async(fn)) == 'ok'
+    assert 1.5 <= clock.sleeps[0] <= 2.0
+
+@pytest.mark.parametrize("headers, expected", [
+    ({'retry-after': '3'}, 3.0),
+    ({'retry-after-ms': '250'}, 0.25),
+    ({'retry-after': '-5'}, 0.0),
+    ({'retry-after': 'soon'}, None),
+    ({}, None),
+])
+def test_retry_after_header(headers, expected):
+    assert retry_after(HTTPError(429, headers)) == expected
+
+def test_retry_after_http_date():
+    when = email.utils.formatdate(time.time() + 30, usegmt=True)
+    assert 28 <= retry_after(HTTPError(429, {'retry-after': when})) <= 30
@@ -0,0 +1,63 @@
+import asyncio
+import types
+
+import pytest
+
+import custom_agent
+import response_cache
+from cache import MemoryLRUCache
+from custom_agent import complete_text, stream_text
+from response_cache import ResponseCache
+
+REQUEST = {'model': 'gpt-4o', 'temperature': 0.7, 'max_tokens': 50,
+           'messages': [{'role': 'system', 'content': 'Argue.'}, {'role': 'user', 'content': 'AAPL?'}]}
+
+class FakeManager:
+    """Numbered completions, streamed as one chunk"""
+    def __init__(self):
+        self.calls = 0
+
+    def _text(self):
+        self.calls += 1
+        return f"answer {self.calls}"
+
+    async def chat(self, api_key=None, **kwargs):
+        message = types.SimpleNamespace(content=self._text())
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+    async def chat_stream(self, api_key=None, **kwargs):
+        delta = types.SimpleNamespace(content=self._text())
+        yield types.SimpleNamespace(choices=[types.SimpleNamespace(delta=delta)])
+
+@pytest.fixture
+def manager(monkeypatch):
+    fake = FakeManager()
+    monkeypatch.setattr(custom_agent, 'get_llm_manager', lambda: fake)
+    monkeypatch.setattr(response_cache, '_response_cache', ResponseCache(MemoryLRUCache()))
+    return fake
+
+async def _stream(request, **kwargs):
+    return "".join([part async for part in stream_text(request, **kwargs)])
+
+@pytest.mark.parametrize("call", [complete_text, _stream])
+def test_fresh_bypasses_cache(manager, call):
+    assert asyncio.run(call(REQUEST)) == "answer 1"
+    assert asyncio.run(call(REQUEST)) == "answer 1"
+    assert asyncio.run(call(REQUEST, fresh=True)) == "answer 2"
+    # the fresh response replaces the cached one
+    assert asyncio.run(call(REQUEST)) == "answer 2"
+    assert manager.calls == 2
+
+@pytest.mark.parametrize("env, enabled", [
+    ({}, False),
+    ({'RESPONSE_CACHE': '0'}, False),
+    ({'RESPONSE_CACHE': '1'}, True),
+    ({'RESPONSE_CACHE_PATH': 'responses.db'}, True),
+])
+def test_cache_is_opt_in(monkeypatch, tmp_path, env, enabled):
+    monkeypatch.delenv('RESPONSE_CACHE', raising=False)
+    monkeypatch.delenv('RESPONSE_CACHE_PATH', raising=False)
+    monkeypatch.chdir(tmp_path)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    assert (response_cache._default_response_cache() is not None) == enabled
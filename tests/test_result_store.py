@@ -0,0 +1,74 @@
+import pytest
+
+from result_store import ResearchFingerprint, ReusePolicy, ResultStore, StoredResult, compare
+
+METRICS = {'current_price': 100.0, 'pe_ratio': 25.0, 'market_cap': 2e12, '52_week_high': 120.0,
+           '52_week_low': 80.0, 'volume': 1_000_000, 'avg_volume': 1_000_000, 'currency': 'USD'}
+NEWS = [{'title': 'Earnings beat', 'url': 'https://example.com/a'},
+        {'title': 'New product', 'url': 'https://example.com/b'}]
+
+def _research(news=NEWS, error=None, **metrics):
+    research = {'metrics': {**METRICS, **metrics}, 'news': {'news': list(news)}}
+    if error:
+        research['metrics']['error'] = error
+    return research
+
+def _stored(research=None, depth=0, created_at=1000.0):
+    fingerprint = ResearchFingerprint.of(research or _research())
+    return StoredResult(id=1, ticker='AAPL', created_at=created_at, mode='full', depth=depth,
+                        parent_id=None, fingerprint=fingerprint, result={})
+
+def _story(n):
+    return {'title': f'Story {n}', 'url': f'https://example.com/{n}'}
+
+@pytest.mark.parametrize("current, expected", [
+    (_research(), 'reuse'),
+    # price and volume ticks below the reuse tolerance
+    (_research(current_price=100.4, volume=1_050_000), 'reuse'),
+    # a reordered or tracking-tagged story is not new
+    (_research(news=[NEWS[1], {'title': 'Earnings beat', 'url': 'https://example.com/a?utm=x'}]), 'reuse'),
+    (_research(news=NEWS + [_story(1)]), 'delta'),
+    (_research(current_price=103.0), 'delta'),
+    (_research(volume=1_400_000), 'delta'),
+    (_research(news=NEWS + [_story(1), _story(2), _story(3)]), 'full'),
+    (_research(current_price=110.0), 'full'),
+    (_research(volume=2_000_000), 'full'),
+    (_research(pe_ratio='N/A'), 'full'),
+    (_research(error='rate limited'), 'full'),
+])
+def test_compare_modes(current, expected):
+    delta = compare(_stored(), ResearchFingerprint.of(current), now=1000.0)
+    assert delta.mode == expected, delta.reason
+
+def test_compare_without_previous():
+    assert compare(None, ResearchFingerprint.of(_research())).mode == 'full'
+
+def test_compare_errored_previous_is_not_reused():
+    previous = _stored(_research(error='timeout'))
+    assert compare(previous, ResearchFingerprint.of(_research(error='timeout')), now=1000.0).mode == 'full'
+
+def test_compare_delta_chain_limit():
+    current = ResearchFingerprint.of(_research(news=NEWS + [_story(1)]))
+    policy = ReusePolicy(max_delta_chain=3)
+    assert compare(_stored(depth=2), current, policy, now=1000.0).mode == 'delta'
+    assert compare(_stored(depth=3), current, policy, now=1000.0).mode == 'full'
+
+def test_compare_max_age():
+    policy = ReusePolicy(max_age_hours=24)
+    current = ResearchFingerprint.of(_research())
+    assert compare(_stored(), current, policy, now=1000.0 + 23 * 3600).mode == 'reuse'
+    assert compare(_stored(), current, policy, now=1000.0 + 25 * 3600).mode == 'full'
+
+def test_compare_zero_tolerance_is_exact():
+    policy = ReusePolicy(reuse_drift=0.0, reuse_volume_shift=0.0)
+    current = ResearchFingerprint.of(_research(current_price=100.01))
+    assert compare(_stored(), current, policy, now=1000.0).mode == 'delta'
+
+def test_plan_uses_latest_stored_result():
+    store = ResultStore(":memory:")
+    try:
+        assert store.plan('AAPL', ResearchFingerprint.of(_research())).mode == 'full'
+        store.save('AAPL', {'ticker': 'AAPL'}, ResearchFingerprint.of(_research()))
+        assert store.plan('AAPL', ResearchFingerprint.of(_research(current_price=100.2))).mode == 'reuse'
+    finally:
+        store.close()
@@ -0,0 +1,67 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("aiohttp")
+from aiohttp.test_utils import TestClient, TestServer
+
+from data_fetcher import ResearchBundle
+from server import DebateService, create_app
+
+class StubSystem:
+    def __init__(self):
+        self.calls = []
+
+    async def analyze_stock(self, ticker, **kwargs):
+        self.calls.append(ticker)
+        return {'conclusion': '', 'messages': []}
+
+async def _no_research(ticker):
+    raise AssertionError("research fetched for a rejected request")
+
+def _request(method, path, research=_no_research, **kwargs):
+    """Send one request to a fresh app; returns (status, body text, service)"""
+    async def run():
+        service = DebateService(system=StubSystem(), max_active=1, max_waiting=0)
+        service.research = research
+        async with TestClient(TestServer(create_app(service))) as client:
+            response = await client.request(method, path, **kwargs)
+            return response.status, await response.text(), service
+    return asyncio.run(run())
+
+def test_debate_rejects_unknown_schedule():
+    status, body, service = _request('GET', '/debate/AAPL?schedule=bogus')
+    assert status == 400
+    assert 'schedule' in json.loads(body)['error']
+    assert service.system.calls == []
+    assert service.stats()['debates'] == {'active': 0, 'waiting': 0, 'rejected': 0, 'max_active': 1}
+
+@pytest.mark.parametrize("payload, message", [
+    ("not json", "JSON"),
+    ([1, 2], "tickers"),
+    ({'tickers': 'AAPL'}, "tickers"),
+    ({'tickers': ['bad ticker!']}, "tickers"),
+    ({'tickers': ['AAPL'], 'concurrency': 'x'}, "concurrency"),
+    ({'tickers': ['AAPL'], 'concurrency': True}, "concurrency"),
+    ({'tickers': ['AAPL'], 'concurrency': 0}, "concurrency"),
+    ({'tickers': ['AAPL'], 'schedule': 'bogus'}, "schedule"),
+])
+def test_batch_rejects_invalid_body(payload, message):
+    kwargs = {'data': payload} if isinstance(payload, str) else {'json': payload}
+    status, body, service = _request('POST', '/batch', **kwargs)
+    assert status == 400
+    assert message in json.loads(body)['error']
+    assert service.system.calls == []
+    assert service.gate.rejected == 0 and service.gate.waiting == 0
+
+def test_batch_skips_debate_when_metrics_fail():
+    async def failed_research(ticker):
+        return ResearchBundle(ticker, {'error': "No data found, symbol may be delisted"}, {'news': []})
+
+    status, body, service = _request('POST', '/batch', research=failed_research, json={'tickers': ['NOPE']})
+    records = [json.loads(line) for line in body.splitlines()]
+    assert status == 200
+    assert [(r['ticker'], r['status']) for r in records] == [('NOPE', 'error')]
+    assert 'delisted' in records[0]['error']
+    assert service.system.calls == []
@@ -0,0 +1,66 @@
+import types
+
+import pytest
+
+from symbol_index import SymbolIndex, is_symbol
+
+@pytest.fixture(scope="module")
+def index():
+    return SymbolIndex.from_csv(cache_path=None)
+
+@pytest.mark.parametrize("name, country, expected", [
+    # exact names, aliases and tickers
+    ("Apple", "US", "AAPL"),
+    ("Apple Inc.", "", "AAPL"),
+    ("Reliance Industries", "India", "RELIANCE.NS"),
+    ("Reliance", "BSE", "RELIANCE.BO"),
+    ("State Bank of India", "India", "SBIN.NS"),
+    ("HDFC Bank", "India", "HDFCBANK.NS"),
+    ("Tata Steel", "India", "TATASTEEL.NS"),
+    ("AAPL", "", "AAPL"),
+    # unambiguous prefix
+    ("berkshire hath", "", "BRK-B"),
+    # typos
+    ("microsfot", "", "MSFT"),
+    ("Mircosoft", "US", "MSFT"),
+    ("Amazn", "", "AMZN"),
+    ("Gogle", "", "GOOGL"),
+    ("Tata Motor", "India", "TATAMOTORS.NS"),
+    # other companies with similar names are not guessed; the LLM resolves them
+    ("Bank of India", "India", None),
+    ("HDFC Life", "India", None),
+    ("Tata Power", "India", None),
+    ("SBI Life", "India", None),
+    ("Indian Bank", "India", None),
+])
+def test_resolve(index, name, country, expected):
+    assert index.resolve(name, country) == expected
+
+@pytest.mark.parametrize("text, expected", [
+    ("AAPL", True), ("BRK-B", True), ("M&M.NS", True), ("7203.T", True),
+    ("BLANK", False), ("I DON'T KNOW", False), ("N/A", False), ("", False),
+])
+def test_is_symbol(text, expected):
+    assert is_symbol(text) is expected
+
+def test_remember_is_served_locally(tmp_path):
+    index = SymbolIndex.from_csv(cache_path=str(tmp_path / "symbols.json"))
+    assert index.resolve("Bank of India", "India") is None
+    index.remember("Bank of India", "India", "BANKINDIA.NS")
+    assert SymbolIndex.from_csv(cache_path=str(tmp_path / "symbols.json")).resolve("Bank of India", "India") == "BANKINDIA.NS"
+
+@pytest.mark.parametrize("answer, expected", [("BLANK", None), ("Sorry, no idea", None), ("`BANKINDIA.NS`", "BANKINDIA.NS")])
+def test_llm_answers_are_validated_before_caching(monkeypatch, tmp_path, answer, expected):
+    pytest.importorskip("dotenv")
+    pytest.importorskip("openai")
+    import data_fetcher
+
+    message = types.SimpleNamespace(content=answer)
+    response = types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=None)
+    client = types.SimpleNamespace(chat=types.SimpleNamespace(
+        completions=types.SimpleNamespace(create=lambda **kwargs: response)))
+    monkeypatch.setattr(data_fetcher, "_openai_client", lambda: client)
+    index = SymbolIndex.from_csv(cache_path=str(tmp_path / "symbols.json"))
+
+    assert data_fetcher._llm_symbol_lookup("Bank of India", "India", index) == expected
+    assert index.resolve("Bank of India", "India") == expected
@@ -0,0 +1,72 @@
+"""Append-only debate transcript with incrementally rendered history"""
+import re
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+def first_sentence(text: str, max_chars: int = 160) -> str:
+    """Cheap extractive summary of one message"""
+    sentence = _SENTENCE_END.split(text.strip(), maxsplit=1)[0]
+    if len(sentence) > max_chars:
+        sentence = sentence[:max_chars].rsplit(" ", 1)[0] + "..."
+    return sentence
+
+class Transcript:
+    """Debate messages plus their rendered "role: content" history.
+
+    Rendering is done once per message as it is appended instead of once per
+    agent per turn. With window set, only the last `window` messages are
+    rendered verbatim so prompt size stays bounded; with summarize also set,
+    messages leaving the window are kept as a rolling one-sentence-per-message
+    summary capped at summary_chars. full_text() always renders every message.
+    """
+
+    def __init__(self, window: Optional[int] = None, summarize: bool = False, summary_chars: int = 1500):
+        self.window = window
+        self.summarize = summarize
+        self.summary_chars = summary_chars
+        self.messages: List[Dict[str, str]] = []
+        self._full = ""
+        self._recent: Deque[str] = deque(maxlen=window) if window else deque()
+        self._summary: Deque[str] = deque()
+        self._summary_len = 0
+        self._history: Optional[str] = ""
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def append(self, role: str, content: str) -> None:
+        self.messages.append({'role': role, 'content': content})
+        line = f"{role}: {content}"
+        if self.window is None:
+            self._full = f"{self._full}\n{line}" if self._full else line
+            self._history = self._full
+            return
+        if len(self._recent) == self.window and self.summarize:
+            self._add_to_summary(self.messages[-1 - self.window])
+        self._recent.append(line)
+        self._history = None  # re-joined lazily, bounded by the window size
+
+    def _add_to_summary(self, message: Dict[str, str]) -> None:
+        part = f"{message['role']}: {first_sentence(message['content'])}"
+        self._summary.append(part)
+        self._summary_len += len(part) + 1
+        while self._summary_len > self.summary_chars and len(self._summary) > 1:
+            self._summary_len -= len(self._summary.popleft()) + 1
+
+    def full_text(self) -> str:
+        """Every message verbatim, regardless of the window (e.g. for the conclusion)"""
+        if self.window is None:
+            return self._full
+        return "\n".join(f"{m['role']}: {m['content']}" for m in self.messages)
+
+    def history(self) -> str:
+        """Rendered history to put in the next prompt"""
+        if self._history is None:
+            recent = "\n".join(self._recent)
+            if self._summary:
+                recent = ("Summary of earlier discussion:\n" + "\n".join(self._summary)
+                          + "\n\nRecent discussion:\n" + recent)
+            self._history = recent
+        return self._history
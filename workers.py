@@ -0,0 +1,111 @@
+"""Process pool for the CPU-bound stages of large batch runs.
+
+The asyncio orchestrator keeps every I/O-bound call (research, LLM). Pure CPU
+work (context compilation, conclusion scoring, screening) can be handed to
+a WorkerPool so it does not serialize on the GIL. Functions sent to the pool
+must be importable module-level functions with picklable arguments.
+
+Large numeric tables are not pickled: SharedArray puts them in shared memory
+once, workers attach to the block by name and read or write their row range
+in place.
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import shared_memory
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+def _apply_chunk(fn: Callable, chunk: List[tuple]) -> List[Any]:
+    return [fn(*args) for args in chunk]
+
+class WorkerPool:
+    """Lazily started process pool with asyncio-friendly run/map"""
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn, not fork: the parent has an event loop and cache refresh threads running
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Run fn(*args) in a worker process"""
+        return await asyncio.get_running_loop().run_in_executor(self._get_executor(), partial(fn, *args))
+
+    async def map(self, fn: Callable, items: Iterable[tuple], chunksize: Optional[int] = None) -> List[Any]:
+        """[fn(*args) for args in items], in order, sent to workers in chunks to amortize IPC"""
+        items = list(items)
+        if not items:
+            return []
+        chunksize = chunksize or max(1, -(-len(items) // (self.workers * 4)))
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        chunks = await asyncio.gather(*[
+            loop.run_in_executor(executor, _apply_chunk, fn, items[i:i + chunksize])
+            for i in range(0, len(items), chunksize)
+        ])
+        return [result for chunk in chunks for result in chunk]
+
+    def shutdown(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+
+async def run_cpu(pool: Optional[WorkerPool], fn: Callable, *args) -> Any:
+    """fn(*args) in the pool when there is one, otherwise inline"""
+    if pool is None:
+        return fn(*args)
+    return await pool.run(fn, *args)
+
+ArraySpec = Tuple[str, Tuple[int, ...], str]  # (shared memory name, shape, dtype)
+
+class SharedArray:
+    """A numpy array in a named shared-memory block, owned (and unlinked) by its creator"""
+
+    def __init__(self, shape: Tuple[int, ...], dtype: str = "float64"):
+        import numpy as np
+
+        size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self._shm.buf)
+        self.spec: ArraySpec = (self._shm.name, tuple(shape), dtype)
+
+    @classmethod
+    def copy_of(cls, values) -> "SharedArray":
+        shared = cls(values.shape, values.dtype.str)
+        shared.array[...] = values
+        return shared
+
+    def close(self) -> None:
+        if self._shm is not None:
+            self.array = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self) -> "SharedArray":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+def attach(spec: ArraySpec):
+    """Worker side: (shared memory handle, array view) for a SharedArray spec; close the handle when done"""
+    import numpy as np
+
+    name, shape, dtype = spec
+    # Pool workers share the creator's resource tracker, so attaching here does
+    # not hand ownership to this process; the creator unlinks the block
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)